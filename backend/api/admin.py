@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import Student, Event, Attendance, Semester, Professor, Class, TeachingAssistant, AdminUser, EventOrganization, Organization
+from .models import Student, Event, Attendance, Semester, Professor, Class, TeachingAssistant, AdminUser, EventOrganization, Organization, PointsLedger, CheckinQueueItem, EventVisibility, AttendanceRollup, StudentSearchGram
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -71,6 +71,37 @@ class OrganizationAdmin(admin.ModelAdmin):
     search_fields = ('id', 'name')
     list_editable = ('name',)
 
+@admin.register(PointsLedger)
+class PointsLedgerAdmin(admin.ModelAdmin):
+    list_display = ('id', 'student', 'organization', 'term_start', 'points')
+    list_filter = ('organization', 'term_start')
+    search_fields = ('id', 'student__id', 'student__first_name', 'student__last_name', 'organization')
+
+@admin.register(CheckinQueueItem)
+class CheckinQueueItemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'attempts', 'received_at', 'available_at', 'processed_at')
+    list_filter = ('status', 'received_at')
+    search_fields = ('id', 'last_error')
+    readonly_fields = ('received_at', 'claimed_at', 'processed_at')
+
+@admin.register(EventVisibility)
+class EventVisibilityAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event', 'organization')
+    list_filter = ('organization',)
+    search_fields = ('id', 'event__id', 'event__name', 'organization')
+
+@admin.register(AttendanceRollup)
+class AttendanceRollupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'day', 'event_type', 'organization', 'count')
+    list_filter = ('organization', 'event_type', 'day')
+    search_fields = ('id', 'event_type', 'organization')
+
+@admin.register(StudentSearchGram)
+class StudentSearchGramAdmin(admin.ModelAdmin):
+    list_display = ('id', 'gram', 'student')
+    search_fields = ('gram', 'student__id')
+    raw_id_fields = ('student',)
+
 # Custom User Admin to show email field prominently
 class UserAdmin(BaseUserAdmin):
     # Fields to show in the add form
@@ -0,0 +1,157 @@
+"""
+Async versions of the I/O-bound endpoints, served in ASGI mode.
+
+With ASGI_MODE on (see gunicorn_config.py), gunicorn runs uvicorn workers on
+backend.asgi:application and api/urls.py routes the OneTap webhook and the
+read-only dashboard counts here instead of to their DRF views. A worker's
+event loop keeps serving other connections while a request waits on the
+database or a slow client, so a burst of check-ins or a dashboard's fan-out
+of stats requests no longer queues for one of three sync workers. Django
+still runs the ORM calls on one thread per worker (the async ORM is
+sync_to_async underneath), so queries themselves do not run in parallel;
+compare both modes on real data with `python manage.py load_test --compare`.
+
+The views share their query building with the sync views in api/views.py
+and api/onetap_webhook_handler.py, so both modes return the same data.
+Reads use Django's async ORM; the webhook's writes need transactions, which
+the async ORM does not support, so they run through sync_to_async.
+"""
+import functools
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from .models import CheckinQueueItem
+from .onetap_webhook_handler import debug_logger, handle_onetap_payload, webhook_status
+from .scoping import get_scope
+from .stats_cache import async_cached_stats
+from .views import (
+    attendance_overview_query,
+    overview_entry,
+    participating_students_query,
+    total_students_query,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def api_response(data, status=200):
+    """A JsonResponse rendered like DRF's, keeping ``data`` for the stats cache."""
+    response = JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+    response.data = data
+    return response
+
+
+def require_method(method):
+    """`require_GET`/`require_POST` for async views, which Django's decorators do not support before 5.0."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != method:
+                return HttpResponseNotAllowed([method])
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def csrf_exempt(view):
+    # Django's csrf_exempt wraps the view in a sync function before 5.0
+    view.csrf_exempt = True
+    return view
+
+
+def _authenticate(request):
+    # Loads the user and their admin scope while we are on a sync thread
+    if not request.user or not request.user.is_authenticated:
+        return False
+    get_scope(request)
+    return True
+
+def _is_staff(request):
+    try:
+        return bool(request.user and request.user.is_staff)
+    except APIException:
+        # A bad token on this public endpoint is treated as anonymous
+        return False
+
+def drf_request(request):
+    return Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+
+def async_api_view(view):
+    """
+    Wrap an async view in DRF's authentication and an IsAuthenticated check.
+    The view receives a DRF Request whose user and scope are already loaded.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = drf_request(request)
+        try:
+            authenticated = await sync_to_async(_authenticate)(request)
+        except APIException as e:
+            return api_response({'detail': e.detail}, status=e.status_code)
+        if not authenticated:
+            return api_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_method('GET')
+@async_api_view
+@async_cached_stats('total_students')
+async def total_students(request):
+    try:
+        students = await sync_to_async(total_students_query)(request)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    return api_response({'count': await students.acount()})
+
+@require_method('GET')
+@async_api_view
+@async_cached_stats('participating_students')
+async def participating_students(request):
+    try:
+        students = await sync_to_async(participating_students_query)(request)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    return api_response({'count': await students.acount()})
+
+@require_method('GET')
+@async_api_view
+@async_cached_stats('attendance_overview')
+async def attendance_overview(request):
+    try:
+        attendance_data = await sync_to_async(attendance_overview_query)(request)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    return api_response([overview_entry(entry) async for entry in attendance_data])
+
+
+@csrf_exempt
+@require_method('POST')
+async def onetap_webhook_handler(request):
+    """The OneTap webhook (see api.onetap_webhook_handler.onetap_webhook_handler)."""
+    body = request.body
+    debug_logger.info(f"REQUEST {request.method} {request.path} Headers={dict(request.headers)} Body={body.decode('utf-8', errors='replace')}")
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError as e:
+        debug_logger.error(f"Invalid JSON payload: {str(e)} Body={body.decode('utf-8', errors='replace')}")
+        return api_response({'error': 'Invalid JSON payload'}, status=400)
+    try:
+        data, status = await sync_to_async(handle_onetap_payload)(payload)
+    except Exception as e:
+        logger.error(f"OneTap webhook error: {str(e)}", exc_info=True)
+        debug_logger.error(f"ERROR {str(e)}", exc_info=True)
+        return api_response({'error': 'Internal server error', 'details': str(e)}, status=500)
+    return api_response(data, status=status)
+
+@require_method('GET')
+async def onetap_webhook_status(request):
+    staff = await sync_to_async(_is_staff)(drf_request(request))
+    return api_response({
+        **webhook_status(staff=staff),
+        'queue': await CheckinQueueItem.astats(),
+    })
@@ -0,0 +1,6 @@
+from django.db.backends.postgresql import base
+from api.database import InstrumentedConnection
+
+
+class DatabaseWrapper(InstrumentedConnection, base.DatabaseWrapper):
+    """PostgreSQL with connect counts and wait times (see api/database.py)."""
@@ -0,0 +1,65 @@
+"""
+Deferred counter maintenance.
+
+Counter deltas are passed to ``add`` together with the function that writes
+them. Outside a transaction they are written immediately. Inside one, deltas
+are summed per key and written once when the transaction commits, so a bulk
+operation costs one write per key instead of one per row. Deltas recorded in
+a savepoint that is rolled back are discarded with it.
+"""
+import threading
+from collections import Counter
+from django.db import transaction
+
+_local = threading.local()
+
+
+class _PendingDeltas:
+    """Deltas buffered for one transaction (or savepoint) level."""
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+        self.deltas = {}
+
+    def add(self, apply, deltas):
+        self.deltas.setdefault(apply, Counter()).update(deltas)
+
+    def is_scheduled(self, connection):
+        return any(entry[1] is self for entry in connection.run_on_commit)
+
+    def __call__(self):
+        if self.registry.get(self.key) is self:
+            del self.registry[self.key]
+        for apply, deltas in self.deltas.items():
+            deltas = {key: delta for key, delta in deltas.items() if delta}
+            if deltas:
+                apply(deltas)
+
+
+def add(apply, deltas, using=None):
+    """
+    Record counter changes. ``deltas`` maps a key to an integer change and
+    ``apply`` is called with a mapping of the summed, non-zero deltas.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        apply(deltas)
+        return
+
+    registry = getattr(_local, 'pending', None)
+    if registry is None:
+        registry = _local.pending = {}
+    key = (connection.alias, tuple(connection.savepoint_ids))
+    pending = registry.get(key)
+    if pending is None or not pending.is_scheduled(connection):
+        # Drop buffers whose transaction was rolled back
+        for stale_key, stale in list(registry.items()):
+            if stale_key[0] == connection.alias and not stale.is_scheduled(connection):
+                del registry[stale_key]
+        pending = registry[key] = _PendingDeltas(registry, key)
+        transaction.on_commit(pending, using=using)
+    pending.add(apply, deltas)
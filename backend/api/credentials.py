@@ -0,0 +1,118 @@
+"""
+Bulk password hashing.
+
+Every PBKDF2 hash costs hundreds of thousands of iterations on one core, so
+setting passwords one user at a time is the slow part of resetting every
+account or creating users in bulk. `password_hashes` spreads the work over a
+process pool (PASSWORD_HASH_WORKERS processes, default one per core), which
+is started on first use and kept for later batches.
+
+Accounts given the default password (`changeme!` for new students and
+resets) can share a single hash when SHARE_DEFAULT_PASSWORD_HASH is on: the
+password is public anyway, so a shared salt reveals nothing new, and the
+hash is computed once per process. Any other password is salted per account.
+Turn the setting off to salt default passwords separately too. Either way
+Django re-hashes a user's password with a fresh salt when they log in and
+change it.
+"""
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+DEFAULT_PASSWORD = 'changeme!'
+
+# Below this many hashes the pool costs more to start than it saves
+POOL_THRESHOLD = 8
+
+
+def share_default_hash():
+    return getattr(settings, 'SHARE_DEFAULT_PASSWORD_HASH', True)
+
+def worker_count():
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def _init_worker():
+    # Worker processes started with "spawn" need Django configured to find the hashers
+    import django
+    django.setup()
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _get_pool(workers):
+    """The process pool, started once and reused by later calls with the same worker count."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            _pool_workers = workers
+        return _pool
+
+def _hash_many(passwords, workers):
+    if workers <= 1 or len(passwords) < POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    pool = _get_pool(workers)
+    return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_default_hash():
+    return make_password(DEFAULT_PASSWORD)
+
+def default_password_hash():
+    """The hash to store for a new account with the default password."""
+    return _shared_default_hash() if share_default_hash() else make_password(DEFAULT_PASSWORD)
+
+
+def password_hashes(passwords, share=None, workers=None):
+    """
+    Hash a list of raw passwords, returning the encoded hashes in the same
+    order. With ``share`` (default SHARE_DEFAULT_PASSWORD_HASH), entries with
+    the default password share one hash; every other entry gets its own salt.
+    None entries get an unusable password.
+    """
+    passwords = list(passwords)
+    share = share_default_hash() if share is None else share
+    workers = workers or worker_count()
+
+    def is_shared(password):
+        return share and password == DEFAULT_PASSWORD
+
+    hashed = iter(_hash_many(
+        [password for password in passwords if password is not None and not is_shared(password)], workers
+    ))
+    return [
+        make_password(None) if password is None
+        # The default password's hash is kept for the life of the process
+        else _shared_default_hash() if is_shared(password)
+        else next(hashed)
+        for password in passwords
+    ]
+
+
+def set_passwords(users, password, share=None, workers=None, batch_size=500):
+    """
+    Set ``password`` on a list of users with one pooled hashing pass and a
+    bulk_update. Returns the number of users updated.
+    """
+    users = list(users)
+    for user, hashed in zip(users, password_hashes([password] * len(users), share, workers)):
+        user.password = hashed
+    User.objects.bulk_update(users, ['password'], batch_size=batch_size)
+    return len(users)
+
+
+def benchmark(count, password=DEFAULT_PASSWORD, share=False, workers=None):
+    """Hash ``count`` passwords and return users per second."""
+    started = time.perf_counter()
+    password_hashes([password] * count, share=share, workers=workers)
+    return count / (time.perf_counter() - started)
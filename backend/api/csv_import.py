@@ -0,0 +1,465 @@
+"""
+Chunked, transactional CSV import engine for the `import_*` management commands.
+
+A command subclasses ImportCommand and maps rows onto models with two hooks:
+`parse_row` turns one CSV row into a record (raising RowError to reject it)
+and `import_chunk` writes a list of (row number, record) pairs. The file is
+streamed `--chunk-size` rows at a time and every chunk is written in its own
+transaction, so lookups are one IN query per chunk and writes are bulk_create
+calls. After each committed chunk the next row number is saved to a
+checkpoint file next to the CSV; `--resume` picks up from there after a
+failure. `--dry-run` runs the whole import in one transaction that is rolled
+back at the end.
+
+bulk_create skips model signals, so the write helpers below do what the
+receivers would have done: attendance goes through
+record_attendance_changes, new events are linked to their primary
+organization and visibility rows, and the dashboard stats cache is
+invalidated.
+"""
+import csv
+import functools
+import os
+from collections import Counter
+from datetime import datetime
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from .models import Attendance, Event, EventVisibility, Organization, Student, StudentSearchGram
+from .models.attendance import record_attendance_changes
+from .event_matcher import event_classification_changed
+from .credentials import password_hashes
+from .stats_cache import invalidate
+from .terms import current_term
+
+
+class RowError(Exception):
+    """Raised by `ImportCommand.parse_row` to reject a row."""
+
+
+def read_chunks(path, chunk_size, start_row=2):
+    """Yield lists of (row number, row dict), skipping rows before ``start_row``. The header is row 1."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        chunk = []
+        for row_num, row in enumerate(csv.DictReader(file), start=2):
+            if row_num < start_row:
+                continue
+            chunk.append((row_num, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class ImportCommand(BaseCommand):
+    """Base class for CSV import commands; see the module docstring."""
+    chunk_size = 1000
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+        parser.add_argument('--chunk-size', type=int, default=self.chunk_size, help=f'Rows per transaction (default: {self.chunk_size})')
+        parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
+        parser.add_argument('--resume', action='store_true', help='Continue after the last chunk committed by a previous run')
+        parser.add_argument('--start-row', type=int, help='First CSV row to import (the header is row 1)')
+        self.add_import_arguments(parser)
+
+    def add_import_arguments(self, parser):
+        pass
+
+    # Hooks for the concrete commands
+
+    def prepare(self):
+        """Called once before the first chunk, e.g. to look up a target event."""
+
+    def parse_row(self, row):
+        """Return a record for ``row``, None to skip it silently, or raise RowError."""
+        raise NotImplementedError
+
+    def import_chunk(self, records):
+        """Write a list of (row number, record) pairs. Runs inside a transaction."""
+        raise NotImplementedError
+
+    def summary(self):
+        """Lines for the final report."""
+        return [f'{label.capitalize()}: {count}' for label, count in self.counts.items()]
+
+    # Helpers for the hooks
+
+    def reject(self, row_num, message):
+        self.counts['errors'] += 1
+        self.stdout.write(self.style.WARNING(f'Row {row_num}: {message}'))
+
+    def note(self, row_num, message):
+        if self.verbosity > 1:
+            self.stdout.write(f'Row {row_num}: {message}')
+
+    # Engine
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options['csv_file'])
+        if not os.path.exists(path):
+            raise CommandError(f'CSV file "{path}" does not exist')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        self.options = options
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        self.counts = Counter()
+        self.checkpoint_path = f'{path}.checkpoint'
+        start_row = self.start_row(options)
+
+        self.stdout.write(f'Importing from: {path} (starting at row {start_row})')
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No changes will be made'))
+            # One outer transaction so later chunks see what earlier chunks would have written
+            with transaction.atomic():
+                self.run(path, start_row)
+                transaction.set_rollback(True)
+        else:
+            self.run(path, start_row)
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+        self.stdout.write(self.style.SUCCESS('\nImport completed!\n' + '\n'.join(self.summary())))
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('\nThis was a dry run. Use without --dry-run to make actual changes.'))
+
+    def start_row(self, options):
+        if options['start_row'] is not None:
+            return max(2, options['start_row'])
+        if options['resume']:
+            try:
+                with open(self.checkpoint_path) as file:
+                    return int(file.read().strip())
+            except (OSError, ValueError):
+                self.stdout.write(self.style.WARNING('No checkpoint found, starting from the first row'))
+        return 2
+
+    def run(self, path, start_row):
+        self.prepare()
+        for chunk in read_chunks(path, self.options['chunk_size'], start_row):
+            first_row, last_row = chunk[0][0], chunk[-1][0]
+            records = []
+            for row_num, row in chunk:
+                try:
+                    record = self.parse_row(row)
+                except RowError as e:
+                    self.reject(row_num, str(e))
+                    continue
+                if record is not None:
+                    records.append((row_num, record))
+
+            try:
+                with transaction.atomic():
+                    if records:
+                        self.import_chunk(records)
+            except Exception as e:
+                resume = '' if self.dry_run else ' Fix the problem and rerun with --resume.'
+                raise CommandError(f'Rows {first_row}-{last_row} failed and were rolled back: {e}.{resume}')
+
+            if not self.dry_run:
+                with open(self.checkpoint_path, 'w') as file:
+                    file.write(str(last_row + 1))
+            progress = ', '.join(f'{label} {count}' for label, count in self.counts.items())
+            self.stdout.write(f'Rows {first_row}-{last_row} done ({progress or "nothing to do"})')
+
+
+def split_name(name):
+    """Split a full name into (first name, rest)."""
+    parts = (name or '').split()
+    return (parts[0] if parts else '', ' '.join(parts[1:]))
+
+def _invalidate_stats_on_commit(archived=False):
+    transaction.on_commit(functools.partial(invalidate, archived))
+
+
+def students_by_email(emails):
+    return {student.email: student for student in Student.objects.filter(email__in=set(emails))}
+
+def students_by_username(usernames):
+    """Students whose user account has one of ``usernames``."""
+    return {
+        student.user.username: student
+        for student in Student.objects.select_related('user').filter(user__username__in=set(usernames))
+    }
+
+def create_students(people, password=None, is_active=True):
+    """
+    Create users and student profiles for a dict of email -> dict with
+    first_name, last_name and optionally username (defaults to the email
+    handle). Taken usernames get a _1, _2, ... suffix; existing users with
+    the email are reused. Returns a dict of email -> Student.
+    """
+    if not people:
+        return {}
+    users = {user.email: user for user in User.objects.filter(email__in=people)}
+    handles = {
+        email: person.get('username') or email.split('@')[0]
+        for email, person in people.items() if email not in users
+    }
+    taken = set(User.objects.filter(username__in=set(handles.values())).values_list('username', flat=True))
+    # Only handles that are taken or repeated need suffixes, so only those are searched by prefix
+    repeated = [handle for handle, count in Counter(handles.values()).items() if count > 1 or handle in taken]
+    for i in range(0, len(repeated), 100):
+        prefix_filter = Q(pk__in=[])
+        for handle in repeated[i:i + 100]:
+            prefix_filter |= Q(username__startswith=f"{handle}_")
+        taken.update(User.objects.filter(prefix_filter).values_list('username', flat=True))
+
+    new_usernames = {}
+    for email, handle in handles.items():
+        username = handle
+        counter = 1
+        while username in taken:
+            username = f"{handle}_{counter}"
+            counter += 1
+        taken.add(username)
+        new_usernames[email] = username
+
+    if new_usernames:
+        # bulk_create skips the post_save signal, so student profiles are created below
+        hashes = password_hashes([password] * len(new_usernames))
+        User.objects.bulk_create([
+            User(
+                username=username,
+                email=email,
+                password=hashed,
+                first_name=people[email]['first_name'],
+                last_name=people[email]['last_name'],
+                is_active=is_active
+            )
+            for (email, username), hashed in zip(new_usernames.items(), hashes)
+        ], batch_size=500)
+        users.update(
+            (user.email, user) for user in User.objects.filter(username__in=new_usernames.values())
+        )
+
+    profiles = {student.user_id: student for student in Student.objects.filter(user__in=users.values())}
+    Student.objects.bulk_create([
+        Student(
+            user=user,
+            first_name=people[email]['first_name'],
+            last_name=people[email]['last_name'],
+            email=email,
+            username=user.username
+        )
+        for email, user in users.items() if user.id not in profiles
+    ], batch_size=500)
+    profiles.update(
+        (student.user_id, student) for student in Student.objects.filter(user__in=users.values())
+    )
+    # bulk_create skips the receivers that maintain the search index
+    StudentSearchGram.index_students(profiles[user.id].id for user in users.values())
+    _invalidate_stats_on_commit()
+    return {email: profiles[user.id] for email, user in users.items()}
+
+
+def create_events(events):
+    """bulk_create unsaved Event instances, doing the work of the Event save receivers."""
+    if not events:
+        return events
+    organization_ids = dict(Organization.objects.filter(
+        name__in={event.organization for event in events}
+    ).values_list('name', 'id'))
+    for event in events:
+        event.primary_organization_id = organization_ids.get(event.organization)
+    Event.objects.bulk_create(events, batch_size=500)
+    for event in events:
+        event_classification_changed(event)
+    EventVisibility.sync_events([event.id for event in events])
+    _invalidate_stats_on_commit(any(event.date < current_term().start for event in events))
+    return events
+
+
+def create_attendance(entries):
+    """
+    Create attendance for (student_id, event_id, checked_in_at) entries,
+    skipping pairs that already exist. A checked_in_at of None means now.
+    Returns the set of (student_id, event_id) pairs created.
+    """
+    wanted = {}
+    for student_id, event_id, checked_in_at in entries:
+        wanted.setdefault((student_id, event_id), checked_in_at)
+    if not wanted:
+        return set()
+    existing = set(Attendance.objects.filter(
+        student_id__in={student_id for student_id, _ in wanted},
+        event_id__in={event_id for _, event_id in wanted}
+    ).values_list('student_id', 'event_id'))
+
+    new = [
+        Attendance(student_id=student_id, event_id=event_id)
+        for student_id, event_id in wanted if (student_id, event_id) not in existing
+    ]
+    if not new:
+        return set()
+    Attendance.objects.bulk_create(new, batch_size=500)
+
+    # checked_in_at is auto_now_add, so explicit check-in times are written afterwards
+    stamped = []
+    for attendance in new:
+        checked_in_at = wanted[(attendance.student_id, attendance.event_id)]
+        if checked_in_at is not None:
+            attendance.checked_in_at = checked_in_at
+            stamped.append(attendance)
+    if stamped:
+        if stamped[0].pk is None:
+            ids = {
+                (student_id, event_id): row_id
+                for row_id, student_id, event_id in Attendance.objects.filter(
+                    student_id__in={attendance.student_id for attendance in stamped},
+                    event_id__in={attendance.event_id for attendance in stamped}
+                ).values_list('id', 'student_id', 'event_id')
+            }
+            for attendance in stamped:
+                attendance.pk = ids[(attendance.student_id, attendance.event_id)]
+        Attendance.objects.bulk_update(stamped, ['checked_in_at'], batch_size=500)
+
+    # bulk_create does not send post_save, so update the attendance counters here
+    pairs = [(attendance.student_id, attendance.event_id) for attendance in new]
+    record_attendance_changes(pairs, checked_in_at=[attendance.checked_in_at for attendance in new])
+    return set(pairs)
+
+
+class CheckinExportCommand(ImportCommand):
+    """
+    Base for commands importing OneTap check-in exports: one row per
+    participant with name, email, A-Number and check-in date. Subclasses map
+    the column names and say which event each check-in belongs to; students
+    are matched by email (and with `match_a_number`, first by A-Number as the
+    account username) and created when missing.
+    """
+    columns = {
+        'checked_in': 'Checked In',
+        'checkin_date': 'Check-in Date',
+        'name': 'Name',
+        'email': 'Email',
+        'a_number': 'A-Number',
+    }
+    match_a_number = False
+
+    def event_name(self, row, record):
+        """Name of the event the check-in in ``row`` (parsed into ``record``) was for."""
+        raise NotImplementedError
+
+    def new_event(self, name, records):
+        """An unsaved Event called ``name`` for the check-ins in ``records``."""
+        raise NotImplementedError
+
+    def event_organization(self):
+        raise NotImplementedError
+
+    def parse_row(self, row):
+        columns = self.columns
+        if row[columns['checked_in']] != 'Yes' or not row[columns['checkin_date']]:
+            return None
+        checkin_date_str = row[columns['checkin_date']]
+        try:
+            # Parse date like "2025-08-27 07:11PM -06:00"
+            checkin_date = datetime.strptime(checkin_date_str, '%Y-%m-%d %I:%M%p %z')
+        except ValueError as e:
+            raise RowError(f'Could not parse date: {checkin_date_str} - {e}')
+        record = {
+            'name': row[columns['name']],
+            'email': row[columns['email']],
+            'a_number': row[columns['a_number']],
+            'checkin_date': checkin_date,
+            'date_only': checkin_date.date(),
+        }
+        record['event_name'] = self.event_name(row, record)
+        if not record['event_name']:
+            return None
+        return record
+
+    def import_chunk(self, records):
+        events = self.resolve_events([record for _, record in records])
+        students = self.resolve_students([record for _, record in records])
+        created = create_attendance(
+            (students[record['email']].id, events[record['event_name']].id, record['checkin_date'])
+            for _, record in records
+        )
+        self.counts['attendance records created'] += len(created)
+        self.counts['attendance records already existing'] += len(
+            {(students[record['email']].id, events[record['event_name']].id) for _, record in records}
+        ) - len(created)
+
+    def prepare(self):
+        self.seen_events = set()
+
+    def resolve_events(self, records):
+        names = {record['event_name'] for record in records}
+        events = {}
+        for event in Event.objects.filter(name__in=names, organization=self.event_organization()).order_by('id'):
+            events.setdefault(event.name, event)
+        # Events from earlier chunks were counted when first seen
+        self.counts['events already existing'] += len(events.keys() - self.seen_events)
+        self.seen_events.update(names)
+
+        missing = sorted(names - events.keys())
+        new_events = create_events([
+            self.new_event(name, [record for record in records if record['event_name'] == name])
+            for name in missing
+        ])
+        for event in new_events:
+            if self.verbosity > 1:
+                self.stdout.write(f'Created event: {event.name}')
+            events[event.name] = event
+        self.counts['events created'] += len(new_events)
+        return events
+
+    def resolve_students(self, records):
+        people = {}
+        for record in records:
+            people.setdefault(record['email'], record)
+
+        students = {}
+        if self.match_a_number:
+            by_username = students_by_username(
+                person['a_number'] for person in people.values() if person['a_number']
+            )
+            for email, person in people.items():
+                if person['a_number'] in by_username:
+                    students[email] = by_username[person['a_number']]
+        found = students_by_email(email for email in people if email not in students)
+        students.update(found)
+
+        # Fill in missing A-Numbers and names on existing students
+        updated = []
+        for email, student in students.items():
+            person = people[email]
+            changed = False
+            if person['a_number'] and not student.username:
+                student.username = person['a_number']
+                changed = True
+            if person['name'] and (not student.first_name or not student.last_name):
+                student.first_name, student.last_name = split_name(person['name'])
+                changed = True
+            if changed:
+                updated.append(student)
+        if updated:
+            Student.objects.bulk_update(updated, ['username', 'first_name', 'last_name'], batch_size=500)
+            StudentSearchGram.index_students(student.id for student in updated)
+        self.counts['students updated'] += len(updated)
+
+        new_people = {}
+        for email, person in people.items():
+            if email not in students:
+                first_name, last_name = split_name(person['name'])
+                new_people[email] = {
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'username': person['a_number'] or email.split('@')[0],
+                }
+        students.update(create_students(new_people))
+        self.counts['students created'] += len(new_people)
+        return students
+
+    def summary(self):
+        labels = [
+            'events created', 'events already existing', 'students created', 'students updated',
+            'attendance records created', 'attendance records already existing', 'errors'
+        ]
+        return [f'{label.capitalize()}: {self.counts[label]}' for label in labels]
@@ -0,0 +1,129 @@
+"""
+Connection setup for the production database.
+
+With SQLITE_TUNING on, every new SQLite connection switches to WAL
+journaling (readers no longer block the writer), `synchronous=NORMAL`
+(fsync at checkpoints instead of every commit, still safe in WAL mode), a
+memory-mapped file and a larger page cache; settings.py raises the busy
+timeout so a writer waits for the lock instead of failing with "database is
+locked".
+
+SQLite still allows one writer at a time, and a transaction that read
+before writing fails at once (without waiting) if another worker committed
+in between. `serialized_writes` makes webhook writers take turns on a lock
+file next to the database, across gunicorn workers and the queue worker,
+before they start their transactions. It does nothing on other databases
+or with the tuning off.
+
+On PostgreSQL, the `api.backends.postgresql` engine (see
+production_settings.py) times every connect: a new connection, or with a
+pool the wait for a free one. `connection_stats` reports this worker's
+counts next to its request count, under `database` in the OneTap status
+endpoint (for staff users), so CONN_MAX_AGE and the pool size can be checked against the
+number of workers.
+"""
+import contextlib
+import os
+import threading
+import time
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers rely on the busy timeout alone
+    fcntl = None
+
+_local = threading.local()
+_metrics_lock = threading.Lock()
+_metrics = {'requests': 0, 'opened': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+
+
+def sqlite_pragmas():
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': getattr(settings, 'SQLITE_MMAP_SIZE', 268435456),
+        # Negative sizes are in KiB
+        'cache_size': -getattr(settings, 'SQLITE_CACHE_SIZE_KIB', 65536),
+    }
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False):
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+def _lock_path(using):
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_TUNING', False) or fcntl is None:
+        return None
+    if connection.is_in_memory_db():
+        return None
+    return f"{connection.settings_dict['NAME']}.write-lock"
+
+@contextlib.contextmanager
+def serialized_writes(using=DEFAULT_DB_ALIAS):
+    """Hold the database's write lock for the block; nested blocks reuse it."""
+    held = getattr(_local, 'held', set())
+    _local.held = held
+    path = _lock_path(using)
+    if path is None or using in held:
+        yield
+        return
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held.add(using)
+        try:
+            yield
+        finally:
+            held.discard(using)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class InstrumentedConnection:
+    """Mixed into a backend's DatabaseWrapper to time its connects."""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        record_connect(time.perf_counter() - started)
+
+def record_connect(seconds):
+    with _metrics_lock:
+        _metrics['opened'] += 1
+        _metrics['wait_seconds'] += seconds
+        _metrics['max_wait_seconds'] = max(_metrics['max_wait_seconds'], seconds)
+
+@receiver(request_finished)
+def count_request(sender, **kwargs):
+    with _metrics_lock:
+        _metrics['requests'] += 1
+
+
+def connection_stats(using=DEFAULT_DB_ALIAS):
+    """This worker's connect count and wait time, and the connection settings they depend on."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    settings_dict = connections[using].settings_dict
+    stats = {
+        'pid': os.getpid(),
+        'requests': metrics['requests'],
+        'opened': metrics['opened'],
+        'opened_per_request': metrics['opened'] / metrics['requests'] if metrics['requests'] else 0,
+        'avg_wait_ms': metrics['wait_seconds'] / metrics['opened'] * 1000 if metrics['opened'] else 0,
+        'max_wait_ms': metrics['max_wait_seconds'] * 1000,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+    }
+    pool = getattr(connections[using], 'pool', None)
+    if pool is not None:
+        # psycopg_pool's counters (Django 5.1+ with OPTIONS['pool'])
+        stats['pool'] = pool.get_stats()
+    return stats
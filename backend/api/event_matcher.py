@@ -0,0 +1,131 @@
+"""
+Classify OneTap event names by organization and event type.
+
+Known organization names (from the Organization table and existing events)
+and event types are compiled into Aho-Corasick automata, so classifying a
+name costs time proportional to its length rather than to the number of
+organizations and types. The compiled classifier is cached per process and
+rebuilt when organizations or events add or remove names, or after a TTL so
+changes made by other workers are picked up.
+"""
+import threading
+import time
+from collections import deque
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Event, Organization
+
+DEFAULT_ORGANIZATION = 'ASC'
+DEFAULT_EVENT_TYPE = 'General'
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher over a dict of pattern -> value."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern, value in patterns.items():
+            if pattern:
+                self._add(pattern, value)
+        self._link()
+
+    def _add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append((len(pattern), value))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def best_match(self, text):
+        """Return the value of the longest pattern found in ``text`` (leftmost on ties), or None."""
+        best = None
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.output[state]:
+                start = end - length + 1
+                if best is None or length > best[0] or (length == best[0] and start < best[1]):
+                    best = (length, start, value)
+        return best[2] if best else None
+
+
+class EventClassifier:
+    def __init__(self, organizations, event_types):
+        self.organizations = set(organizations)
+        self.event_types = set(event_types)
+        # Organization names match case-sensitively, event types case-insensitively
+        self._organizations = AhoCorasick({name: name for name in self.organizations if name})
+        self._event_types = AhoCorasick({name.lower(): name for name in sorted(self.event_types, reverse=True) if name})
+
+    @classmethod
+    def load(cls):
+        organizations = set(Organization.objects.values_list('name', flat=True))
+        organizations.update(Event.objects.values_list('organization', flat=True).distinct())
+        event_types = set(Event.objects.values_list('event_type', flat=True).distinct())
+        return cls(organizations, event_types)
+
+    def classify(self, event_name):
+        """Return (organization, event_type) for an event name, falling back to the defaults."""
+        organization = self._organizations.best_match(event_name) or DEFAULT_ORGANIZATION
+        event_type = self._event_types.best_match(event_name.lower()) or DEFAULT_EVENT_TYPE
+        return organization, event_type
+
+
+_classifier = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+def get_classifier():
+    global _classifier, _built_at
+    ttl = getattr(settings, 'EVENT_CLASSIFIER_TTL', 300)
+    with _lock:
+        if _classifier is None or time.monotonic() - _built_at > ttl:
+            _classifier = EventClassifier.load()
+            _built_at = time.monotonic()
+        return _classifier
+
+def invalidate_classifier():
+    global _classifier
+    with _lock:
+        _classifier = None
+
+def event_classification_changed(event):
+    """Invalidate the classifier if ``event`` introduces a new organization or event type."""
+    classifier = _classifier
+    if classifier is not None and (
+        event.organization not in classifier.organizations
+        or event.event_type not in classifier.event_types
+    ):
+        invalidate_classifier()
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_delete, sender=Event)
+def organization_changed(sender, **kwargs):
+    invalidate_classifier()
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    event_classification_changed(instance)
@@ -0,0 +1,143 @@
+"""
+In-process index from check-in identity keys to student ids.
+
+OneTap check-ins identify a student by email, A-number or name, and the same
+few hundred students check in over and over. Each worker keeps a bounded LRU
+of the keys that resolved to a student so a repeat check-in costs a single
+primary-key lookup. Entries are dropped when the Student or User they were
+derived from is saved or deleted in this process, and expire after a TTL so
+changes made by other workers are picked up. A cached id is only a hint:
+callers re-check that the fetched student still matches the key, and try
+each key (email, then A-number, then name) in the index and then the
+database before moving to the next, so a cached lower-priority key never
+beats a higher-priority match.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Student
+
+
+def email_key(email):
+    return ('email', email)
+
+def a_number_key(a_number):
+    return ('a_number', a_number.lower())
+
+def name_key(first_name, last_name):
+    return ('name', first_name.lower(), last_name.lower())
+
+def student_matches(student, key):
+    """Whether ``student`` (fetched with its user) still matches ``key``."""
+    if key[0] == 'email':
+        return student.email == key[1]
+    if key[0] == 'a_number':
+        return student.user.username == key[1]
+    return (student.first_name.lower(), student.last_name.lower()) == key[1:]
+
+
+def cached_student(key):
+    """The student the index holds for ``key``, fetched with its user, or None if it is not cached or no longer matches."""
+    student_id = student_index.get(key)
+    if student_id is None:
+        return None
+    student = Student.objects.select_related('user').filter(id=student_id).first()
+    if student and student_matches(student, key):
+        return student
+    student_index.discard([key])
+    return None
+
+
+class StudentIdentityIndex:
+    def __init__(self, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_student = {}
+        # Kept only while the student has entries, so bounded by maxsize like them
+        self._student_by_user = {}
+        self._user_by_student = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached student id for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, student):
+        student_id = student.id
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._student_by_user[student.user_id] = student_id
+            self._user_by_student[student_id] = student.user_id
+            self._entries[key] = (student_id, time.monotonic() + self.ttl)
+            self._keys_by_student.setdefault(student_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, keys=(), student_id=None, user_id=None):
+        """Drop the given keys and every key that resolves to the given student (or user's student)."""
+        with self._lock:
+            if student_id is None:
+                student_id = self._student_by_user.get(user_id)
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+            for key in list(self._keys_by_student.get(student_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_student.clear()
+            self._student_by_user.clear()
+            self._user_by_student.clear()
+
+    def stats(self):
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _remove(self, key):
+        student_id, _ = self._entries.pop(key)
+        keys = self._keys_by_student.get(student_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_student[student_id]
+                user_id = self._user_by_student.pop(student_id, None)
+                if self._student_by_user.get(user_id) == student_id:
+                    del self._student_by_user[user_id]
+
+
+student_index = StudentIdentityIndex(
+    maxsize=getattr(settings, 'STUDENT_IDENTITY_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'STUDENT_IDENTITY_CACHE_TTL', 300),
+)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_identity(sender, instance, **kwargs):
+    keys = [email_key(instance.email), name_key(instance.first_name, instance.last_name)]
+    if instance.username:
+        keys.append(a_number_key(instance.username))
+    student_index.discard(keys, student_id=instance.id)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_identity(sender, instance, **kwargs):
+    student_index.discard([a_number_key(instance.username), email_key(instance.email)], user_id=instance.id)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from api.models import Event, EventVisibility
+
+
+class Command(BaseCommand):
+    help = 'Link events to their primary Organization and rebuild the event visibility table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of events resynced per batch (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Linking primary organizations...')
+        Event.link_primary_organizations()
+
+        self.stdout.write('Rebuilding event visibility...')
+        event_count = EventVisibility.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Resynced {event_count} events ({EventVisibility.objects.count()} visibility rows)'
+        ))
+
+        # Events whose organization has no Organization row block making the foreign key required
+        unlinked = (
+            Event.objects.filter(primary_organization__isnull=True)
+            .values('organization').annotate(count=Count('id')).order_by('organization')
+        )
+        for row in unlinked:
+            self.stdout.write(self.style.WARNING(
+                f'{row["count"]} events use organization {row["organization"]!r}, which has no Organization row'
+            ))
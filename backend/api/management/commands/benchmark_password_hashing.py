@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from api.credentials import benchmark, worker_count
+
+
+class Command(BaseCommand):
+    help = 'Measure users per second for serial, pooled and shared password hashing (no database writes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=64, help='Passwords to hash per run (default: 64)')
+        parser.add_argument('--workers', type=int, help='Hashing processes for the pooled run (default: PASSWORD_HASH_WORKERS, or one per core)')
+
+    def handle(self, *args, **options):
+        count = options['users']
+        workers = options['workers'] or worker_count()
+        self.stdout.write(f'Hashing {count} passwords')
+
+        runs = [
+            ('serial, unique salts', benchmark(count, share=False, workers=1)),
+            (f'{workers} processes, unique salts', benchmark(count, share=False, workers=workers)),
+            ('shared default hash', benchmark(count, share=True, workers=workers)),
+        ]
+        for label, rate in runs:
+            self.stdout.write(f'{label:>32}: {rate:10.1f} users/s')
+        self.stdout.write(self.style.SUCCESS(f'Pooled speedup: {runs[1][1] / runs[0][1]:.1f}x'))
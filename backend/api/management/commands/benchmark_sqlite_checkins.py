@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+from api.onetap_webhook_handler import handle_onetap_payload
+
+
+def checkin_payload(worker, number, events):
+    now = timezone.now()
+    return {
+        'event': 'participant.checkin',
+        'data': {
+            'participant': {'checkInDate': now.isoformat()},
+            'profile': {
+                'name': f'Load Tester{worker}x{number}',
+                'email': f'loadtest-{worker}-{number}@usu.edu',
+                'customFields': {'A-Number': f'A9{worker:03d}{number:04d}'},
+            },
+            'list': {'name': f'Load Test Event {number % events}', 'date': now.replace(hour=12).isoformat()},
+        },
+    }
+
+def run_worker(database, tuned, worker, count, events):
+    """Post ``count`` check-ins through the webhook handler in a forked process. Returns (succeeded, locked, failed)."""
+    settings.SQLITE_TUNING = tuned
+    settings.ONETAP_QUEUE_ENABLED = False
+    options = {'timeout': settings.SQLITE_BUSY_TIMEOUT} if tuned else {}
+    connection.settings_dict = {**connection.settings_dict, 'NAME': database, 'OPTIONS': options}
+    succeeded = locked = failed = 0
+    for number in range(count):
+        try:
+            _, status = handle_onetap_payload(checkin_payload(worker, number, events))
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+            continue
+        if status < 300:
+            succeeded += 1
+        else:
+            failed += 1
+    connection.close()
+    return succeeded, locked, failed
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent webhook check-ins per second on copies of the SQLite database, with and without SQLITE_TUNING'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent processes, like gunicorn workers (default: 4)')
+        parser.add_argument('--checkins', type=int, default=100, help='Check-ins per worker (default: 100)')
+        parser.add_argument('--events', type=int, default=3, help='Events the check-ins are spread over (default: 3)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'The default database is {connection.vendor}, not SQLite')
+        workers, count = options['workers'], options['checkins']
+        self.stdout.write(f'Posting {workers} x {count} check-ins')
+
+        runs = []
+        with tempfile.TemporaryDirectory() as directory:
+            for label, tuned in (('default settings', False), ('SQLITE_TUNING', True)):
+                database = os.path.join(directory, f"{'tuned' if tuned else 'default'}.sqlite3")
+                self.copy_database(database, 'WAL' if tuned else 'DELETE')
+                # Forked workers must not share the parent's connection
+                connections.close_all()
+                started = time.perf_counter()
+                with multiprocessing.get_context('fork').Pool(workers) as pool:
+                    results = pool.starmap(run_worker, [(database, tuned, worker, count, options['events']) for worker in range(workers)])
+                elapsed = time.perf_counter() - started
+                succeeded, locked, failed = (sum(column) for column in zip(*results))
+                runs.append((label, succeeded / elapsed))
+                self.stdout.write(
+                    f'{label:>20}: {succeeded / elapsed:8.1f} check-ins/s, '
+                    f'{locked} "database is locked", {failed} failed, {elapsed:.1f}s'
+                )
+
+        if runs[0][1]:
+            self.stdout.write(self.style.SUCCESS(f'Tuned throughput: {runs[1][1] / runs[0][1]:.1f}x'))
+
+    def copy_database(self, path, journal_mode):
+        source = sqlite3.connect(connection.settings_dict['NAME'])
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+            target.execute(f'PRAGMA journal_mode = {journal_mode}')
+        finally:
+            source.close()
+            target.close()
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User, Group
 from api.models import AdminUser
+from api.credentials import DEFAULT_PASSWORD, password_hashes
 import csv
 import io
 
@@ -21,8 +22,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--password',
             type=str,
-            default='changeme!',
-            help='Default password for all faculty members (default: changeme!)',
+            default=DEFAULT_PASSWORD,
+            help=f'Default password for all faculty members (default: {DEFAULT_PASSWORD})',
         )
         parser.add_argument(
             '--dry-run',
@@ -83,6 +84,9 @@ class Command(BaseCommand):
         created_count = 0
         skipped_count = 0
         error_count = 0
+        to_create = []
+        pending_usernames = set()
+        pending_emails = set()
 
         for row in faculty_data:
             username = row['username'].strip()
@@ -91,15 +95,15 @@ class Command(BaseCommand):
             last_name = row['last_name'].strip()
             role = row.get('role', 'Faculty').strip()
 
-            # Check if user already exists
-            if User.objects.filter(username=username).exists():
+            # Check if user already exists (or appears earlier in the CSV)
+            if username in pending_usernames or User.objects.filter(username=username).exists():
                 self.stdout.write(
                     self.style.WARNING(f'Skipping {username} - user already exists')
                 )
                 skipped_count += 1
                 continue
 
-            if User.objects.filter(email=email).exists():
+            if email in pending_emails or User.objects.filter(email=email).exists():
                 self.stdout.write(
                     self.style.WARNING(f'Skipping {email} - email already exists')
                 )
@@ -113,12 +117,20 @@ class Command(BaseCommand):
                 created_count += 1
                 continue
 
+            to_create.append((username, email, first_name, last_name, role))
+            pending_usernames.add(username)
+            pending_emails.add(email)
+
+        # Hash every password up front in one pooled pass
+        hashes = password_hashes([password] * len(to_create))
+
+        for (username, email, first_name, last_name, role), hashed in zip(to_create, hashes):
             try:
                 # Create the user
-                user = User.objects.create_user(
-                    username=username,
-                    email=email,
-                    password=password,
+                user = User.objects.create(
+                    username=User.normalize_username(username),
+                    email=User.objects.normalize_email(email),
+                    password=hashed,
                     first_name=first_name,
                     last_name=last_name,
                     is_active=True
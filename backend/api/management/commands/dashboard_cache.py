@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from api import stats_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss metrics for the dashboard aggregate cache, or invalidate it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Invalidate every cached response')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            stats_cache.invalidate(archived=True)
+            self.stdout.write(self.style.SUCCESS('Dashboard cache invalidated'))
+            return
+        # Counters live in the cache itself, so this is only meaningful for the shared backends
+        for key, value in stats_cache.stats().items():
+            self.stdout.write(f'{key}: {value}')
@@ -1,100 +1,40 @@
-import csv
-import os
 from datetime import datetime
-from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
+from api.csv_import import ImportCommand, RowError, create_events
 from api.models import Event
 
 
-class Command(BaseCommand):
+class Command(ImportCommand):
     help = 'Import events from CSV file'
 
-    def add_arguments(self, parser):
-        parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+    def parse_row(self, row):
+        # Parse the date from M/D/YYYY format
+        date_str = (row.get('date') or '').strip()
+        if not date_str:
+            raise RowError('Empty date, skipping')
+        try:
+            event_date = timezone.make_aware(datetime.strptime(date_str, '%m/%d/%Y'))
+        except ValueError:
+            raise RowError(f'Invalid date format "{date_str}". Expected M/D/YYYY')
 
-    def handle(self, *args, **options):
-        csv_file = options['csv_file']
-        
-        if not os.path.exists(csv_file):
-            raise CommandError(f'CSV file "{csv_file}" does not exist')
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise RowError('Empty name, skipping')
 
-        # Get the absolute path
-        csv_path = os.path.abspath(csv_file)
-        
-        self.stdout.write(f'Importing events from: {csv_path}')
-        
-        imported_count = 0
-        error_count = 0
-        
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 because of header
-                try:
-                    # Debug: Print the row keys to see what's available
-                    if row_num == 2:  # Only print for first row
-                        self.stdout.write(f'Available columns: {list(row.keys())}')
-                    
-                    # Parse the date from M/D/YYYY format
-                    date_str = row.get('date', '').strip()
-                    if not date_str:
-                        self.stdout.write(
-                            self.style.WARNING(f'Row {row_num}: Empty date, skipping')
-                        )
-                        error_count += 1
-                        continue
-                    
-                    # Parse date in M/D/YYYY format
-                    try:
-                        parsed_date = datetime.strptime(date_str, '%m/%d/%Y')
-                        # Convert to timezone-aware datetime (assuming UTC for now)
-                        event_date = timezone.make_aware(parsed_date)
-                    except ValueError:
-                        self.stdout.write(
-                            self.style.ERROR(f'Row {row_num}: Invalid date format "{date_str}". Expected M/D/YYYY')
-                        )
-                        error_count += 1
-                        continue
-                    
-                    # Get event type (handle BOM in column name)
-                    event_type = row.get('\ufeffevent_type', row.get('event_type', 'General')).strip()
-                    if not event_type:
-                        event_type = 'General'  # Default value
-                    
-                    # Get other fields
-                    name = row.get('name', '').strip()
-                    if not name:
-                        self.stdout.write(
-                            self.style.WARNING(f'Row {row_num}: Empty name, skipping')
-                        )
-                        error_count += 1
-                        continue
-                    
-                    description = row.get('description', '').strip() if row.get('description') else ''
-                    location = row.get('location', '').strip() if row.get('location') else 'TBD'  # Default location
-                    
-                    # Create the event
-                    event = Event.objects.create(
-                        event_type=event_type,
-                        name=name,
-                        description=description,
-                        date=event_date,
-                        location=location
-                    )
-                    
-                    imported_count += 1
-                    self.stdout.write(f'✓ Imported: {name} ({event_date.strftime("%m/%d/%Y")})')
-                    
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'Row {row_num}: Error importing event: {str(e)}')
-                    )
-                    error_count += 1
-        
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\nImport completed!\n'
-                f'Successfully imported: {imported_count} events\n'
-                f'Errors: {error_count} events'
-            )
+        return Event(
+            event_type=(row.get('event_type') or '').strip() or 'General',
+            name=name,
+            description=(row.get('description') or '').strip(),
+            date=event_date,
+            location=(row.get('location') or '').strip() if row.get('location') else 'TBD'
         )
+
+    def import_chunk(self, records):
+        create_events([event for _, event in records])
+        self.counts['imported'] += len(records)
+
+    def summary(self):
+        return [
+            f'Successfully imported: {self.counts["imported"]} events',
+            f'Errors: {self.counts["errors"]} events',
+        ]
@@ -0,0 +1,105 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from api.models import Attendance, Event, EventVisibility, Organization, PointsLedger, Student
+from api.terms import term_start, term_end, academic_year_start, as_datetime
+
+FULL_ACCESS_ROLES = ['Super Admin', 'DAISSA', 'Faculty']
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?(.*)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries(role):
+    """The querysets behind the busiest endpoints in api/views.py, scoped to ``role``."""
+    now = timezone.now()
+    semester_start = as_datetime(term_start(now))
+    semester_end = as_datetime(term_end(term_start(now)))
+    visible = EventVisibility.event_ids(role)
+    events = Event.objects.filter(id__in=visible)
+    students = Student.objects.filter(attendances__event_id__in=visible)
+    return {
+        'events': events,
+        'events/upcoming': events.filter(date__gt=now).order_by('date'),
+        'events/past': events.filter(date__lte=now).order_by('-date'),
+        'events/types': Event.objects.values_list('event_type', flat=True).distinct().order_by('event_type'),
+        'attendance': Attendance.objects.select_related('student', 'event').filter(event_id__in=visible),
+        'students (page)': Student.objects.select_related('user').order_by('first_name', 'last_name', 'id')[:100],
+        'total-students': Student.objects.filter(
+            id__in=Attendance.objects.filter(event_id__in=visible).values('student_id')
+        ),
+        'participating-students (semester)': students.filter(
+            attendances__event__date__gte=semester_start,
+            attendances__event__date__lt=semester_end
+        ).distinct(),
+        'participating-students (year)': students.filter(
+            attendances__event__date__gte=as_datetime(academic_year_start(now))
+        ).distinct(),
+        'student-points (semester)': PointsLedger.objects.filter(organization=role, term_start=term_start(now)),
+        'attendance-overview': Attendance.objects.filter(event_id__in=visible).annotate(
+            date=TruncMonth('checked_in_at')
+        ).values('date', 'event__event_type').annotate(count=Count('id')).order_by('date'),
+        'onetap event lookup': Event.objects.filter(name='', date__gte=now, date__lt=now),
+    }
+
+
+def full_scans(plan):
+    """Tables read with a full table scan in an EXPLAIN ``plan`` for the current database."""
+    if connection.vendor == 'sqlite':
+        scans = []
+        for line in plan.splitlines():
+            match = SQLITE_SCAN.search(line)
+            if match and 'USING' not in match.group(2) and match.group(1) != 'CONSTANT':
+                scans.append(match.group(1))
+        return scans
+    if connection.vendor == 'postgresql':
+        return POSTGRES_SCAN.findall(plan)
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the hot endpoint queries and report full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', help='Organization to scope the queries to (default: first non-admin organization)')
+        parser.add_argument('--min-rows', type=int, default=0, help='Ignore scans of tables with fewer rows (default: 0)')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just the ones with scans')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if any full scan is found')
+
+    def handle(self, *args, **options):
+        role = options['role'] or (
+            Organization.objects.exclude(name__in=FULL_ACCESS_ROLES).order_by('name')
+            .values_list('name', flat=True).first() or 'ASC'
+        )
+        self.stdout.write(f'Explaining hot queries on {connection.vendor} for role {role!r}')
+
+        flagged = 0
+        for name, queryset in hot_queries(role).items():
+            plan = queryset.explain()
+            scans = full_scans(plan)
+            if scans is None:
+                self.stdout.write(f'\n{name}: plan analysis is not supported on {connection.vendor}\n{plan}')
+                continue
+            scans = [table for table in dict.fromkeys(scans) if self.row_count(table) >= options['min_rows']]
+            if scans:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'\n{name}: full scan of {", ".join(scans)}'))
+                self.stdout.write(plan)
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+                if options['verbose_plans']:
+                    self.stdout.write(plan)
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'{flagged} queries use full table scans')
+        self.stdout.write(self.style.SUCCESS(f'\nDone: {flagged} queries with full table scans'))
+
+    def row_count(self, table):
+        if table not in connection.introspection.table_names():
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0]
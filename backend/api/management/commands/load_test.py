@@ -0,0 +1,154 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+ENDPOINTS = [
+    '/api/students/total/',
+    '/api/students/participating/',
+    '/api/attendance/overview/?granularity=week',
+    '/api/webhook/onetap-handler/status/',
+]
+
+
+def run_load(base_url, paths, token, concurrency, duration):
+    """GET ``paths`` round-robin from ``concurrency`` keep-alive connections for ``duration`` seconds. Returns (latencies, errors)."""
+    url = urlsplit(base_url)
+    headers = {'Authorization': f'Bearer {token}'}
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        mine, failed, i = [], 0, offset
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                connection.request('GET', paths[i % len(paths)], headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            mine.append(time.perf_counter() - started)
+            i += 1
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def summarize(latencies, errors, duration):
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0, 'p50': 0.0, 'p99': 0.0}
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / duration,
+        'p50': cuts[49] * 1000,
+        'p99': cuts[98] * 1000,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = 'Measure requests per second and p99 latency of the dashboard endpoints, optionally comparing sync and ASGI workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='User to authenticate as (an admin sees the unscoped counts)')
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to load (default: http://127.0.0.1:8000); ignored with --compare')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent connections (default: 16)')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per run (default: 10)')
+        parser.add_argument('--path', action='append', dest='paths', help='Endpoint to request; repeat for several (default: the stats and webhook status endpoints)')
+        parser.add_argument('--compare', action='store_true', help='Start gunicorn in sync and ASGI mode on the same database and load each in turn')
+        parser.add_argument('--workers', type=int, default=3, help='Gunicorn workers per mode with --compare (default: 3)')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"No user named {options['username']}")
+        token = str(RefreshToken.for_user(user).access_token)
+        paths = options['paths'] or ENDPOINTS
+
+        if not options['compare']:
+            self.report(options['url'], self.load(options['url'], paths, token, options))
+            return
+
+        results = {}
+        for mode in ('sync', 'asgi'):
+            port = free_port()
+            server = self.start_server(mode, port, options['workers'])
+            try:
+                if not wait_for(port):
+                    raise CommandError(f'gunicorn ({mode}) did not start on port {port}')
+                base_url = f'http://127.0.0.1:{port}'
+                # Warm the worker caches before measuring
+                run_load(base_url, paths, token, options['concurrency'], 1)
+                results[mode] = self.load(base_url, paths, token, options)
+            finally:
+                server.terminate()
+                server.wait()
+            self.report(mode, results[mode])
+
+        sync, asgi = results['sync'], results['asgi']
+        if sync['rps']:
+            self.stdout.write(self.style.SUCCESS(
+                f"ASGI vs sync: {asgi['rps'] / sync['rps']:.2f}x requests/s, "
+                f"p99 {asgi['p99']:.1f} ms vs {sync['p99']:.1f} ms"
+            ))
+
+    def load(self, base_url, paths, token, options):
+        self.stdout.write(f"Loading {base_url} with {options['concurrency']} connections for {options['duration']:g}s")
+        latencies, errors = run_load(base_url, paths, token, options['concurrency'], options['duration'])
+        return summarize(latencies, errors, options['duration'])
+
+    def start_server(self, mode, port, workers):
+        env = {**os.environ, 'ASGI_MODE': 'True' if mode == 'asgi' else 'False'}
+        app = 'backend.asgi:application' if mode == 'asgi' else 'backend.wsgi:application'
+        return subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py',
+             '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning', app],
+            cwd=settings.BASE_DIR, env=env
+        )
+
+    def report(self, label, result):
+        self.stdout.write(
+            f"{label:>24}: {result['requests']:7d} requests, {result['errors']:5d} errors, "
+            f"{result['rps']:8.1f} req/s, p50 {result['p50']:7.1f} ms, p99 {result['p99']:7.1f} ms"
+        )
@@ -0,0 +1,22 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.recurrence import extend_all
+
+
+class Command(BaseCommand):
+    help = 'Create the upcoming instances of recurring events (run daily when RECURRING_EVENTS_WINDOW_DAYS is set)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Create instances up to this many days from now (default: RECURRING_EVENTS_WINDOW_DAYS, or whole series)'
+        )
+
+    def handle(self, *args, **options):
+        until = timezone.now() + timedelta(days=options['days']) if options['days'] else None
+        created = extend_all(until)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully created {created} recurring event instances')
+        )
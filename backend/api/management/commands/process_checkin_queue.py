@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api.database import serialized_writes
+from api.models import CheckinQueueItem
+from api.onetap_webhook_handler import (
+    process_onetap_checkin,
+    process_onetap_checkin_batch,
+    validate_onetap_payload,
+)
+
+
+class Command(BaseCommand):
+    help = 'Drain the OneTap check-in queue, retrying failures and dead-lettering items that keep failing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Items claimed per batch (default: 100)')
+        parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before an item is dead-lettered (default: 5)')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty (default: 1)')
+        parser.add_argument('--visibility-timeout', type=int, default=300, help='Seconds before an unfinished claimed item is retried (default: 300)')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained instead of polling')
+        parser.add_argument('--stats', action='store_true', help='Print queue depth and lag and exit')
+        parser.add_argument('--requeue-dead', action='store_true', help='Move dead-lettered items back to pending and exit')
+        parser.add_argument('--purge-done', type=int, metavar='DAYS', help='Delete processed items older than DAYS and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for key, value in CheckinQueueItem.stats().items():
+                self.stdout.write(f'{key}: {value}')
+            return
+
+        if options['requeue_dead']:
+            count = CheckinQueueItem.objects.filter(status=CheckinQueueItem.STATUS_DEAD).update(
+                status=CheckinQueueItem.STATUS_PENDING, attempts=0, available_at=timezone.now()
+            )
+            self.stdout.write(self.style.SUCCESS(f'Requeued {count} dead-lettered check-ins'))
+            return
+
+        if options['purge_done'] is not None:
+            count, _ = CheckinQueueItem.objects.filter(
+                status=CheckinQueueItem.STATUS_DONE,
+                processed_at__lt=timezone.now() - timedelta(days=options['purge_done'])
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {count} processed check-ins'))
+            return
+
+        self.stdout.write('Processing check-in queue...')
+        while True:
+            with serialized_writes():
+                items = CheckinQueueItem.claim(options['batch_size'], options['visibility_timeout'])
+            if not items:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            # Takes turns with the webhook's writers on SQLite (see api/database.py)
+            with serialized_writes():
+                done, failed = self.process_batch(items, options['max_attempts'])
+            stats = CheckinQueueItem.stats()
+            self.stdout.write(
+                f'Processed {done} check-ins, {failed} failed '
+                f'(pending: {stats["pending"]}, dead: {stats["dead"]}, lag: {stats["lag_seconds"]:.1f}s)'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Check-in queue drained'))
+
+    def process_batch(self, items, max_attempts):
+        """Process claimed items together, retrying the ones that failed one at a time."""
+        results = process_onetap_checkin_batch([item.payload for item in items])
+        results = [result if result['success'] else self.process_one(item) for item, result in zip(items, results)]
+
+        done_ids = []
+        for item, result in zip(items, results):
+            if result['success']:
+                done_ids.append(item.id)
+            else:
+                item.mark_failed(result['error'], max_attempts)
+        CheckinQueueItem.mark_done(done_ids)
+        return len(done_ids), len(items) - len(done_ids)
+
+    def process_one(self, item):
+        error = validate_onetap_payload(item.payload)
+        if error:
+            return {'success': False, 'error': error}
+        data = item.payload['data']
+        try:
+            # A failure part way through must not leave a partial check-in to duplicate on retry
+            with transaction.atomic():
+                process_onetap_checkin(data.get('participant', {}), data.get('profile', {}), data.get('list', {}))
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        return {'success': True}
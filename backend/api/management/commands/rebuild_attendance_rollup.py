@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.models import AttendanceRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance rollup (day, event type, organization) from attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of attendance rows fetched per database round trip (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding attendance rollup...')
+        row_count = AttendanceRollup.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt attendance rollup: {row_count} rows')
+        )
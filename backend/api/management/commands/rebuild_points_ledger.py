@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.models import PointsLedger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-student/organization/term points ledger from attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of attendance rows fetched per database round trip (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding points ledger...')
+        row_count = PointsLedger.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt points ledger: {row_count} rows')
+        )
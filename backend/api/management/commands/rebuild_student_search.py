@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.models import StudentSearchGram
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram index used by the student search endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of students reindexed per batch (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding student search index...')
+        student_count = StudentSearchGram.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully indexed {student_count} students')
+        )
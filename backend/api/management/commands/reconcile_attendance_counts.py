@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from api.models import Student, Attendance
+
+
+class Command(BaseCommand):
+    help = 'Repair drift in Student.cached_attendance_count with a single set-based update'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many students have drifted without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        actual_count = Coalesce(
+            Subquery(
+                Attendance.objects.filter(student=OuterRef('pk'))
+                .values('student')
+                .annotate(count=Count('id'))
+                .values('count')
+            ),
+            0
+        )
+        drifted = Student.objects.alias(actual_count=actual_count).exclude(
+            cached_attendance_count=F('actual_count')
+        )
+
+        if options['dry_run']:
+            drifted_count = drifted.count()
+            self.stdout.write(
+                self.style.WARNING(f'DRY RUN: {drifted_count} students have a drifted attendance count')
+            )
+            return
+
+        updated_count = drifted.update(
+            cached_attendance_count=actual_count,
+            last_attendance_update=timezone.now()
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully reconciled attendance counts for {updated_count} students')
+        )
@@ -1,5 +1,7 @@
+import time
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from api.credentials import DEFAULT_PASSWORD, set_passwords
 
 
 class Command(BaseCommand):
@@ -9,21 +11,37 @@ class Command(BaseCommand):
         parser.add_argument(
             '--password',
             type=str,
-            default='changeme!',
-            help='Password to set for all users (default: changeme!)'
+            default=DEFAULT_PASSWORD,
+            help=f'Password to set for all users (default: {DEFAULT_PASSWORD})'
         )
         parser.add_argument(
             '--dry-run',
             action='store_true',
             help='Show what would be changed without making changes'
         )
+        parser.add_argument(
+            '--unique-salts',
+            action='store_true',
+            help='Salt every account separately even for the default password (other passwords always are)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Hashing processes (default: PASSWORD_HASH_WORKERS, or one per core)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Users hashed and written per batch (default: 1000)'
+        )
 
     def handle(self, *args, **options):
         password = options['password']
         dry_run = options['dry_run']
         
         # Get all users
-        users = User.objects.all()
+        users = User.objects.order_by('id')
         user_count = users.count()
         
         if dry_run:
@@ -34,16 +52,24 @@ class Command(BaseCommand):
                 self.stdout.write(f'  - {user.username} ({user.email})')
             return
         
-        # Update passwords
+        # Update passwords a batch at a time: one pooled hashing pass and one bulk_update each
+        share = False if options['unique_salts'] else None
         updated_count = 0
-        for user in users:
-            user.set_password(password)
-            user.save()
-            updated_count += 1
-            self.stdout.write(f'Updated password for {user.username}')
+        started = time.perf_counter()
+        batch = []
+        for user in users.only('id', 'username', 'password').iterator(chunk_size=options['batch_size']):
+            batch.append(user)
+            if len(batch) >= options['batch_size']:
+                updated_count += set_passwords(batch, password, share=share, workers=options['workers'])
+                self.stdout.write(f'Updated {updated_count}/{user_count} passwords')
+                batch = []
+        if batch:
+            updated_count += set_passwords(batch, password, share=share, workers=options['workers'])
+        elapsed = time.perf_counter() - started
         
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully updated {updated_count} user passwords to "{password}"')
+            self.style.SUCCESS(
+                f'Successfully updated {updated_count} user passwords to "{password}" '
+                f'in {elapsed:.1f}s ({updated_count / elapsed if elapsed else 0:.0f} users/s)'
+            )
         )
-
-
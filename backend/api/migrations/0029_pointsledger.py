@@ -0,0 +1,63 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def rebuild_ledger(apps, schema_editor):
+    """Populate the ledger from existing attendance"""
+    from collections import Counter, defaultdict
+    from api.terms import term_start
+
+    PointsLedger = apps.get_model('api', 'PointsLedger')
+    Attendance = apps.get_model('api', 'Attendance')
+    Event = apps.get_model('api', 'Event')
+    EventOrganization = apps.get_model('api', 'EventOrganization')
+
+    secondary = defaultdict(set)
+    for event_id, name in EventOrganization.objects.values_list('event_id', 'organization__name'):
+        secondary[event_id].add(name)
+    events = {
+        event_id: (term_start(date), {'', organization} | secondary[event_id])
+        for event_id, organization, date in Event.objects.values_list('id', 'organization', 'date')
+    }
+
+    counts = Counter()
+    for student_id, event_id in Attendance.objects.values_list('student_id', 'event_id').iterator():
+        start, organizations = events[event_id]
+        for organization in organizations:
+            counts[(student_id, organization, start)] += 1
+
+    PointsLedger.objects.bulk_create(
+        [
+            PointsLedger(student_id=student_id, organization=organization, term_start=start, points=points)
+            for (student_id, organization, start), points in counts.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_change_event_organization_to_foreignkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsLedger',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('organization', models.CharField(blank=True, help_text='Organization name, or empty for the total across all organizations', max_length=100)),
+                ('term_start', models.DateField(help_text='First day of the academic term (Aug 1 or Jan 1)')),
+                ('points', models.IntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_ledger', to='api.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Points ledger',
+                'unique_together': {('student', 'organization', 'term_start')},
+                'indexes': [models.Index(fields=['organization', 'term_start', 'student'], name='ledger_org_term_idx')],
+            },
+        ),
+        migrations.RunPython(rebuild_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_pointsledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckinQueueItem',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('dead', 'Dead')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the item may be (re)tried')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Check-in Queue Item',
+                'verbose_name_plural': 'Check-in Queue',
+                'indexes': [models.Index(fields=['status', 'available_at'], name='checkin_queue_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_checkinqueueitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['name', 'date'], name='event_name_date_idx'),
+        ),
+    ]
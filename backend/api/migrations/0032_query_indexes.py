@@ -0,0 +1,45 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_event_name_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organization', 'date'], name='event_org_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_type'], name='event_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['event', 'checked_in_at'], name='attendance_event_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['checked_in_at'], name='attendance_checked_in_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['username'], name='student_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['first_name', 'last_name', 'id'], name='student_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventorganization',
+            index=models.Index(fields=['organization', 'event'], name='event_org_scope_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill(apps, schema_editor):
+    """Link events to their primary Organization and populate EventVisibility"""
+    Event = apps.get_model('api', 'Event')
+    EventOrganization = apps.get_model('api', 'EventOrganization')
+    EventVisibility = apps.get_model('api', 'EventVisibility')
+    Organization = apps.get_model('api', 'Organization')
+
+    Event.objects.update(primary_organization=models.Subquery(
+        Organization.objects.filter(name=models.OuterRef('organization')).values('id')[:1]
+    ))
+
+    visible = set(Event.objects.values_list('id', 'organization'))
+    visible.update(EventOrganization.objects.values_list('event_id', 'organization__name'))
+    EventVisibility.objects.bulk_create(
+        [EventVisibility(event_id=event_id, organization=organization) for event_id, organization in visible],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='primary_organization',
+            field=models.ForeignKey(blank=True, help_text='Organization row matching `organization`, kept in sync on save', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='primary_events', to='api.organization'),
+        ),
+        migrations.CreateModel(
+            name='EventVisibility',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('organization', models.CharField(help_text='Organization name (matches AdminUser.role)', max_length=100)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visibility', to='api.event')),
+            ],
+            options={
+                'verbose_name_plural': 'Event visibility',
+                'unique_together': {('organization', 'event')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+
+
+def rebuild_rollup(apps, schema_editor):
+    """Populate the rollup from existing attendance"""
+    from collections import Counter, defaultdict
+    from django.utils import timezone
+
+    AttendanceRollup = apps.get_model('api', 'AttendanceRollup')
+    Attendance = apps.get_model('api', 'Attendance')
+    Event = apps.get_model('api', 'Event')
+    EventOrganization = apps.get_model('api', 'EventOrganization')
+
+    secondary = defaultdict(set)
+    for event_id, name in EventOrganization.objects.values_list('event_id', 'organization__name'):
+        secondary[event_id].add(name)
+    events = {
+        event_id: (event_type, {'', organization} | secondary[event_id])
+        for event_id, organization, event_type in Event.objects.values_list('id', 'organization', 'event_type')
+    }
+
+    counts = Counter()
+    for event_id, checked_in_at in Attendance.objects.values_list('event_id', 'checked_in_at').iterator():
+        event_type, organizations = events[event_id]
+        day = timezone.localtime(checked_in_at).date()
+        for organization in organizations:
+            counts[(day, event_type, organization)] += 1
+
+    AttendanceRollup.objects.bulk_create(
+        [
+            AttendanceRollup(day=day, event_type=event_type, organization=organization, count=count)
+            for (day, event_type, organization), count in counts.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_event_primary_organization_eventvisibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceRollup',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('event_type', models.CharField(max_length=100)),
+                ('organization', models.CharField(blank=True, help_text='Organization name, or empty for the total across all organizations', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance rollup',
+                'unique_together': {('organization', 'day', 'event_type')},
+            },
+        ),
+        migrations.RunPython(rebuild_rollup, migrations.RunPython.noop),
+    ]
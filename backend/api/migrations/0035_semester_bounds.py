@@ -0,0 +1,41 @@
+# Generated by Django 4.2.18
+
+from datetime import datetime
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_bounds(apps, schema_editor):
+    """Default each semester's boundaries from its season and year"""
+    Semester = apps.get_model('api', 'Semester')
+    months = {'FALL': ((0, 8), (1, 1)), 'SPRING': ((0, 1), (0, 8)), 'SUMMER': ((0, 5), (0, 8))}
+    for semester in Semester.objects.all():
+        (start_offset, start_month), (end_offset, end_month) = months.get(semester.season, months['SPRING'])
+        semester.start_date = timezone.make_aware(datetime(semester.year + start_offset, start_month, 1))
+        semester.end_date = timezone.make_aware(datetime(semester.year + end_offset, end_month, 1))
+        semester.save(update_fields=['start_date', 'end_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_attendancerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semester',
+            name='start_date',
+            field=models.DateTimeField(blank=True, help_text='Start of the term (inclusive); defaults from season and year', null=True),
+        ),
+        migrations.AddField(
+            model_name='semester',
+            name='end_date',
+            field=models.DateTimeField(blank=True, help_text='End of the term (exclusive); defaults from season and year', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='semester',
+            index=models.Index(fields=['start_date', 'end_date'], name='semester_bounds_idx'),
+        ),
+        migrations.RunPython(fill_bounds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_search_index(apps, schema_editor):
+    """Index every existing student (same grams as StudentSearchGram.grams)"""
+    import re
+    import unicodedata
+
+    StudentSearchGram = apps.get_model('api', 'StudentSearchGram')
+    Student = apps.get_model('api', 'Student')
+
+    def normalize(value):
+        decomposed = unicodedata.normalize('NFKD', value or '')
+        return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+    def grams(values):
+        result = set()
+        for value in (normalize(value) for value in values if value):
+            result.update(value[i:i + 3] for i in range(len(value) - 2))
+            result.update(f'^{word[:2]}' for word in re.split(r'[^0-9a-z]+', value) if len(word) >= 2)
+        return result
+
+    rows = Student.objects.values_list('id', 'first_name', 'last_name', 'email', 'username', 'user__username')
+    StudentSearchGram.objects.bulk_create(
+        (
+            StudentSearchGram(student_id=row[0], gram=gram)
+            for row in rows.iterator() for gram in grams(row[1:])
+        ),
+        batch_size=2000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_semester_bounds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchGram',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('gram', models.CharField(max_length=3)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='api.student')),
+            ],
+            options={
+                'unique_together': {('gram', 'student')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,11 @@ from .teaching_assistant import TeachingAssistant
 from .admin import AdminUser
 from .event_organization import EventOrganization
 from .organization import Organization
+from .points_ledger import PointsLedger
+from .checkin_queue import CheckinQueueItem
+from .event_visibility import EventVisibility
+from .attendance_rollup import AttendanceRollup
+from .student_search import StudentSearchGram
 
 __all__ = [
     'Student',
@@ -19,7 +24,12 @@ __all__ = [
     'TeachingAssistant',
     'AdminUser',
     'EventOrganization',
-    'Organization'
+    'Organization',
+    'PointsLedger',
+    'CheckinQueueItem',
+    'EventVisibility',
+    'AttendanceRollup',
+    'StudentSearchGram'
 ]
 
 # Hello!
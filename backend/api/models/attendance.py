@@ -1,8 +1,10 @@
 from django.db import models
 from .student import Student
 from .event import Event
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
+from collections import Counter
+from .. import counters
 
 class Attendance(models.Model):
     id = models.AutoField(primary_key=True)
@@ -22,11 +24,57 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ['student', 'event']
+        indexes = [
+            # Attendance for a set of events (org scope), grouped by check-in month
+            models.Index(fields=['event', 'checked_in_at'], name='attendance_event_time_idx'),
+            models.Index(fields=['checked_in_at'], name='attendance_checked_in_idx'),
+        ]
         verbose_name_plural = 'Attendance'
 
     def __str__(self):
         return f"{self.student} at {self.event}"
 
+# Sent with `pairs` (a list of (student_id, event_id)), `delta` (1 for created,
+# -1 for deleted) and `checked_in_at` (the matching check-in times, or None for
+# rows created just now). An update that changes the student, event or check-in
+# time is sent as -1 for the old values and 1 for the new ones. Bulk operations
+# that bypass post_save/post_delete, such as bulk_create, must call
+# record_attendance_changes themselves.
+attendance_changed = Signal()
+
+def record_attendance_changes(pairs, delta=1, checked_in_at=None):
+    pairs = list(pairs)
+    if pairs:
+        attendance_changed.send(sender=Attendance, pairs=pairs, delta=delta, checked_in_at=checked_in_at)
+
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_key(sender, instance, **kwargs):
+    # The values the row is counted under, so an update can move the count
+    if not instance._state.adding:
+        instance._attendance_key = Attendance.objects.filter(pk=instance.pk).values_list(
+            'student_id', 'event_id', 'checked_in_at'
+        ).first()
+
 @receiver(post_save, sender=Attendance)
-def update_student_attendance(sender, instance, **kwargs):
-    instance.student.update_attendance_cache()
\ No newline at end of file
+def attendance_saved(sender, instance, created, **kwargs):
+    current = (instance.student_id, instance.event_id, instance.checked_in_at)
+    if created:
+        record_attendance_changes([current[:2]], checked_in_at=[current[2]])
+        return
+    previous = getattr(instance, '_attendance_key', None)
+    if previous is None or previous == current:
+        return
+    record_attendance_changes([previous[:2]], delta=-1, checked_in_at=[previous[2]])
+    record_attendance_changes([current[:2]], checked_in_at=[current[2]])
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    record_attendance_changes([(instance.student_id, instance.event_id)], delta=-1, checked_in_at=[instance.checked_in_at])
+
+@receiver(attendance_changed)
+def update_student_attendance(sender, pairs, delta, **kwargs):
+    per_student = Counter(student_id for student_id, _ in pairs)
+    counters.add(
+        Student.apply_attendance_deltas,
+        {student_id: count * delta for student_id, count in per_student.items()}
+    )
@@ -0,0 +1,204 @@
+from collections import Counter, defaultdict
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .event import Event
+from .attendance import Attendance, attendance_changed
+from .event_organization import EventOrganization, event_organizations_changed
+from .. import counters
+
+
+def local_day(value):
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+class AttendanceRollup(models.Model):
+    """
+    Daily attendance counts per event type and organization.
+
+    Like PointsLedger, an attendance counts once for the event's primary
+    organization, once for each secondary organization and once in the row
+    with an empty organization (the total). Days come from `checked_in_at` in
+    the current timezone. The overview chart groups these rows by month, week
+    or day instead of scanning Attendance. Kept current by the receivers
+    below; rebuild with `python manage.py rebuild_attendance_rollup`.
+    """
+    ALL_ORGANIZATIONS = ''
+
+    id = models.AutoField(primary_key=True)
+    day = models.DateField()
+    event_type = models.CharField(max_length=100)
+    organization = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Organization name, or empty for the total across all organizations"
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['organization', 'day', 'event_type']
+        verbose_name_plural = 'Attendance rollup'
+
+    def __str__(self):
+        return f"{self.day} / {self.event_type} / {self.organization or 'All'}: {self.count}"
+
+    @staticmethod
+    def event_keys(event_ids):
+        """Map each event id to (event_type, organization names) for the rows its attendance counts in."""
+        keys = {}
+        for event_id, organization, event_type in Event.objects.filter(id__in=event_ids).values_list('id', 'organization', 'event_type'):
+            keys[event_id] = (event_type, {AttendanceRollup.ALL_ORGANIZATIONS, organization})
+        for event_id, name in EventOrganization.objects.filter(event_id__in=event_ids).values_list('event_id', 'organization__name'):
+            if event_id in keys:
+                keys[event_id][1].add(name)
+        return keys
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Apply a mapping of (day, event_type, organization) -> count delta with
+        one F() UPDATE per distinct delta, bulk inserting missing rows.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        existing = {
+            (day, event_type, organization): row_id
+            for row_id, day, event_type, organization in cls.objects.filter(
+                day__in={key[0] for key in deltas},
+                event_type__in={key[1] for key in deltas},
+                organization__in={key[2] for key in deltas}
+            ).values_list('id', 'day', 'event_type', 'organization')
+        }
+
+        rows_by_delta = defaultdict(list)
+        missing = {}
+        for key, delta in deltas.items():
+            if key in existing:
+                rows_by_delta[delta].append(existing[key])
+            elif delta > 0:
+                missing[key] = delta
+        for delta, row_ids in rows_by_delta.items():
+            cls.objects.filter(id__in=row_ids).update(count=F('count') + delta)
+        decremented = [row_id for delta, row_ids in rows_by_delta.items() if delta < 0 for row_id in row_ids]
+        if decremented:
+            cls.objects.filter(id__in=decremented, count__lte=0).delete()
+
+        if missing:
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create([
+                        cls(day=day, event_type=event_type, organization=organization, count=delta)
+                        for (day, event_type, organization), delta in missing.items()
+                    ])
+            except IntegrityError:
+                # Another process inserted some of these rows first
+                for (day, event_type, organization), delta in missing.items():
+                    _, created = cls.objects.get_or_create(
+                        day=day,
+                        event_type=event_type,
+                        organization=organization,
+                        defaults={'count': delta}
+                    )
+                    if not created:
+                        cls.objects.filter(
+                            day=day, event_type=event_type, organization=organization
+                        ).update(count=F('count') + delta)
+
+    @classmethod
+    def record_attendance(cls, event_ids, checked_in_at, sign=1):
+        """Add (or with sign=-1, remove) one attendance per event id, checked in at the matching time."""
+        keys = cls.event_keys(set(event_ids))
+        deltas = Counter()
+        for event_id, when in zip(event_ids, checked_in_at):
+            if event_id not in keys:
+                continue
+            event_type, organizations = keys[event_id]
+            for organization in organizations:
+                deltas[(local_day(when), event_type, organization)] += sign
+        counters.add(cls.apply_deltas, deltas)
+
+    @classmethod
+    def rebuild(cls, chunk_size=5000):
+        """Recompute every rollup row from the Attendance table. Returns the number of rows written."""
+        secondary = defaultdict(set)
+        for event_id, name in EventOrganization.objects.values_list('event_id', 'organization__name'):
+            secondary[event_id].add(name)
+        events = {
+            event_id: (event_type, {cls.ALL_ORGANIZATIONS, organization} | secondary[event_id])
+            for event_id, organization, event_type in Event.objects.values_list('id', 'organization', 'event_type')
+        }
+
+        counts = Counter()
+        for event_id, when in Attendance.objects.values_list('event_id', 'checked_in_at').iterator(chunk_size=chunk_size):
+            event_type, organizations = events[event_id]
+            for organization in organizations:
+                counts[(local_day(when), event_type, organization)] += 1
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                (
+                    cls(day=day, event_type=event_type, organization=organization, count=count)
+                    for (day, event_type, organization), count in counts.items()
+                ),
+                batch_size=1000
+            )
+        return len(counts)
+
+
+@receiver(attendance_changed)
+def update_attendance_rollup(sender, pairs, delta, checked_in_at=None, **kwargs):
+    if checked_in_at is None:
+        # New rows from bulk_create are stamped with the current time
+        checked_in_at = [timezone.now()] * len(pairs)
+    AttendanceRollup.record_attendance([event_id for _, event_id in pairs], checked_in_at, delta)
+
+def _move_event_attendance(event_id, old_keys, new_keys):
+    days = Counter(
+        local_day(when) for when in Attendance.objects.filter(event_id=event_id).values_list('checked_in_at', flat=True)
+    )
+    deltas = Counter()
+    for day, count in days.items():
+        for event_type, organization in old_keys:
+            deltas[(day, event_type, organization)] -= count
+        for event_type, organization in new_keys:
+            deltas[(day, event_type, organization)] += count
+    counters.add(AttendanceRollup.apply_deltas, deltas)
+
+@receiver(event_organizations_changed)
+def update_secondary_organization_rollup(sender, links, delta, **kwargs):
+    events = {
+        event_id: (organization, event_type)
+        for event_id, organization, event_type in Event.objects.filter(
+            id__in={event_id for event_id, _ in links}
+        ).values_list('id', 'organization', 'event_type')
+    }
+    organizations = defaultdict(set)
+    for event_id, name in links:
+        if event_id in events and name != events[event_id][0]:
+            organizations[event_id].add(name)
+    if not organizations:
+        return
+    deltas = Counter()
+    for event_id, when in Attendance.objects.filter(event_id__in=organizations).values_list('event_id', 'checked_in_at'):
+        for name in organizations[event_id]:
+            deltas[(local_day(when), events[event_id][1], name)] += delta
+    counters.add(AttendanceRollup.apply_deltas, deltas)
+
+@receiver(post_save, sender=Event)
+def move_event_rollup(sender, instance, created, **kwargs):
+    """Move attendance counts when an event changes event type or primary organization."""
+    # Stored values from before the save, set by link_primary_organization
+    previous = getattr(instance, '_saved_values', None)
+    if created or previous is None:
+        return
+    old_organization, _, old_event_type = previous
+    if old_organization == instance.organization and old_event_type == instance.event_type:
+        return
+    secondary = set(instance.event_organizations.values_list('organization__name', flat=True))
+    old_keys = {(old_event_type, organization) for organization in {AttendanceRollup.ALL_ORGANIZATIONS, old_organization} | secondary}
+    new_keys = {(instance.event_type, organization) for organization in {AttendanceRollup.ALL_ORGANIZATIONS, instance.organization} | secondary}
+    _move_event_attendance(instance.id, old_keys, new_keys)
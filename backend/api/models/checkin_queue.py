@@ -0,0 +1,119 @@
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+
+class CheckinQueueItem(models.Model):
+    """
+    Durable outbox for OneTap check-in payloads.
+
+    When ONETAP_QUEUE_ENABLED is set, the webhook only validates and stores the
+    payload here and acknowledges with 202. The process_checkin_queue command
+    drains pending items in batches, retrying failures with backoff and moving
+    items that keep failing to the dead status for inspection.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the item may be (re)tried"
+    )
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='checkin_queue_status_idx'),
+        ]
+        verbose_name = 'Check-in Queue Item'
+        verbose_name_plural = 'Check-in Queue'
+
+    def __str__(self):
+        return f"Check-in {self.id} ({self.status})"
+
+    @classmethod
+    def enqueue(cls, payloads):
+        """Store a list of payloads and return the created items."""
+        return cls.objects.bulk_create([cls(payload=payload) for payload in payloads])
+
+    @classmethod
+    def claim(cls, batch_size, visibility_timeout=300):
+        """
+        Claim up to ``batch_size`` items that are due, including items whose
+        worker stopped without finishing them within ``visibility_timeout`` seconds.
+        """
+        now = timezone.now()
+        due = Q(status=cls.STATUS_PENDING, available_at__lte=now) | Q(
+            status=cls.STATUS_PROCESSING,
+            claimed_at__lt=now - timedelta(seconds=visibility_timeout)
+        )
+        with transaction.atomic():
+            ids = list(cls.objects.filter(due).order_by('id').values_list('id', flat=True)[:batch_size])
+            # Re-check the condition so two workers never claim the same item
+            cls.objects.filter(due, id__in=ids).update(status=cls.STATUS_PROCESSING, claimed_at=now)
+        return list(cls.objects.filter(id__in=ids, status=cls.STATUS_PROCESSING, claimed_at=now).order_by('id'))
+
+    @classmethod
+    def mark_done(cls, ids):
+        cls.objects.filter(id__in=ids).update(
+            status=cls.STATUS_DONE, processed_at=timezone.now(), last_error=''
+        )
+
+    def mark_failed(self, error, max_attempts, backoff=5):
+        """Schedule a retry with exponential backoff, or dead-letter after ``max_attempts``."""
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= max_attempts:
+            self.status = self.STATUS_DEAD
+            self.processed_at = timezone.now()
+        else:
+            self.status = self.STATUS_PENDING
+            self.available_at = timezone.now() + timedelta(seconds=backoff * 2 ** (self.attempts - 1))
+        self.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'processed_at'])
+
+    @classmethod
+    def stats(cls):
+        """Queue depth per status and lag (age in seconds of the oldest unfinished item)."""
+        counts = dict(cls.objects.values_list('status').annotate(count=Count('id')).order_by())
+        oldest = cls.objects.filter(
+            status__in=[cls.STATUS_PENDING, cls.STATUS_PROCESSING]
+        ).aggregate(oldest=Min('received_at'))['oldest']
+        return cls._stats(counts, oldest)
+
+    @classmethod
+    async def astats(cls):
+        """`stats` with the async ORM."""
+        counts = {
+            status: count
+            async for status, count in cls.objects.values_list('status').annotate(count=Count('id')).order_by()
+        }
+        oldest = (await cls.objects.filter(
+            status__in=[cls.STATUS_PENDING, cls.STATUS_PROCESSING]
+        ).aaggregate(oldest=Min('received_at')))['oldest']
+        return cls._stats(counts, oldest)
+
+    @classmethod
+    def _stats(cls, counts, oldest):
+        return {
+            'pending': counts.get(cls.STATUS_PENDING, 0),
+            'processing': counts.get(cls.STATUS_PROCESSING, 0),
+            'dead': counts.get(cls.STATUS_DEAD, 0),
+            'done': counts.get(cls.STATUS_DONE, 0),
+            'lag_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0,
+        }
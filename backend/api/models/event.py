@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from .admin import AdminUser
+from .organization import Organization
 
 class Event(models.Model):
     RECURRENCE_CHOICES = [
@@ -16,6 +19,14 @@ class Event(models.Model):
         max_length=100,
         help_text="Organization hosting the event (must match an AdminUser role)"
     )
+    primary_organization = models.ForeignKey(
+        Organization,
+        on_delete=models.SET_NULL,
+        related_name='primary_events',
+        blank=True,
+        null=True,
+        help_text="Organization row matching `organization`, kept in sync on save"
+    )
     event_type = models.CharField(
         max_length=100,
         help_text="Type of the event"
@@ -51,9 +62,50 @@ class Event(models.Model):
         help_text="The original event this is a recurring instance of"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'date'], name='event_name_date_idx'),
+            # Org-scoped event lists and stats filter on organization plus a date range
+            models.Index(fields=['organization', 'date'], name='event_org_date_idx'),
+            models.Index(fields=['date'], name='event_date_idx'),
+            models.Index(fields=['event_type'], name='event_type_idx'),
+        ]
+
     def __str__(self):
         return self.name
     
     @property
     def has_passed(self):
-        return self.date < timezone.now()
\ No newline at end of file
+        return self.date < timezone.now()
+
+    @classmethod
+    def link_primary_organizations(cls):
+        """Point every event's primary_organization at the Organization named by `organization`."""
+        return cls.objects.update(primary_organization=models.Subquery(
+            Organization.objects.filter(name=models.OuterRef('organization')).values('id')[:1]
+        ))
+
+@receiver(pre_save, sender=Event)
+def link_primary_organization(sender, instance, **kwargs):
+    # The stored (organization, date, event_type) is kept on the instance as
+    # `_saved_values` for the post_save receivers that move counted attendance
+    saved = None
+    if instance.pk:
+        saved = Event.objects.filter(pk=instance.pk).values_list(
+            'organization', 'date', 'event_type', 'primary_organization_id'
+        ).first()
+    instance._saved_values = saved[:3] if saved else None
+    if saved is not None and saved[0] == instance.organization:
+        instance.primary_organization_id = saved[3]
+        return
+    instance.primary_organization_id = (
+        Organization.objects.filter(name=instance.organization).values_list('id', flat=True).first()
+    )
+
+@receiver(post_save, sender=Organization)
+def relink_primary_events(sender, instance, created, **kwargs):
+    if not created:
+        Event.objects.filter(primary_organization=instance).exclude(
+            organization=instance.name
+        ).update(primary_organization=None)
+    Event.objects.filter(organization=instance.name).update(primary_organization=instance)
\ No newline at end of file
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
 from .event import Event
 from .organization import Organization
 
@@ -19,8 +21,45 @@ class EventOrganization(models.Model):
 
     class Meta:
         unique_together = ['event', 'organization']
+        indexes = [
+            # Secondary-organization scope: organization -> events without touching the table
+            models.Index(fields=['organization', 'event'], name='event_org_scope_idx'),
+        ]
         db_table = 'event_organizations'
 
     def __str__(self):
         return f"{self.event.name} - {self.organization.name}"
 
+# Sent with `links` (a list of (event_id, organization_name)) and `delta` (1 for
+# added, -1 for removed). Renaming an organization removes its links under the
+# old name and adds them under the new one. Bulk operations that bypass post_save/post_delete,
+# such as bulk_create, must call record_event_organization_changes themselves.
+event_organizations_changed = Signal()
+
+def record_event_organization_changes(links, delta=1):
+    links = list(links)
+    if links:
+        event_organizations_changed.send(sender=EventOrganization, links=links, delta=delta)
+
+@receiver(post_save, sender=EventOrganization)
+def event_organization_created(sender, instance, created, **kwargs):
+    if created:
+        record_event_organization_changes([(instance.event_id, instance.organization.name)])
+
+@receiver(post_delete, sender=EventOrganization)
+def event_organization_deleted(sender, instance, **kwargs):
+    record_event_organization_changes([(instance.event_id, instance.organization.name)], delta=-1)
+
+@receiver(pre_save, sender=Organization)
+def remember_organization_name(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._saved_name = Organization.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+@receiver(post_save, sender=Organization)
+def organization_renamed(sender, instance, created, **kwargs):
+    old_name = getattr(instance, '_saved_name', None)
+    if created or old_name is None or old_name == instance.name:
+        return
+    event_ids = list(EventOrganization.objects.filter(organization=instance).values_list('event_id', flat=True))
+    record_event_organization_changes([(event_id, old_name) for event_id in event_ids], delta=-1)
+    record_event_organization_changes([(event_id, instance.name) for event_id in event_ids])
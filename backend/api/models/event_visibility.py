@@ -0,0 +1,104 @@
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .event import Event
+from .event_organization import EventOrganization, event_organizations_changed
+from .organization import Organization
+
+
+class EventVisibility(models.Model):
+    """
+    Denormalized set of organization names that can see each event.
+
+    Each event has one row for its primary organization (`Event.organization`)
+    and one per secondary organization (`EventOrganization`), so an admin's
+    scope is a single indexed semi-join on `organization` instead of an OR
+    across two join paths followed by DISTINCT. Rows are kept in sync by the
+    receivers below; bulk writes that bypass signals must call `sync_events`.
+    """
+    id = models.AutoField(primary_key=True)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='visibility'
+    )
+    organization = models.CharField(
+        max_length=100,
+        help_text="Organization name (matches AdminUser.role)"
+    )
+
+    class Meta:
+        unique_together = ['organization', 'event']
+        verbose_name_plural = 'Event visibility'
+
+    def __str__(self):
+        return f"{self.event_id} visible to {self.organization}"
+
+    @classmethod
+    def event_ids(cls, organization):
+        """Subquery of the ids of events visible to ``organization``."""
+        return cls.objects.filter(organization=organization).values('event_id')
+
+    @classmethod
+    def sync_events(cls, event_ids):
+        """Bring the rows for ``event_ids`` in line with the events and their secondary organizations."""
+        event_ids = list(event_ids)
+        wanted = set(Event.objects.filter(id__in=event_ids).values_list('id', 'organization'))
+        wanted.update(
+            EventOrganization.objects.filter(event_id__in=event_ids).values_list('event_id', 'organization__name')
+        )
+        existing = {
+            (event_id, organization): row_id
+            for row_id, event_id, organization in cls.objects.filter(event_id__in=event_ids).values_list(
+                'id', 'event_id', 'organization'
+            )
+        }
+        stale = [row_id for key, row_id in existing.items() if key not in wanted]
+        if stale:
+            cls.objects.filter(id__in=stale).delete()
+        cls.objects.bulk_create(
+            [cls(event_id=event_id, organization=organization) for event_id, organization in wanted - existing.keys()],
+            ignore_conflicts=True
+        )
+
+    @classmethod
+    def rebuild(cls, chunk_size=1000):
+        """Resync every event, ``chunk_size`` events at a time. Returns the number of events."""
+        event_ids = list(Event.objects.order_by('id').values_list('id', flat=True))
+        for i in range(0, len(event_ids), chunk_size):
+            cls.sync_events(event_ids[i:i + chunk_size])
+        cls.objects.exclude(event_id__in=Event.objects.values('id')).delete()
+        return len(event_ids)
+
+
+@receiver(post_save, sender=Event)
+def update_event_visibility(sender, instance, created, **kwargs):
+    if created:
+        EventVisibility.objects.get_or_create(event=instance, organization=instance.organization)
+        return
+    # Secondary organizations are saved separately, so only a new primary
+    # organization changes the rows (see link_primary_organization)
+    previous = getattr(instance, '_saved_values', None)
+    if previous is None or previous[0] != instance.organization:
+        EventVisibility.sync_events([instance.id])
+
+@receiver(event_organizations_changed)
+def update_secondary_visibility(sender, links, delta, **kwargs):
+    if delta > 0:
+        EventVisibility.objects.bulk_create(
+            [EventVisibility(event_id=event_id, organization=name) for event_id, name in links],
+            ignore_conflicts=True
+        )
+        return
+    # Only delete here: the event may itself be in the middle of a cascading delete
+    for event_id, name in links:
+        EventVisibility.objects.filter(event_id=event_id, organization=name).exclude(
+            event__organization=name
+        ).delete()
+
+@receiver(post_save, sender=Organization)
+def rename_secondary_visibility(sender, instance, created, **kwargs):
+    if not created:
+        EventVisibility.sync_events(
+            EventOrganization.objects.filter(organization=instance).values_list('event_id', flat=True)
+        )
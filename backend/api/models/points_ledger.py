@@ -0,0 +1,210 @@
+from collections import Counter, defaultdict
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .student import Student
+from .event import Event
+from .attendance import Attendance, attendance_changed
+from .event_organization import EventOrganization, event_organizations_changed
+from .. import counters
+from ..terms import term_start
+
+
+class PointsLedger(models.Model):
+    """
+    Materialized attendance counts per student, organization and academic term.
+
+    An attendance counts once for the event's primary organization, once for
+    each secondary organization, and once in the row with an empty
+    organization, which holds the student's total across all organizations.
+    Kept current by the signal receivers below; rebuild from scratch with
+    `python manage.py rebuild_points_ledger`.
+    """
+    ALL_ORGANIZATIONS = ''
+
+    id = models.AutoField(primary_key=True)
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='points_ledger'
+    )
+    organization = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Organization name, or empty for the total across all organizations"
+    )
+    term_start = models.DateField(help_text="First day of the academic term (Aug 1 or Jan 1)")
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['student', 'organization', 'term_start']
+        indexes = [
+            models.Index(fields=['organization', 'term_start', 'student'], name='ledger_org_term_idx'),
+        ]
+        verbose_name_plural = 'Points ledger'
+
+    def __str__(self):
+        return f"{self.student_id} / {self.organization or 'All'} / {self.term_start}: {self.points}"
+
+    @staticmethod
+    def event_keys(event_ids):
+        """
+        Map each event id to (term_start, organization names) for the ledger rows
+        an attendance at that event contributes to.
+        """
+        keys = {}
+        for event_id, organization, date in Event.objects.filter(id__in=event_ids).values_list('id', 'organization', 'date'):
+            keys[event_id] = (term_start(date), {PointsLedger.ALL_ORGANIZATIONS, organization})
+        for event_id, name in EventOrganization.objects.filter(event_id__in=event_ids).values_list('event_id', 'organization__name'):
+            if event_id in keys:
+                keys[event_id][1].add(name)
+        return keys
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Apply a mapping of (student_id, organization, term_start) -> point delta.
+        Existing rows get one F() UPDATE per distinct delta; missing rows are
+        bulk inserted.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        existing = {
+            (student_id, organization, start): row_id
+            for row_id, student_id, organization, start in cls.objects.filter(
+                student_id__in={key[0] for key in deltas},
+                organization__in={key[1] for key in deltas},
+                term_start__in={key[2] for key in deltas}
+            ).values_list('id', 'student_id', 'organization', 'term_start')
+        }
+
+        rows_by_delta = defaultdict(list)
+        missing = {}
+        for key, delta in deltas.items():
+            if key in existing:
+                rows_by_delta[delta].append(existing[key])
+            elif delta > 0:
+                missing[key] = delta
+        for delta, row_ids in rows_by_delta.items():
+            cls.objects.filter(id__in=row_ids).update(points=F('points') + delta)
+        decremented = [row_id for delta, row_ids in rows_by_delta.items() if delta < 0 for row_id in row_ids]
+        if decremented:
+            cls.objects.filter(id__in=decremented, points__lte=0).delete()
+
+        if missing:
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create([
+                        cls(student_id=student_id, organization=organization, term_start=start, points=delta)
+                        for (student_id, organization, start), delta in missing.items()
+                    ])
+            except IntegrityError:
+                # Another process inserted some of these rows first
+                for (student_id, organization, start), delta in missing.items():
+                    _, created = cls.objects.get_or_create(
+                        student_id=student_id,
+                        organization=organization,
+                        term_start=start,
+                        defaults={'points': delta}
+                    )
+                    if not created:
+                        cls.objects.filter(
+                            student_id=student_id, organization=organization, term_start=start
+                        ).update(points=F('points') + delta)
+
+    @classmethod
+    def record_attendance(cls, pairs, sign=1):
+        """Add (or with sign=-1, remove) points for an iterable of (student_id, event_id) pairs."""
+        keys = cls.event_keys({event_id for _, event_id in pairs})
+        deltas = Counter()
+        for student_id, event_id in pairs:
+            if event_id not in keys:
+                continue
+            start, organizations = keys[event_id]
+            for organization in organizations:
+                deltas[(student_id, organization, start)] += sign
+        counters.add(cls.apply_deltas, deltas)
+
+    @classmethod
+    def rebuild(cls, chunk_size=5000):
+        """Recompute every ledger row from the Attendance table. Returns the number of rows written."""
+        secondary = defaultdict(set)
+        for event_id, name in EventOrganization.objects.values_list('event_id', 'organization__name'):
+            secondary[event_id].add(name)
+        events = {
+            event_id: (term_start(date), {cls.ALL_ORGANIZATIONS, organization} | secondary[event_id])
+            for event_id, organization, date in Event.objects.values_list('id', 'organization', 'date')
+        }
+
+        counts = Counter()
+        for student_id, event_id in Attendance.objects.values_list('student_id', 'event_id').iterator(chunk_size=chunk_size):
+            start, organizations = events[event_id]
+            for organization in organizations:
+                counts[(student_id, organization, start)] += 1
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                (
+                    cls(student_id=student_id, organization=organization, term_start=start, points=points)
+                    for (student_id, organization, start), points in counts.items()
+                ),
+                batch_size=1000
+            )
+        return len(counts)
+
+
+@receiver(attendance_changed)
+def update_attendance_points(sender, pairs, delta, **kwargs):
+    PointsLedger.record_attendance(pairs, sign=delta)
+
+@receiver(event_organizations_changed)
+def update_secondary_organization_points(sender, links, delta, **kwargs):
+    events = {
+        event_id: (organization, date)
+        for event_id, organization, date in Event.objects.filter(
+            id__in={event_id for event_id, _ in links}
+        ).values_list('id', 'organization', 'date')
+    }
+    links = [(event_id, name) for event_id, name in links if event_id in events and name != events[event_id][0]]
+    if not links:
+        return
+    attendees = defaultdict(list)
+    for event_id, student_id in Attendance.objects.filter(
+        event_id__in={event_id for event_id, _ in links}
+    ).values_list('event_id', 'student_id'):
+        attendees[event_id].append(student_id)
+    deltas = Counter()
+    for event_id, name in links:
+        start = term_start(events[event_id][1])
+        for student_id in attendees[event_id]:
+            deltas[(student_id, name, start)] += delta
+    counters.add(PointsLedger.apply_deltas, deltas)
+
+@receiver(post_save, sender=Event)
+def move_event_points(sender, instance, created, **kwargs):
+    """Move attendee points when an event changes primary organization or term."""
+    # Stored values from before the save, set by link_primary_organization
+    previous = getattr(instance, '_saved_values', None)
+    if created or previous is None:
+        return
+    old_organization, old_date, _ = previous
+    old_start, new_start = term_start(old_date), term_start(instance.date)
+    if old_organization == instance.organization and old_start == new_start:
+        return
+
+    attendees = list(Attendance.objects.filter(event=instance).values_list('student_id', flat=True))
+    if not attendees:
+        return
+    secondary = set(instance.event_organizations.values_list('organization__name', flat=True))
+    old_keys = {PointsLedger.ALL_ORGANIZATIONS, old_organization} | secondary
+    new_keys = {PointsLedger.ALL_ORGANIZATIONS, instance.organization} | secondary
+    deltas = Counter()
+    for student_id in attendees:
+        for organization in old_keys:
+            deltas[(student_id, organization, old_start)] -= 1
+        for organization in new_keys:
+            deltas[(student_id, organization, new_start)] += 1
+    counters.add(PointsLedger.apply_deltas, deltas)
@@ -1,4 +1,8 @@
+from datetime import date
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..terms import Term, as_datetime, clear_current_term
 
 class Semester(models.Model):
     id = models.AutoField(primary_key=True)
@@ -11,9 +15,59 @@ class Semester(models.Model):
     season = models.CharField(max_length=6, choices=SEASON_CHOICES)
     year = models.IntegerField()
     is_current = models.BooleanField(default=False)
+    start_date = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Start of the term (inclusive); defaults from season and year"
+    )
+    end_date = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="End of the term (exclusive); defaults from season and year"
+    )
     
     class Meta:
         unique_together = ('season', 'year')
+        indexes = [
+            models.Index(fields=['start_date', 'end_date'], name='semester_bounds_idx'),
+        ]
         
     def __str__(self):
-        return f"{self.season} {self.year}"
\ No newline at end of file
+        return f"{self.season} {self.year}"
+
+    def default_bounds(self):
+        """
+        Fall runs Aug 1 - Jan 1 and Spring Jan 1 - Aug 1, matching the terms
+        used for points; Summer is May 1 - Aug 1.
+        """
+        if self.season == 'FALL':
+            return date(self.year, 8, 1), date(self.year + 1, 1, 1)
+        if self.season == 'SUMMER':
+            return date(self.year, 5, 1), date(self.year, 8, 1)
+        return date(self.year, 1, 1), date(self.year, 8, 1)
+
+    def save(self, *args, **kwargs):
+        start, end = self.default_bounds()
+        if self.start_date is None:
+            self.start_date = as_datetime(start)
+        if self.end_date is None:
+            self.end_date = as_datetime(end)
+        super().save(*args, **kwargs)
+
+    def as_term(self):
+        start, end = self.default_bounds()
+        return Term(
+            f"{self.get_season_display()} {self.year}",
+            self.start_date or as_datetime(start),
+            self.end_date or as_datetime(end)
+        )
+
+    @classmethod
+    def containing(cls, moment):
+        """The semester covering ``moment``, preferring the one marked current, then the latest start."""
+        return cls.objects.filter(start_date__lte=moment, end_date__gt=moment).order_by('-is_current', '-start_date').first()
+
+@receiver(post_save, sender=Semester)
+@receiver(post_delete, sender=Semester)
+def semester_changed(sender, **kwargs):
+    clear_current_term()
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from collections import defaultdict
 
 class Student(models.Model):
     id = models.AutoField(primary_key=True)
@@ -18,6 +20,13 @@ class Student(models.Model):
     cached_attendance_count = models.IntegerField(default=0)
     last_attendance_update = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['username'], name='student_username_idx'),
+            # Matches the students list ordering used for keyset pagination
+            models.Index(fields=['first_name', 'last_name', 'id'], name='student_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
@@ -25,6 +34,22 @@ class Student(models.Model):
         self.cached_attendance_count = self.attendances.count()
         self.save(update_fields=['cached_attendance_count', 'last_attendance_update'])
 
+    @classmethod
+    def apply_attendance_deltas(cls, deltas):
+        """
+        Apply a mapping of student id -> attendance count change with atomic
+        F() updates, one UPDATE per distinct delta.
+        """
+        students_by_delta = defaultdict(list)
+        for student_id, delta in deltas.items():
+            students_by_delta[delta].append(student_id)
+        now = timezone.now()
+        for delta, student_ids in students_by_delta.items():
+            cls.objects.filter(id__in=student_ids).update(
+                cached_attendance_count=models.F('cached_attendance_count') + delta,
+                last_attendance_update=now
+            )
+
     @property
     def total_points(self):
         return self.cached_attendance_count
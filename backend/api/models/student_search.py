@@ -0,0 +1,224 @@
+import re
+import threading
+import time
+import unicodedata
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models
+from django.db.models import Count, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .student import Student
+
+WORD_SPLIT = re.compile(r'[^0-9a-z]+')
+
+# Grams held by more than this share of students (and more than
+# COMMON_GRAM_MIN of them) are too common to narrow a search
+COMMON_GRAM_SHARE = 0.1
+COMMON_GRAM_MIN = 50
+# Most students ranked when a search falls back to substring matching
+FALLBACK_CANDIDATES = 500
+
+
+def normalize(value):
+    """Lowercase and strip accents so 'José' matches 'jose'."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def _field_values(first_name, last_name, email, username, user_username):
+    return [normalize(value) for value in (first_name, last_name, email, username, user_username) if value]
+
+
+class StudentSearchGram(models.Model):
+    """
+    Trigram index behind the admin student search.
+
+    Every student has one row per distinct trigram of their normalized names,
+    email, username and account username, plus a '^' + two letters row for
+    the start of each word (so two-letter words in longer queries match word
+    prefixes). A query finds the students that have all of its trigrams with
+    one indexed `gram IN (...)` lookup, instead of five `icontains` scans
+    joined to auth_user. Grams most students share ("usu", "edu") are left
+    out, and queries under three characters or with only common grams fall
+    back to `icontains` in the database; each worker caches the set of common
+    grams for STUDENT_SEARCH_COMMON_GRAMS_TTL seconds. Kept current by the receivers
+    below; bulk writes that bypass signals must call `index_students`.
+    Rebuild with `python manage.py rebuild_student_search`.
+    """
+    id = models.AutoField(primary_key=True)
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='search_grams'
+    )
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        unique_together = ['gram', 'student']
+
+    def __str__(self):
+        return f"{self.gram!r} -> {self.student_id}"
+
+    @staticmethod
+    def grams(values):
+        """Index grams for a list of normalized field values."""
+        grams = set()
+        for value in values:
+            grams.update(value[i:i + 3] for i in range(len(value) - 2))
+            grams.update(f'^{word[:2]}' for word in WORD_SPLIT.split(value) if len(word) >= 2)
+        return grams
+
+    @staticmethod
+    def query_grams(word):
+        """Grams every match for a normalized query word must have."""
+        if len(word) >= 3:
+            return {word[i:i + 3] for i in range(len(word) - 2)}
+        if len(word) == 2 and word.isalnum():
+            return {f'^{word}'}
+        return set()
+
+    @classmethod
+    def common_grams(cls):
+        """Grams held by too many students to narrow a search."""
+        limit = max(COMMON_GRAM_MIN, Student.objects.count() * COMMON_GRAM_SHARE)
+        return frozenset(
+            cls.objects.values('gram').annotate(students=Count('id')).filter(
+                students__gt=limit
+            ).values_list('gram', flat=True)
+        )
+
+    @classmethod
+    def selective_grams(cls, grams):
+        """``grams`` without those too common to narrow a search."""
+        if not grams:
+            return grams
+        return grams - get_common_grams()
+
+    @classmethod
+    def index_students(cls, student_ids):
+        """Replace the grams of ``student_ids``."""
+        student_ids = list(student_ids)
+        rows = Student.objects.filter(id__in=student_ids).values_list(
+            'id', 'first_name', 'last_name', 'email', 'username', 'user__username'
+        )
+        cls.objects.filter(student_id__in=student_ids).delete()
+        cls.objects.bulk_create(
+            (
+                cls(student_id=row[0], gram=gram)
+                for row in rows for gram in cls.grams(_field_values(*row[1:]))
+            ),
+            batch_size=2000
+        )
+
+    @classmethod
+    def rebuild(cls, chunk_size=500):
+        """Reindex every student, ``chunk_size`` at a time. Returns the number of students."""
+        student_ids = list(Student.objects.order_by('id').values_list('id', flat=True))
+        for i in range(0, len(student_ids), chunk_size):
+            cls.index_students(student_ids[i:i + chunk_size])
+        invalidate_common_grams()
+        return len(student_ids)
+
+    @classmethod
+    def search(cls, query, limit=20):
+        """
+        Students matching every word of ``query`` in any field, best matches
+        first: an exact field match, then a field prefix, a word prefix and
+        finally a substring. Users and admin profiles come with the students.
+        """
+        query = query.strip()
+        words = normalize(query).split()
+        if not words:
+            return []
+        grams = set()
+        if len(query) >= 3:
+            for word in words:
+                grams |= cls.query_grams(word)
+            grams = cls.selective_grams(grams)
+
+        if grams:
+            candidate_ids = cls.objects.filter(gram__in=grams).values('student_id').annotate(
+                matched=Count('id')
+            ).filter(matched=len(grams)).values('student_id')
+            candidates = Student.objects.filter(id__in=candidate_ids)
+        else:
+            # Short queries and common grams: substring matches, found by the database
+            candidates = Student.objects.filter(
+                _contains_all([query] if len(query) < 3 else query.split())
+            ).order_by('last_name', 'first_name', 'id')[:FALLBACK_CANDIDATES]
+        candidates = candidates.select_related('user', 'user__adminuser')
+
+        ranked = []
+        for student in candidates:
+            values = _field_values(
+                student.first_name, student.last_name, student.email, student.username, student.user.username
+            )
+            score = 0
+            for word in words:
+                qualities = [quality for quality in (_match_quality(word, value) for value in values) if quality is not None]
+                if not qualities:
+                    break
+                score += min(qualities)
+            else:
+                ranked.append((score, student.last_name.lower(), student.first_name.lower(), student.id, student))
+        ranked.sort(key=lambda entry: entry[:4])
+        return [entry[-1] for entry in ranked[:limit]]
+
+
+_common_grams = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+def get_common_grams():
+    # Counting grams is a pass over the whole index, and the common ones only
+    # change as the student body grows, so each worker reloads them on a TTL
+    global _common_grams, _loaded_at
+    ttl = getattr(settings, 'STUDENT_SEARCH_COMMON_GRAMS_TTL', 300)
+    with _lock:
+        if _common_grams is None or time.monotonic() - _loaded_at > ttl:
+            _common_grams = StudentSearchGram.common_grams()
+            _loaded_at = time.monotonic()
+        return _common_grams
+
+def invalidate_common_grams():
+    global _common_grams
+    with _lock:
+        _common_grams = None
+
+
+def _contains_all(terms):
+    """Students with every term in some searchable field."""
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(first_name__icontains=term) | Q(last_name__icontains=term) | Q(email__icontains=term) |
+            Q(username__icontains=term) | Q(user__username__icontains=term)
+        )
+    return condition
+
+def _match_quality(word, value):
+    """0 for an exact match, 1 field prefix, 2 word prefix, 3 substring, None for no match."""
+    if value == word:
+        return 0
+    if value.startswith(word):
+        return 1
+    if any(part.startswith(word) for part in WORD_SPLIT.split(value)):
+        return 2
+    if word in value:
+        return 3
+    return None
+
+
+SEARCH_FIELDS = {'first_name', 'last_name', 'email', 'username', 'user', 'user_id'}
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, update_fields=None, **kwargs):
+    # Counter refreshes save with update_fields and never touch searchable fields
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        StudentSearchGram.index_students([instance.id])
+
+@receiver(post_save, sender=User)
+def index_user_student(sender, instance, created, update_fields=None, **kwargs):
+    # New users get their profile (and index) from the Student save; logins only touch last_login
+    if not created and (update_fields is None or 'username' in update_fields):
+        StudentSearchGram.index_students(Student.objects.filter(user=instance).values_list('id', flat=True))
@@ -8,8 +8,26 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
-from .models import Student, Event, Attendance, Semester
-from datetime import datetime
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.conf import settings
+from .models import Student, Event, Attendance, CheckinQueueItem, EventVisibility, Organization, StudentSearchGram
+from .models.attendance import record_attendance_changes
+from .identity_cache import (
+    student_index,
+    cached_student,
+    student_matches,
+    email_key,
+    a_number_key,
+    name_key,
+)
+from .event_matcher import get_classifier, event_classification_changed
+from .credentials import DEFAULT_PASSWORD, default_password_hash, password_hashes
+from .database import connection_stats, serialized_writes
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 import re
 
 logger = logging.getLogger(__name__)
@@ -91,45 +109,8 @@ def onetap_webhook_handler(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Log the full payload for debugging
-        logger.info(f"OneTap payload: {json.dumps(payload, indent=2)}")
-        
-        # Extract data from OneTap format
-        event_type = payload.get('event')
-        if event_type != 'participant.checkin':
-            return Response(
-                {'error': f'Unsupported event type: {event_type}. Only participant.checkin is supported'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        data = payload.get('data', {})
-        participant_data = data.get('participant', {})
-        profile_data = data.get('profile', {})
-        list_data = data.get('list', {})
-        
-        # Validate required fields
-        if not profile_data.get('email'):
-            debug_logger.error("Rejected request: missing profile email")
-            return Response(
-                {'error': 'Profile email is required'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if not list_data.get('name'):
-            debug_logger.error("Rejected request: missing event name in list data")
-            return Response(
-                {'error': 'Event name is required'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Process the check-in
-        result = process_onetap_checkin(participant_data, profile_data, list_data)
-        try:
-            debug_logger.info(f"SUCCESS student={result.get('data',{}).get('student')} event={result.get('data',{}).get('event')} attendance={result.get('data',{}).get('attendance')}")
-        except Exception as _e:
-            debug_logger.error(f"SUCCESS log failure: {str(_e)}")
-        
-        return Response(result, status=status.HTTP_201_CREATED)
+        data, code = handle_onetap_payload(payload)
+        return Response(data, status=code)
         
     except Exception as e:
         logger.error(f"OneTap webhook error: {str(e)}", exc_info=True)
@@ -142,52 +123,183 @@ def onetap_webhook_handler(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+def handle_onetap_payload(payload):
+    """Queue or process a parsed webhook payload. Returns the response data and status code."""
+    # Log the full payload for debugging
+    logger.info(f"OneTap payload: {json.dumps(payload, indent=2)}")
+    
+    # With the queue enabled, only validate and store; process_checkin_queue does the writes
+    if settings.ONETAP_QUEUE_ENABLED:
+        with serialized_writes():
+            return enqueue_onetap_payload(payload)
+    
+    # A JSON array is a batch of check-ins, processed together
+    if isinstance(payload, list):
+        with serialized_writes():
+            results = process_onetap_checkin_batch(payload)
+        failed = sum(1 for item in results if not item['success'])
+        debug_logger.info(f"BATCH processed={len(results)} failed={failed}")
+        return {
+            'success': failed == 0,
+            'processed': len(results),
+            'failed': failed,
+            'results': results,
+            'source': 'onetap_webhook'
+        }, status.HTTP_200_OK
+    
+    # Extract data from OneTap format
+    error = validate_onetap_payload(payload)
+    if error:
+        debug_logger.error(f"Rejected request: {error}")
+        return {'error': error}, status.HTTP_400_BAD_REQUEST
+    
+    data = payload.get('data', {})
+    participant_data = data.get('participant', {})
+    profile_data = data.get('profile', {})
+    list_data = data.get('list', {})
+    
+    # Process the check-in
+    with serialized_writes():
+        result = process_onetap_checkin(participant_data, profile_data, list_data)
+    try:
+        debug_logger.info(f"SUCCESS student={result.get('data',{}).get('student')} event={result.get('data',{}).get('event')} attendance={result.get('data',{}).get('attendance')}")
+    except Exception as _e:
+        debug_logger.error(f"SUCCESS log failure: {str(_e)}")
+    
+    return result, status.HTTP_201_CREATED
+
+def enqueue_onetap_payload(payload):
+    """Validate a single or batched payload, store the valid check-ins and acknowledge with 202."""
+    if not isinstance(payload, list):
+        error = validate_onetap_payload(payload)
+        if error:
+            debug_logger.error(f"Rejected request: {error}")
+            return {'error': error}, status.HTTP_400_BAD_REQUEST
+        item = CheckinQueueItem.enqueue([payload])[0]
+        debug_logger.info(f"QUEUED id={item.id}")
+        return {
+            'success': True,
+            'message': 'Check-in queued for processing',
+            'queue_id': item.id,
+            'source': 'onetap_webhook'
+        }, status.HTTP_202_ACCEPTED
+    
+    results = []
+    valid = []
+    for index, item in enumerate(payload):
+        error = validate_onetap_payload(item)
+        if error:
+            results.append({'index': index, 'success': False, 'error': error})
+        else:
+            results.append({'index': index, 'success': True})
+            valid.append(item)
+    
+    queued = iter(CheckinQueueItem.enqueue(valid))
+    for result in results:
+        if result['success']:
+            result['queue_id'] = next(queued).id
+    
+    failed = len(payload) - len(valid)
+    debug_logger.info(f"QUEUED BATCH queued={len(valid)} rejected={failed}")
+    return {
+        'success': failed == 0,
+        'queued': len(valid),
+        'failed': failed,
+        'results': results,
+        'source': 'onetap_webhook'
+    }, status.HTTP_202_ACCEPTED
+
+def validate_onetap_payload(payload):
+    """Return an error message if a single OneTap payload cannot be processed, else None."""
+    if not isinstance(payload, dict):
+        return 'Payload must be a JSON object'
+    
+    event_type = payload.get('event')
+    if event_type != 'participant.checkin':
+        return f'Unsupported event type: {event_type}. Only participant.checkin is supported'
+    
+    data = payload.get('data', {})
+    
+    # Validate required fields
+    if not data.get('profile', {}).get('email'):
+        return 'Profile email is required'
+    
+    if not data.get('list', {}).get('name'):
+        return 'Event name is required'
+    
+    return None
+
+def parse_onetap_checkin(participant_data, profile_data, list_data):
+    """Normalize the participant, profile and list sections of a OneTap check-in."""
+    # Extract profile information
+    profile_name = profile_data.get('name', '').strip()
+    profile_email = profile_data.get('email', '').strip()
+    profile_phone = profile_data.get('phone', '')
+    custom_fields = profile_data.get('customFields', {})
+    a_number = custom_fields.get('A-Number', '').strip()
+    
+    # Parse name (assume format is "First Last" or "First Middle Last")
+    name_parts = profile_name.split()
+    if len(name_parts) >= 2:
+        first_name = name_parts[0]
+        last_name = ' '.join(name_parts[1:])  # Handle middle names
+    else:
+        first_name = profile_name
+        last_name = ''
+    
+    # Extract event information
+    event_name = list_data.get('name', '').strip()
+    event_date_str = list_data.get('date', '')
+    event_description = list_data.get('description', '')
+    
+    # Parse event date
+    try:
+        if event_date_str:
+            # OneTap sends ISO format, convert to datetime
+            event_date = datetime.fromisoformat(event_date_str.replace('Z', '+00:00'))
+        else:
+            # Use current time if no date provided
+            event_date = datetime.now()
+    except ValueError:
+        event_date = datetime.now()
+    
+    # Extract check-in time
+    check_in_date_str = participant_data.get('checkInDate', '')
+    try:
+        if check_in_date_str:
+            check_in_time = datetime.fromisoformat(check_in_date_str.replace('Z', '+00:00'))
+        else:
+            check_in_time = datetime.now()
+    except ValueError:
+        check_in_time = datetime.now()
+    
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': profile_email,
+        'phone': profile_phone,
+        'a_number': a_number,
+        'event_name': event_name,
+        'event_date': event_date,
+        'event_description': event_description,
+        'check_in_time': check_in_time,
+    }
+
 def process_onetap_checkin(participant_data, profile_data, list_data):
     """
     Process a OneTap check-in by creating/updating student, event, and attendance.
     """
     try:
-        # Extract profile information
-        profile_name = profile_data.get('name', '').strip()
-        profile_email = profile_data.get('email', '').strip()
-        profile_phone = profile_data.get('phone', '')
-        custom_fields = profile_data.get('customFields', {})
-        a_number = custom_fields.get('A-Number', '').strip()
-        
-        # Parse name (assume format is "First Last" or "First Middle Last")
-        name_parts = profile_name.split()
-        if len(name_parts) >= 2:
-            first_name = name_parts[0]
-            last_name = ' '.join(name_parts[1:])  # Handle middle names
-        else:
-            first_name = profile_name
-            last_name = ''
-        
-        # Extract event information
-        event_name = list_data.get('name', '').strip()
-        event_date_str = list_data.get('date', '')
-        event_description = list_data.get('description', '')
-        
-        # Parse event date
-        try:
-            if event_date_str:
-                # OneTap sends ISO format, convert to datetime
-                event_date = datetime.fromisoformat(event_date_str.replace('Z', '+00:00'))
-            else:
-                # Use current time if no date provided
-                event_date = datetime.now()
-        except ValueError:
-            event_date = datetime.now()
-        
-        # Extract check-in time
-        check_in_date_str = participant_data.get('checkInDate', '')
-        try:
-            if check_in_date_str:
-                check_in_time = datetime.fromisoformat(check_in_date_str.replace('Z', '+00:00'))
-            else:
-                check_in_time = datetime.now()
-        except ValueError:
-            check_in_time = datetime.now()
+        checkin = parse_onetap_checkin(participant_data, profile_data, list_data)
+        first_name = checkin['first_name']
+        last_name = checkin['last_name']
+        profile_email = checkin['email']
+        profile_phone = checkin['phone']
+        a_number = checkin['a_number']
+        event_name = checkin['event_name']
+        event_date = checkin['event_date']
+        event_description = checkin['event_description']
+        check_in_time = checkin['check_in_time']
         
         # Step 1: Create or find student
         student = create_or_find_student(
@@ -264,10 +376,10 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
                 counter += 1
             
             # Create user account with password "changeme!"
-            user = User.objects.create_user(
+            user = User.objects.create(
                 username=username,
-                email=student.email,
-                password='changeme!',
+                email=User.objects.normalize_email(student.email),
+                password=default_password_hash(),
                 first_name=student.first_name,
                 last_name=student.last_name,
                 is_active=True
@@ -284,30 +396,44 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
     # Get username from email handle (part before @)
     email_handle = email.split('@')[0] if '@' in email else email
     
-    # Try to find existing student by email first
-    student = None
+    # Try to find existing student by email first; repeat check-ins usually
+    # resolve each key from the identity index with a single query
+    student = cached_student(email_key(email))
+    if student:
+        logger.info(f"Found cached student by email: {student.first_name} {student.last_name}")
+        return ensure_student_has_user(student, email_handle)
     try:
         student = Student.objects.get(email=email)
         logger.info(f"Found existing student by email: {student.first_name} {student.last_name}")
         # Ensure student has a user
         student = ensure_student_has_user(student, email_handle)
+        student_index.set(email_key(email), student)
         return student
     except Student.DoesNotExist:
         pass
     
     # Try to find by A-number if provided
     if a_number:
+        student = cached_student(a_number_key(a_number))
+        if student:
+            logger.info(f"Found cached student by A-number: {student.first_name} {student.last_name}")
+            return ensure_student_has_user(student, email_handle)
         try:
             student = Student.objects.get(user__username=a_number.lower())
             logger.info(f"Found existing student by A-number: {student.first_name} {student.last_name}")
             # Ensure student has a user
             student = ensure_student_has_user(student, email_handle)
+            student_index.set(a_number_key(a_number), student)
             return student
         except Student.DoesNotExist:
             pass
     
     # Try to find by name
     if first_name and last_name:
+        student = cached_student(name_key(first_name, last_name))
+        if student:
+            logger.info(f"Found cached student by name: {student.first_name} {student.last_name}")
+            return ensure_student_has_user(student, email_handle)
         try:
             student = Student.objects.get(
                 first_name__iexact=first_name,
@@ -316,6 +442,7 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
             logger.info(f"Found existing student by name: {student.first_name} {student.last_name}")
             # Ensure student has a user
             student = ensure_student_has_user(student, email_handle)
+            student_index.set(name_key(first_name, last_name), student)
             return student
         except Student.DoesNotExist:
             pass
@@ -336,10 +463,10 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
         logger.info(f"Found existing user by email: {user.username}")
     else:
         # Create user account with password "changeme!"
-        user = User.objects.create_user(
+        user = User.objects.create(
             username=username,
-            email=email,
-            password='changeme!',
+            email=User.objects.normalize_email(email),
+            password=default_password_hash(),
             first_name=first_name,
             last_name=last_name,
             is_active=True
@@ -350,6 +477,7 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
     if Student.objects.filter(user=user).exists():
         student = Student.objects.get(user=user)
         logger.info(f"Found existing student profile for user: {student.first_name} {student.last_name}")
+        student_index.set(email_key(email), student)
         return student
     
     # Create student profile
@@ -362,63 +490,47 @@ def create_or_find_student(first_name, last_name, email, a_number, phone):
     )
     
     logger.info(f"Created new student: {student.first_name} {student.last_name} ({email})")
+    student_index.set(email_key(email), student)
     return student
 
+def classify_event_name(event_name):
+    """Pick the organization and event type for a new event from its name."""
+    organization, event_type = get_classifier().classify(event_name)
+    logger.info(f"Matched organization: {organization}, event type: {event_type}")
+    return organization, event_type
+
+def _local_day(value):
+    """The calendar day of ``value`` in the current timezone (naive datetimes are taken as local)."""
+    return (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+
+def _day_bounds(day):
+    """Aware [start, end) datetimes covering ``day`` in the current timezone, for indexed date lookups."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+    return start, end
+
 def create_or_find_event(event_name, event_date, event_description):
     """Create or find an event based on OneTap list data."""
     
-    # Try to find existing event by name and date
-    try:
-        event = Event.objects.get(
-            name=event_name,
-            date__date=event_date.date()
-        )
+    # Try to find existing event by name and date (a range on the indexed
+    # (name, date) pair rather than a per-row date cast)
+    day_start, day_end = _day_bounds(_local_day(event_date))
+    event = Event.objects.filter(
+        name=event_name,
+        date__gte=day_start,
+        date__lt=day_end
+    ).order_by('id').first()
+    if event:
         logger.info(f"Found existing event: {event.name} on {event.date}")
         return event
-    except Event.DoesNotExist:
-        pass
     
     # Create new event
-    
-    # Get unique organizations and event types from database
-    existing_organizations = list(Event.objects.values_list('organization', flat=True).distinct())
-    existing_event_types = list(Event.objects.values_list('event_type', flat=True).distinct())
-    
-    logger.info(f"Available organizations: {existing_organizations}")
-    logger.info(f"Available event types: {existing_event_types}")
     logger.info(f"Processing event name: '{event_name}'")
     
-    # Extract organization from event name (case-sensitive)
-    organization = 'ASC'  # Default organization
-    
-    for org in existing_organizations:
-        if org and org in event_name:  # Case-sensitive match
-            organization = org
-            logger.info(f"Matched organization: {org}")
-            break
-    
-    # Check if event name contains any of the existing event types
-    event_name_lower = event_name.lower()
-    event_type = 'General'  # Default value
-    
-    for existing_type in existing_event_types:
-        if existing_type and existing_type.lower() in event_name_lower:
-            event_type = existing_type
-            logger.info(f"Matched event type: {existing_type}")
-            break
+    organization, event_type = classify_event_name(event_name)
     
     logger.info(f"Final organization: {organization}, event_type: {event_type}")
     
-    # Get current semester (or create a default one)
-    current_semester = Semester.objects.filter(is_current=True).first()
-    if not current_semester:
-        current_semester = Semester.objects.create(
-            name="Current Semester",
-            start_date=datetime.now().date(),
-            end_date=datetime.now().date(),
-            is_current=True
-        )
-    
     # Create event
     event = Event.objects.create(
         name=event_name,
@@ -454,15 +566,340 @@ def create_attendance_record(student, event, check_in_time):
     logger.info(f"Created attendance record: {student.first_name} {student.last_name} → {event.name}")
     return attendance
 
+def process_onetap_checkin_batch(payloads):
+    """
+    Process a list of OneTap check-in payloads together.
+    
+    Students, events and attendance for the whole batch are resolved with a
+    handful of IN queries, and missing rows are written with bulk_create inside
+    one transaction. Returns one result per payload, in the same order.
+    """
+    results = [None] * len(payloads)
+    checkins = {}
+    for index, payload in enumerate(payloads):
+        error = validate_onetap_payload(payload)
+        if error:
+            results[index] = {'index': index, 'success': False, 'error': error}
+            continue
+        data = payload['data']
+        checkins[index] = parse_onetap_checkin(
+            data.get('participant', {}), data.get('profile', {}), data.get('list', {})
+        )
+    
+    if checkins:
+        try:
+            with transaction.atomic():
+                students = resolve_students_bulk(checkins.values())
+                events = resolve_events_bulk(checkins.values())
+                attendances = create_attendance_records_bulk({
+                    (students[checkin['email']].id, events[_event_key(checkin)].id)
+                    for checkin in checkins.values()
+                })
+        except Exception as e:
+            logger.error(f"Error processing OneTap check-in batch: {str(e)}", exc_info=True)
+            for index in checkins:
+                results[index] = {'index': index, 'success': False, 'error': str(e)}
+            return results
+        
+        for index, checkin in checkins.items():
+            student = students[checkin['email']]
+            event = events[_event_key(checkin)]
+            attendance = attendances[(student.id, event.id)]
+            results[index] = {
+                'index': index,
+                'success': True,
+                'data': {
+                    'student': {
+                        'id': student.id,
+                        'name': f"{student.first_name} {student.last_name}",
+                        'email': student.email,
+                        'a_number': checkin['a_number']
+                    },
+                    'event': {
+                        'id': event.id,
+                        'name': event.name,
+                        'date': event.date.isoformat(),
+                        'location': event.location
+                    },
+                    'attendance': {
+                        'id': attendance.id,
+                        'checked_in_at': attendance.checked_in_at.isoformat()
+                    }
+                }
+            }
+    
+    return results
+
+def resolve_students_bulk(checkins):
+    """
+    Find or create the student for each check-in, using the same matching order
+    as create_or_find_student (email, then A-number, then name).
+    Returns a dict mapping the check-in email to its Student.
+    """
+    pending = {}
+    for checkin in checkins:
+        pending.setdefault(checkin['email'], checkin)
+    
+    # Each key is tried in the identity index, then the database, before the next
+    students = {}
+    
+    # Match by email
+    students.update(_cached_students(pending, lambda email, checkin: email_key(email)))
+    pending = {email: checkin for email, checkin in pending.items() if email not in students}
+    for student in Student.objects.filter(email__in=pending):
+        students[student.email] = student
+        student_index.set(email_key(student.email), student)
+    pending = {email: checkin for email, checkin in pending.items() if email not in students}
+    
+    # Match by A-number (stored as the username of the student's user)
+    students.update(_cached_students(
+        pending, lambda email, checkin: a_number_key(checkin['a_number']) if checkin['a_number'] else None
+    ))
+    pending = {email: checkin for email, checkin in pending.items() if email not in students}
+    a_numbers = {checkin['a_number'].lower() for checkin in pending.values() if checkin['a_number']}
+    if a_numbers:
+        by_a_number = {
+            student.a_number: student
+            for student in Student.objects.filter(user__username__in=a_numbers).annotate(a_number=F('user__username'))
+        }
+        for email, checkin in list(pending.items()):
+            student = by_a_number.get(checkin['a_number'].lower()) if checkin['a_number'] else None
+            if student:
+                students[email] = student
+                student_index.set(a_number_key(checkin['a_number']), student)
+                del pending[email]
+    
+    # Match by case-insensitive first and last name, only when unambiguous
+    students.update(_cached_students(
+        pending,
+        lambda email, checkin: name_key(checkin['first_name'], checkin['last_name'])
+        if checkin['first_name'] and checkin['last_name'] else None
+    ))
+    pending = {email: checkin for email, checkin in pending.items() if email not in students}
+    # Match by case-insensitive first and last name, only when unambiguous
+    named = [checkin for checkin in pending.values() if checkin['first_name'] and checkin['last_name']]
+    if named:
+        by_name = defaultdict(list)
+        candidates = Student.objects.annotate(
+            first_lower=Lower('first_name'), last_lower=Lower('last_name')
+        ).filter(
+            first_lower__in={checkin['first_name'].lower() for checkin in named},
+            last_lower__in={checkin['last_name'].lower() for checkin in named}
+        )
+        for student in candidates:
+            by_name[(student.first_lower, student.last_lower)].append(student)
+        for checkin in named:
+            matches = by_name.get((checkin['first_name'].lower(), checkin['last_name'].lower()), [])
+            if len(matches) == 1:
+                students[checkin['email']] = matches[0]
+                student_index.set(name_key(checkin['first_name'], checkin['last_name']), matches[0])
+                del pending[checkin['email']]
+    
+    if pending:
+        for email, student in create_students_bulk(pending).items():
+            students[email] = student
+            student_index.set(email_key(email), student)
+    return students
+
+def _cached_students(pending, key_for):
+    """Students in the identity index for the pending check-ins' ``key_for(email, checkin)`` keys, by check-in email."""
+    cached = {}
+    for email, checkin in pending.items():
+        key = key_for(email, checkin)
+        student_id = student_index.get(key) if key is not None else None
+        if student_id is not None:
+            cached[email] = (key, student_id)
+    if not cached:
+        return {}
+    found = Student.objects.select_related('user').in_bulk({student_id for _, student_id in cached.values()})
+    students = {}
+    for email, (key, student_id) in cached.items():
+        student = found.get(student_id)
+        if student and student_matches(student, key):
+            students[email] = student
+        else:
+            student_index.discard([key])
+    return students
+
+def create_students_bulk(pending):
+    """Create users and student profiles for a dict of email -> check-in."""
+    users = {user.email: user for user in User.objects.filter(email__in=pending)}
+    conflicts = {}
+    
+    # Pick a unique username (email handle, then handle_1, handle_2, ...) for each new user
+    handles = {
+        email: (email.split('@')[0] if '@' in email else email).lower()
+        for email in pending if email not in users
+    }
+    taken_filter = Q(username__in=handles.values())
+    for handle in set(handles.values()):
+        taken_filter |= Q(username__startswith=f"{handle}_")
+    taken = set(User.objects.filter(taken_filter).values_list('username', flat=True)) if handles else set()
+    
+    new_usernames = {}
+    for email, handle in handles.items():
+        username = handle
+        counter = 1
+        while username in taken:
+            username = f"{handle}_{counter}"
+            counter += 1
+        taken.add(username)
+        new_usernames[email] = username
+    
+    if new_usernames:
+        # bulk_create skips the post_save signal, so student profiles are created below
+        # One process: no hashing pool inside a web worker
+        passwords = password_hashes([DEFAULT_PASSWORD] * len(new_usernames), workers=1)
+        User.objects.bulk_create([
+            User(
+                username=username,
+                email=User.objects.normalize_email(email),
+                password=password,
+                first_name=pending[email]['first_name'],
+                last_name=pending[email]['last_name'],
+                is_active=True
+            )
+            for (email, username), password in zip(new_usernames.items(), passwords)
+        ], ignore_conflicts=True)
+        created_users = {user.username: user for user in User.objects.filter(username__in=new_usernames.values())}
+        for email, username in new_usernames.items():
+            user = created_users.get(username)
+            if user is not None and user.email == User.objects.normalize_email(email):
+                users[email] = user
+                logger.info(f"Created new user: {username}")
+            else:
+                # Another request took the username first; that account belongs to someone else
+                conflicts[email] = pending[email]
+    
+    profiles = {student.user_id: student for student in Student.objects.filter(user__in=users.values())}
+    Student.objects.bulk_create([
+        Student(
+            user=user,
+            first_name=pending[email]['first_name'],
+            last_name=pending[email]['last_name'],
+            email=user.email,
+            username=user.username
+        )
+        for email, user in users.items() if user.id not in profiles
+    ], ignore_conflicts=True)
+    profiles.update(
+        (student.user_id, student) for student in Student.objects.filter(user__in=users.values())
+    )
+    # bulk_create skips the receivers that maintain the search index
+    StudentSearchGram.index_students(profiles[user.id].id for user in users.values())
+    students = {email: profiles[user.id] for email, user in users.items()}
+    for email, checkin in conflicts.items():
+        students[email] = create_or_find_student(
+            checkin['first_name'], checkin['last_name'], email, checkin['a_number'], checkin['phone']
+        )
+    return students
+
+def _event_key(checkin):
+    # Found events are keyed by their local day, so offsets that cross midnight match
+    return (checkin['event_name'], _local_day(checkin['event_date']))
+
+def _find_events(keys):
+    events = {}
+    days = {day for _, day in keys}
+    first_day, _ = _day_bounds(min(days))
+    _, last_day = _day_bounds(max(days))
+    candidates = Event.objects.filter(
+        name__in={name for name, _ in keys},
+        date__gte=first_day,
+        date__lt=last_day
+    ).order_by('id')
+    for event in candidates:
+        key = (event.name, timezone.localtime(event.date).date())
+        if key in keys:
+            events.setdefault(key, event)
+    return events
+
+def resolve_events_bulk(checkins):
+    """Find or create the event for each check-in. Returns a dict keyed by (name, date)."""
+    first_checkin = {}
+    for checkin in checkins:
+        first_checkin.setdefault(_event_key(checkin), checkin)
+    
+    events = _find_events(first_checkin)
+    missing = [key for key in first_checkin if key not in events]
+    if missing:
+        classified = {key: classify_event_name(first_checkin[key]['event_name']) for key in missing}
+        # bulk_create skips the pre_save receiver that links the primary organization
+        organization_ids = dict(Organization.objects.filter(
+            name__in={organization for organization, _ in classified.values()}
+        ).values_list('name', 'id'))
+        new_events = []
+        for key in missing:
+            checkin = first_checkin[key]
+            organization, event_type = classified[key]
+            new_events.append(Event(
+                name=checkin['event_name'],
+                date=checkin['event_date'],
+                organization=organization,
+                primary_organization_id=organization_ids.get(organization),
+                event_type=event_type,
+                description=checkin['event_description'],
+                location='ASC Space'  # Default location
+            ))
+        Event.objects.bulk_create(new_events)
+        for event in new_events:
+            event_classification_changed(event)
+        logger.info(f"Created {len(new_events)} new events from check-in batch")
+        events.update(zip(missing, new_events))
+        # bulk_create skips the post_save receivers that maintain visibility
+        EventVisibility.sync_events([events[key].id for key in missing])
+    return events
+
+def create_attendance_records_bulk(pairs):
+    """Create attendance for a set of (student_id, event_id) pairs, skipping existing ones."""
+    student_ids = {student_id for student_id, _ in pairs}
+    event_ids = {event_id for _, event_id in pairs}
+    
+    def existing():
+        return {
+            (attendance.student_id, attendance.event_id): attendance
+            for attendance in Attendance.objects.filter(student_id__in=student_ids, event_id__in=event_ids)
+        }
+    
+    attendances = existing()
+    new_pairs = [pair for pair in pairs if pair not in attendances]
+    if new_pairs:
+        created = Attendance.objects.bulk_create(
+            [Attendance(student_id=student_id, event_id=event_id) for student_id, event_id in new_pairs],
+            ignore_conflicts=True
+        )
+        attendances = existing()
+        # ignore_conflicts skips pairs another request inserted (and counted) after
+        # the first read, so only count rows that carry this insert's check-in time
+        inserted = {}
+        for attendance in created:
+            pair = (attendance.student_id, attendance.event_id)
+            if pair in attendances and attendances[pair].checked_in_at == attendance.checked_in_at:
+                inserted[pair] = attendance.checked_in_at
+        # bulk_create does not send post_save, so update the attendance counters here
+        record_attendance_changes(list(inserted), checked_in_at=list(inserted.values()))
+        logger.info(f"Created {len(inserted)} attendance records from check-in batch")
+    return attendances
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def onetap_webhook_status(request):
     """
     Health check endpoint for OneTap webhook.
     """
-    return Response({
+    return Response({**webhook_status(staff=request.user.is_staff), 'queue': CheckinQueueItem.stats()})
+
+def webhook_status(staff=False):
+    """The status endpoint's payload, without the queue stats. Worker internals are only shown to staff."""
+    payload = {
         'status': 'healthy',
         'message': 'OneTap webhook handler is operational',
         'supported_events': ['participant.checkin'],
+        'supports_batch': True,
+        'queue_enabled': settings.ONETAP_QUEUE_ENABLED,
         'endpoint': '/api/webhook/onetap-handler/'
-    })
+    }
+    if staff:
+        payload['identity_cache'] = student_index.stats()
+        payload['database'] = connection_stats()
+    return payload
@@ -0,0 +1,66 @@
+"""
+Per-process registry of the organizations events can be assigned to.
+
+Event create/update validates the primary organization against the club
+roles held by admins (every AdminUser role except Faculty and Super Admin)
+and the secondary organizations against the Organization table. Both sets
+are small and change rarely, so each worker loads them once and keeps them
+until an AdminUser or Organization is saved or deleted in this process, or
+ORGANIZATION_REGISTRY_TTL seconds pass so changes made by other workers are
+picked up.
+"""
+import threading
+import time
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import AdminUser, Organization
+
+NON_CLUB_ROLES = ('Faculty', 'Super Admin')
+
+
+class OrganizationRegistry:
+    def __init__(self, club_roles, organization_ids):
+        self.club_roles = club_roles
+        self.organization_ids = organization_ids
+
+    @classmethod
+    def load(cls):
+        return cls(
+            frozenset(AdminUser.objects.exclude(role__in=NON_CLUB_ROLES).values_list('role', flat=True).distinct()),
+            frozenset(Organization.objects.values_list('id', flat=True)),
+        )
+
+    def is_club(self, role):
+        return role in self.club_roles
+
+    def unknown_organizations(self, organization_ids):
+        """The ids in ``organization_ids`` with no Organization, in order."""
+        return [organization_id for organization_id in organization_ids if organization_id not in self.organization_ids]
+
+
+_registry = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+def get_registry():
+    global _registry, _loaded_at
+    ttl = getattr(settings, 'ORGANIZATION_REGISTRY_TTL', 300)
+    with _lock:
+        if _registry is None or time.monotonic() - _loaded_at > ttl:
+            _registry = OrganizationRegistry.load()
+            _loaded_at = time.monotonic()
+        return _registry
+
+def invalidate_registry():
+    global _registry
+    with _lock:
+        _registry = None
+
+
+@receiver(post_save, sender=AdminUser)
+@receiver(post_delete, sender=AdminUser)
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def organizations_changed(sender, **kwargs):
+    invalidate_registry()
@@ -0,0 +1,77 @@
+"""
+Leaderboard ranks and percentiles for the student points endpoint.
+
+The (student_id, points) columns for a scope are loaded once, in points
+order, into compact `array` buffers; dense ranks and the bounds of each tie
+group are computed in a single pass, so a student's rank, percentile, the
+top N or the window around a student are answered by index arithmetic
+instead of shipping and re-sorting the whole table.
+"""
+from array import array
+
+
+class Leaderboard:
+    def __init__(self, rows):
+        """``rows`` is an iterable of (student_id, points, details) sorted by points descending."""
+        self.student_ids = array('q')
+        self.points = array('q')
+        self.details = []
+        for student_id, points, details in rows:
+            self.student_ids.append(student_id)
+            self.points.append(points)
+            self.details.append(details)
+        self.count = len(self.points)
+
+        # Dense rank per row, and the first row index of each rank's tie group
+        self.ranks = array('q', bytes(8 * self.count))
+        self.group_starts = array('q')
+        for index, points in enumerate(self.points):
+            if not index or points != self.points[index - 1]:
+                self.group_starts.append(index)
+            self.ranks[index] = len(self.group_starts)
+        self.group_starts.append(self.count)
+        self._index = {student_id: index for index, student_id in enumerate(self.student_ids)}
+
+    @classmethod
+    def from_queryset(cls, students, points_field, fields=()):
+        """Build from a Student queryset annotated with ``points_field``."""
+        rows = students.order_by(f'-{points_field}', 'id').values_list('id', points_field, *fields)
+        return cls(
+            (row[0], row[1], dict(zip(fields, row[2:]))) for row in rows.iterator(chunk_size=2000)
+        )
+
+    def index_of(self, student_id):
+        return self._index.get(student_id)
+
+    def entry(self, index):
+        rank = self.ranks[index]
+        group_start, group_end = self.group_starts[rank - 1], self.group_starts[rank]
+        # Share of students with fewer points, counting half of the student's own tie group
+        below = self.count - group_end
+        ties = group_end - group_start
+        return {
+            'student_id': self.student_ids[index],
+            **self.details[index],
+            'total_points': self.points[index],
+            'rank': rank,
+            'position': group_start + 1,
+            'ties': ties,
+            'percentile': round(100 * (below + ties / 2) / self.count, 2),
+        }
+
+    def entries(self, start=0, stop=None):
+        return [self.entry(index) for index in range(start, min(self.count, stop if stop is not None else self.count))]
+
+    def top(self, n):
+        """The first ``n`` rows, extended to include everyone tied with the last one."""
+        if n <= 0 or not self.count:
+            return []
+        last_rank = self.ranks[min(n, self.count) - 1]
+        return self.entries(0, self.group_starts[last_rank])
+
+    def around(self, student_id, radius):
+        """The ``radius`` rows on either side of ``student_id``, or None if the student is not ranked."""
+        index = self.index_of(student_id)
+        if index is None:
+            return None
+        return self.entries(max(0, index - radius), index + radius + 1)
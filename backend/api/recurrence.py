@@ -0,0 +1,114 @@
+"""
+Recurring event instances.
+
+A recurring event is stored once as the parent (`is_recurring`, with a
+`recurrence_type` and optional `recurrence_end_date`); each occurrence after
+it is a plain Event with `parent_event` set. Occurrences are computed with
+dateutil's rrule and written with one bulk_create per series, together with
+copies of the parent's secondary organizations.
+
+By default a new series is materialized up front, through its end date or a
+year after it starts. With RECURRING_EVENTS_WINDOW_DAYS set, only the
+occurrences within that many days from now are created, and the
+`materialize_recurring_events` command (run daily) extends every series as
+the window moves.
+"""
+from datetime import timedelta
+from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import Event, EventOrganization
+from .models.event_organization import record_event_organization_changes
+from .csv_import import create_events
+
+# Open-ended series stop a year after they start
+DEFAULT_SPAN = timedelta(days=365)
+
+FREQUENCIES = {
+    'daily': (DAILY, 1),
+    'weekly': (WEEKLY, 1),
+    'biweekly': (WEEKLY, 2),
+    'monthly': (MONTHLY, 1),
+}
+
+
+def window():
+    """How far ahead to materialize occurrences, or None for whole series."""
+    days = getattr(settings, 'RECURRING_EVENTS_WINDOW_DAYS', 0)
+    return timedelta(days=days) if days else None
+
+def series_end(parent):
+    return parent.recurrence_end_date or parent.date + DEFAULT_SPAN
+
+def is_series(event):
+    return event.is_recurring and event.recurrence_type in FREQUENCIES
+
+
+def occurrences(parent, after, until):
+    """Dates of ``parent``'s occurrences in (after, until], in the local time zone."""
+    freq, interval = FREQUENCIES[parent.recurrence_type]
+    start = timezone.localtime(parent.date)
+    rule = {'freq': freq, 'interval': interval, 'dtstart': start}
+    if freq == MONTHLY and start.day > 28:
+        # The 29th-31st fall back to the last day of shorter months
+        rule.update(bymonthday=tuple(range(28, start.day + 1)), bysetpos=-1)
+    dates = rrule(**rule).between(timezone.localtime(after), timezone.localtime(until), inc=True)
+    return [date for date in dates if date > after]
+
+
+def materialize(parent, until=None):
+    """
+    Create ``parent``'s occurrences after its latest existing instance, up
+    to ``until`` (default: the series end, or the rolling window) and never
+    past the series end. Returns the created events.
+    """
+    if not is_series(parent):
+        return []
+    end = series_end(parent)
+    if until is None:
+        span = window()
+        until = end if span is None else timezone.now() + span
+    until = min(until, end)
+    after = parent.recurring_instances.aggregate(latest=Max('date'))['latest'] or parent.date
+    if until <= after:
+        return []
+
+    instances = [
+        Event(
+            name=parent.name,
+            organization=parent.organization,
+            event_type=parent.event_type,
+            description=parent.description,
+            date=date,
+            location=parent.location,
+            is_recurring=False,  # Instances are not recurring themselves
+            recurrence_type='none',
+            parent_event=parent
+        )
+        for date in occurrences(parent, after, until)
+    ]
+    if not instances:
+        return []
+    with transaction.atomic():
+        create_events(instances)
+        co_hosts = list(EventOrganization.objects.filter(event=parent).select_related('organization'))
+        if co_hosts:
+            EventOrganization.objects.bulk_create(
+                [EventOrganization(event=event, organization=link.organization) for event in instances for link in co_hosts],
+                batch_size=500
+            )
+            # bulk_create skips post_save, which keeps visibility, points and rollups in step
+            record_event_organization_changes(
+                (event.id, link.organization.name) for event in instances for link in co_hosts
+            )
+    return instances
+
+
+def extend_all(until=None):
+    """Materialize every unfinished series up to ``until`` (default as for `materialize`). Returns the number of events created."""
+    parents = Event.objects.filter(
+        is_recurring=True, recurrence_type__in=FREQUENCIES, parent_event__isnull=True
+    ).exclude(recurrence_end_date__lt=timezone.now())
+    return sum(len(materialize(parent, until)) for parent in parents)
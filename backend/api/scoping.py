@@ -0,0 +1,81 @@
+"""
+Admin scope: which events a request may see.
+
+Super Admins, DAISSA and Faculty see everything; any other admin role (a
+club) sees the events it hosts or co-hosts, as listed in EventVisibility;
+everyone else is unscoped. `get_scope` resolves the caller's scope once per
+request. By default the role is read from the user's admin profile; with
+ADMIN_SCOPE_FROM_TOKEN it is taken from the cached identity or, with a
+shared cache, the token's current identity claim (see api/user_identity.py), which
+saves the profile query but, with per-worker caches, lets a role change
+reach other workers only as their caches expire. Viewsets apply the scope
+with `AdminScopeFilter`; function views call `get_scope` directly.
+"""
+import functools
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+from .models import EventVisibility
+from .user_identity import current_identity
+
+FULL_ACCESS_ROLES = ('Super Admin', 'DAISSA', 'Faculty')
+
+
+@functools.lru_cache(maxsize=256)
+def visible_events_filter(organization, field='id'):
+    """Q limiting ``field`` (an event id) to the events visible to ``organization``."""
+    return Q(**{f'{field}__in': EventVisibility.event_ids(organization)})
+
+
+class AdminScope:
+    def __init__(self, role=None):
+        self.role = role
+
+    @property
+    def is_admin(self):
+        return self.role is not None
+
+    @property
+    def has_full_access(self):
+        return self.role in FULL_ACCESS_ROLES
+
+    @property
+    def organization(self):
+        """The club the caller is limited to, or None."""
+        return self.role if self.is_admin and not self.has_full_access else None
+
+    @property
+    def cache_key(self):
+        return self.organization or '*'
+
+    def filter(self, queryset, field='id'):
+        if self.organization is None:
+            return queryset
+        return queryset.filter(visible_events_filter(self.organization, field))
+
+
+def _resolve_role(request):
+    user = request.user
+    if not user or not user.is_authenticated:
+        return None
+    if getattr(settings, 'ADMIN_SCOPE_FROM_TOKEN', False) and request.auth is not None:
+        identity = current_identity(user.id, request.auth)
+        if identity is not None:
+            return identity['admin_profile']['role'] if identity['admin_profile'] else None
+    admin_profile = getattr(user, 'adminuser', None)
+    return admin_profile.role if admin_profile else None
+
+def get_scope(request):
+    """The caller's AdminScope, resolved on first use and kept on the request."""
+    http_request = getattr(request, '_request', request)
+    scope = getattr(http_request, 'admin_scope', None)
+    if scope is None:
+        scope = http_request.admin_scope = AdminScope(_resolve_role(request))
+    return scope
+
+
+class AdminScopeFilter(BaseFilterBackend):
+    """Limit a viewset to the caller's scope; `scope_field` names the event id field (default 'id')."""
+
+    def filter_queryset(self, request, queryset, view):
+        return get_scope(request).filter(queryset, getattr(view, 'scope_field', 'id'))
@@ -1,5 +1,12 @@
+import logging
+from django.db import transaction
+from django.db.models import Prefetch, Q, prefetch_related_objects
 from rest_framework import serializers
 from .models import Student, Event, Attendance, Semester, Professor, Class, TeachingAssistant, EventOrganization
+from .models.event_organization import record_event_organization_changes
+from .organization_registry import get_registry
+
+logger = logging.getLogger(__name__)
 
 class StudentSerializer(serializers.ModelSerializer):
     total_points = serializers.IntegerField(read_only=True)
@@ -46,16 +53,11 @@ class EventSerializer(serializers.ModelSerializer):
     
     def validate_organization(self, value):
         """Validate that organization exists in AdminUser roles (not just existing events)"""
-        from .models import AdminUser
         if not value:
             return value
         
         # Check if organization exists as an AdminUser role (excluding Faculty and Super Admin)
-        valid_organizations = AdminUser.objects.exclude(
-            role__in=['Faculty', 'Super Admin']
-        ).values_list('role', flat=True).distinct()
-        
-        if value not in valid_organizations:
+        if not get_registry().is_club(value):
             raise serializers.ValidationError(
                 f"Organization '{value}' is not a valid club. Please select from existing AdminUser roles."
             )
@@ -64,14 +66,10 @@ class EventSerializer(serializers.ModelSerializer):
     
     def validate_organizations(self, value):
         """Validate that all organization IDs exist in the Organization table"""
-        from .models import Organization
         if not value:
             return value
         
-        # Check if all organization IDs exist in the Organization table
-        valid_org_ids = set(Organization.objects.values_list('id', flat=True))
-        
-        invalid_orgs = [org_id for org_id in value if org_id not in valid_org_ids]
+        invalid_orgs = get_registry().unknown_organizations(value)
         if invalid_orgs:
             raise serializers.ValidationError(
                 f"Invalid organization IDs: {', '.join(map(str, invalid_orgs))}. Please select from existing organizations."
@@ -79,55 +77,41 @@ class EventSerializer(serializers.ModelSerializer):
         
         return value
     
-    def create(self, validated_data):
+    def _add_organizations(self, event, organization_ids, existing=()):
+        """
+        Link ``event`` to the secondary organizations in ``organization_ids``
+        (skipping its primary organization and ids in ``existing``) with one
+        in_bulk and one bulk_create.
+        """
         from .models import Organization
-        import logging
-        
-        logger = logging.getLogger(__name__)
-        
+        organizations = Organization.objects.in_bulk(
+            [org_id for org_id in dict.fromkeys(organization_ids) if org_id not in existing]
+        )
+        links = EventOrganization.objects.bulk_create([
+            EventOrganization(event=event, organization=org)
+            for org in organizations.values() if org.name != event.organization
+        ])
+        # bulk_create skips post_save, which keeps visibility, points and rollups in step
+        record_event_organization_changes([(event.id, link.organization.name) for link in links])
+        logger.info(
+            "Event %s linked to secondary organizations %s",
+            event.id, [link.organization.name for link in links]
+        )
+    
+    @transaction.atomic
+    def create(self, validated_data):
         organizations = validated_data.pop('organizations', [])
         event = Event.objects.create(**validated_data)
-        
-        # Debug: Log what's being created
-        logger.info(f"🔍 [EventOrganization Debug] Creating event {event.id} ({event.name})")
-        logger.info(f"   Primary organization: {validated_data.get('organization')}")
-        logger.info(f"   Secondary organization IDs received: {organizations}")
-        
-        # Create EventOrganization entries for secondary organizations
-        created_entries = []
         if organizations:
-            for org_id in organizations:
-                try:
-                    org = Organization.objects.get(id=org_id)
-                    # Don't add the primary organization as a secondary
-                    if org.name != validated_data.get('organization'):
-                        eo, created = EventOrganization.objects.get_or_create(
-                            event=event,
-                            organization=org
-                        )
-                        created_entries.append({
-                            'id': eo.id,
-                            'event_id': event.id,
-                            'organization_id': org.id,
-                            'organization_name': org.name,
-                            'created': created
-                        })
-                        logger.info(f"   ✅ Created EventOrganization: ID={eo.id}, Event={event.id}, Org={org.name} (ID={org.id})")
-                    else:
-                        logger.info(f"   ⏭️  Skipped {org.name} (same as primary organization)")
-                except Organization.DoesNotExist:
-                    logger.warning(f"   ❌ Organization ID {org_id} not found, skipping")
-        
-        logger.info(f"   📊 Total EventOrganization entries created: {len(created_entries)}")
-        
+            self._add_organizations(event, organizations)
+        # The response lists the links with their organization names
+        prefetch_related_objects(
+            [event], Prefetch('event_organizations', queryset=EventOrganization.objects.select_related('organization'))
+        )
         return event
     
+    @transaction.atomic
     def update(self, instance, validated_data):
-        from .models import Organization
-        import logging
-        
-        logger = logging.getLogger(__name__)
-        
         organizations = validated_data.pop('organizations', None)
         
         # Update event fields
@@ -135,44 +119,30 @@ class EventSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         
-        # Update event organizations if provided
+        # Replace the secondary organizations if provided, keeping links that stay
         if organizations is not None:
-            logger.info(f"🔍 [EventOrganization Update Debug] Updating event {instance.id} ({instance.name})")
-            logger.info(f"   Primary organization: {validated_data.get('organization') or instance.organization}")
-            logger.info(f"   Secondary organization IDs received: {organizations}")
-            
-            # Delete existing event organizations
-            deleted_count = EventOrganization.objects.filter(event=instance).delete()[0]
-            logger.info(f"   🗑️  Deleted {deleted_count} existing EventOrganization entries")
-            
-            # Create new event organizations (secondary organizations only)
-            primary_org_name = validated_data.get('organization') or instance.organization
-            created_entries = []
-            for org_id in organizations:
-                try:
-                    org = Organization.objects.get(id=org_id)
-                    # Don't add the primary organization as a secondary
-                    if org.name != primary_org_name:
-                        eo = EventOrganization.objects.create(
-                            event=instance,
-                            organization=org
-                        )
-                        created_entries.append({
-                            'id': eo.id,
-                            'event_id': instance.id,
-                            'organization_id': org.id,
-                            'organization_name': org.name
-                        })
-                        logger.info(f"   ✅ Created EventOrganization: ID={eo.id}, Event={instance.id}, Org={org.name} (ID={org.id})")
-                    else:
-                        logger.info(f"   ⏭️  Skipped {org.name} (same as primary organization)")
-                except Organization.DoesNotExist:
-                    logger.warning(f"   ❌ Organization ID {org_id} not found, skipping")
-            
-            logger.info(f"   📊 Total EventOrganization entries created: {len(created_entries)}")
+            kept = set(organizations)
+            EventOrganization.objects.filter(event=instance).filter(
+                ~Q(organization_id__in=kept) | Q(organization__name=instance.organization)
+            ).delete()
+            existing = set(EventOrganization.objects.filter(event=instance).values_list('organization_id', flat=True))
+            self._add_organizations(instance, organizations, existing)
         
         return instance
 
+class EventListSerializer(serializers.ModelSerializer):
+    """Read-only event rows for list views, without the description; expects prefetched event_organizations."""
+    has_passed = serializers.BooleanField(read_only=True)
+    event_organizations = EventOrganizationSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Event
+        fields = [
+            'id', 'name', 'organization', 'event_type', 'date', 'location', 'has_passed',
+            'is_recurring', 'recurrence_type', 'recurrence_end_date', 'parent_event',
+            'event_organizations'
+        ]
+
 class AttendanceSerializer(serializers.ModelSerializer):
     student = StudentSerializer(read_only=True)
     
@@ -180,10 +150,24 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = '__all__'
 
+class AttendanceCompactSerializer(serializers.ModelSerializer):
+    """Flat attendance rows for list views; expects select_related('student__user', 'event')."""
+    student_first_name = serializers.CharField(source='student.first_name', read_only=True)
+    student_last_name = serializers.CharField(source='student.last_name', read_only=True)
+    a_number = serializers.CharField(source='student.user.username', read_only=True)
+    event_name = serializers.CharField(source='event.name', read_only=True)
+
+    class Meta:
+        model = Attendance
+        fields = [
+            'id', 'student', 'student_first_name', 'student_last_name', 'a_number',
+            'event', 'event_name', 'checked_in_at'
+        ]
+
 class SemesterSerializer(serializers.ModelSerializer):
     class Meta:
         model = Semester
-        fields = ['id', 'season', 'year', 'is_current']
+        fields = ['id', 'season', 'year', 'is_current', 'start_date', 'end_date']
 
 class ProfessorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,175 @@
+"""
+Response cache for the dashboard aggregate endpoints.
+
+Responses are cached per endpoint, admin scope (the limited admin's role, or
+'*' for everyone who sees all data) and query string, in the cache named by
+STATS_CACHE_ALIAS. The scope and query string are hashed into the key, since
+they can hold characters (such as spaces) that memcached keys can't. Every key carries a generation number stored in the same
+cache; Attendance, Event, EventOrganization and Student changes bump it, which
+invalidates all cached responses at once. With the default local-memory
+backend each worker has its own cache and generation, so other workers only
+pick up changes after STATS_CACHE_TIMEOUT; the file and database backends are
+shared by every worker.
+
+Responses for a `term` that has already ended are kept in an archive keyed
+by a separate generation, with no timeout; it is only bumped by changes to
+events dated before the current term, semesters or deleted students (or by
+`dashboard_cache --clear`).
+"""
+import functools
+import hashlib
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import JsonResponse
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.response import Response
+from .models import Event, Semester, Student
+from .models.attendance import attendance_changed
+from .models.event_organization import event_organizations_changed
+from .scoping import get_scope
+from .terms import current_term, resolve_term
+
+GENERATION_KEY = 'stats:generation'
+ARCHIVE_GENERATION_KEY = 'stats:archive-generation'
+HITS_KEY = 'stats:hits'
+MISSES_KEY = 'stats:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'STATS_CACHE_ALIAS', 'default')]
+
+def _increment(key, initial=0):
+    cache = get_cache()
+    if not cache.add(key, initial + 1, timeout=None):
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(key, initial + 1, timeout=None)
+    return initial + 1
+
+def generation(key=GENERATION_KEY):
+    value = get_cache().get(key)
+    if value is None:
+        # Start from the clock so keys from before an eviction are never reused
+        value = time.time_ns()
+        if not get_cache().add(key, value, timeout=None):
+            value = get_cache().get(key, value)
+    return value
+
+def invalidate(archived=False):
+    _increment(GENERATION_KEY, initial=time.time_ns())
+    if archived:
+        _increment(ARCHIVE_GENERATION_KEY, initial=time.time_ns())
+
+def stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0,
+        'generation': cache.get(GENERATION_KEY),
+        'archive_generation': cache.get(ARCHIVE_GENERATION_KEY),
+    }
+
+def request_scope(request):
+    return get_scope(request).cache_key
+
+def requested_term_has_ended(request):
+    try:
+        return bool(request.GET.get('term')) and resolve_term(request.GET['term']).has_ended
+    except ValueError:
+        return False
+
+def cache_key(endpoint, request, archived=False):
+    params = '&'.join(f'{key}={value}' for key, value in sorted(request.GET.items()))
+    digest = hashlib.sha256(f'{request_scope(request)}\n{params}'.encode()).hexdigest()
+    if archived:
+        return f'stats:archive:{generation(ARCHIVE_GENERATION_KEY)}:{endpoint}:{digest}'
+    # The date is part of the key so term-relative windows roll over at midnight
+    return f'stats:{generation()}:{endpoint}:{timezone.localdate()}:{digest}'
+
+
+def _lookup(endpoint, request):
+    """The cache key, timeout and cached data (or None) for a request, counting the hit or miss."""
+    archived = requested_term_has_ended(request)
+    key = cache_key(endpoint, request, archived)
+    timeout = None if archived else getattr(settings, 'STATS_CACHE_TIMEOUT', 300)
+    data = get_cache().get(key)
+    _increment(HITS_KEY if data is not None else MISSES_KEY)
+    return key, timeout, data
+
+def cached_stats(endpoint):
+    """Cache successful responses of a DRF function view; put it below @api_view/@permission_classes."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key, timeout, data = _lookup(endpoint, request)
+            if data is not None:
+                return Response(data, headers={'X-Cache': 'HIT'})
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                get_cache().set(key, response.data, timeout)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def async_cached_stats(endpoint):
+    """`cached_stats` for the async views (api/async_views.py), which return JsonResponse with the data in `data`."""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            # Term lookups and the generation counters are synchronous
+            key, timeout, data = await sync_to_async(_lookup)(endpoint, request)
+            if data is not None:
+                return JsonResponse(data, safe=False, headers={'X-Cache': 'HIT'})
+
+            response = await view(request, *args, **kwargs)
+            if response.status_code == 200:
+                await sync_to_async(get_cache().set)(key, response.data, timeout)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _invalidate_on_commit(archived=False):
+    transaction.on_commit(functools.partial(invalidate, archived))
+
+def _before_current_term(event_ids):
+    return Event.objects.filter(id__in=event_ids, date__lt=current_term().start).exists()
+
+# attendance_changed covers Attendance saves and deletes as well as bulk creates
+@receiver(attendance_changed)
+def invalidate_stats_for_attendance(sender, pairs, **kwargs):
+    _invalidate_on_commit(_before_current_term({event_id for _, event_id in pairs}))
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_stats_for_event(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.date < current_term().start)
+
+@receiver(event_organizations_changed)
+def invalidate_stats_for_event_organizations(sender, links, **kwargs):
+    _invalidate_on_commit(_before_current_term({event_id for event_id, _ in links}))
+
+# Semester boundaries change what every term-scoped response covers
+@receiver(post_save, sender=Semester)
+@receiver(post_delete, sender=Semester)
+@receiver(post_delete, sender=Student)
+def invalidate_all_stats(sender, **kwargs):
+    _invalidate_on_commit(archived=True)
+
+@receiver(post_save, sender=Student)
+def invalidate_stats_for_new_student(sender, created, **kwargs):
+    if created:
+        _invalidate_on_commit()
@@ -0,0 +1,113 @@
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime
+from django.conf import settings
+from django.utils import timezone
+
+
+def term_start(value):
+    """
+    Return the first day of the academic term containing ``value``.
+    Fall runs Aug 1 - Dec 31 and Spring runs Jan 1 - Jul 31.
+    """
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.date()
+    if value.month >= 8:
+        return date(value.year, 8, 1)
+    return date(value.year, 1, 1)
+
+
+def term_end(start):
+    """Return the (exclusive) end date of the term starting on ``start``."""
+    if start.month >= 8:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, 8, 1)
+
+
+def academic_year_start(value):
+    """Return Aug 1 of the academic year containing ``value``."""
+    start = term_start(value)
+    return date(start.year if start.month >= 8 else start.year - 1, 8, 1)
+
+
+def as_datetime(value):
+    """Convert a term boundary date to an aware datetime at midnight."""
+    return timezone.make_aware(datetime(value.year, value.month, value.day))
+
+
+class Term(namedtuple('Term', ['label', 'start', 'end'])):
+    """A resolved academic term: a label and aware [start, end) datetimes."""
+    __slots__ = ()
+
+    @property
+    def ledger_term_start(self):
+        """
+        The PointsLedger/term_start key covering exactly this term, or None when
+        the term's boundaries differ from the Aug 1 / Jan 1 terms the ledger uses.
+        """
+        start = term_start(self.start)
+        if self.start == as_datetime(start) and self.end == as_datetime(term_end(start)):
+            return start
+        return None
+
+    @property
+    def has_ended(self):
+        return self.end <= timezone.now()
+
+
+def default_term(value):
+    """The Aug 1 / Jan 1 term containing ``value``, for when no Semester row covers it."""
+    start = term_start(value)
+    label = f"{'Fall' if start.month >= 8 else 'Spring'} {start.year}"
+    return Term(label, as_datetime(start), as_datetime(term_end(start)))
+
+
+_current_term = None
+_current_term_expires = 0.0
+_current_term_lock = threading.Lock()
+
+def current_term():
+    """
+    The term containing now, from the Semester table when a row covers it.
+    Cached per process until the term ends, CURRENT_TERM_CACHE_TTL seconds
+    pass, or a Semester is saved or deleted.
+    """
+    global _current_term, _current_term_expires
+    with _current_term_lock:
+        now = timezone.now()
+        if _current_term is None or time.monotonic() > _current_term_expires or now >= _current_term.end:
+            from .models import Semester
+            semester = Semester.containing(now)
+            _current_term = semester.as_term() if semester else default_term(now)
+            _current_term_expires = time.monotonic() + getattr(settings, 'CURRENT_TERM_CACHE_TTL', 300)
+        return _current_term
+
+def clear_current_term():
+    global _current_term
+    with _current_term_lock:
+        _current_term = None
+
+def resolve_term(value):
+    """
+    Resolve a `term` query parameter: empty or 'current', a Semester id, or a
+    season and year such as 'fall-2025' or 'SPRING 2026'. Raises ValueError.
+    """
+    from .models import Semester
+    value = (value or '').strip()
+    if not value or value.lower() == 'current':
+        return current_term()
+    if value.isdigit():
+        semester = Semester.objects.filter(id=int(value)).first()
+        if semester is None:
+            raise ValueError(f'Unknown term: {value}')
+        return semester.as_term()
+    match = re.fullmatch(r'([A-Za-z]+)[\s_-]*(\d{4})', value)
+    if match is None or match.group(1).upper() not in dict(Semester.SEASON_CHOICES):
+        raise ValueError(f'Unknown term: {value}')
+    season, year = match.group(1).upper(), int(match.group(2))
+    semester = Semester.objects.filter(season=season, year=year).first() or Semester(season=season, year=year)
+    return semester.as_term()
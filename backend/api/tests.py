@@ -1,3 +1,1255 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from datetime import date, datetime, timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import check_password, is_password_usable
+from django.contrib.auth.models import Group, User
+from django.core.cache import CacheKeyWarning, caches
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.backends.sqlite3 import base as sqlite_base
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from . import async_views, counters, credentials, stats_cache
+from .credentials import DEFAULT_PASSWORD, POOL_THRESHOLD, password_hashes
+from .csv_import import create_attendance
+from .database import InstrumentedConnection, connection_stats
+from .event_matcher import DEFAULT_EVENT_TYPE, DEFAULT_ORGANIZATION, AhoCorasick, EventClassifier, get_classifier, invalidate_classifier
+from .identity_cache import StudentIdentityIndex, cached_student, email_key, student_index
+from .management.commands.index_advisor import full_scans
+from .models import Attendance, AdminUser, AttendanceRollup, CheckinQueueItem, Event, EventOrganization, EventVisibility, Organization, PointsLedger, Semester, Student, StudentSearchGram
+from .models.student_search import invalidate_common_grams
+from .onetap_webhook_handler import create_or_find_student
+from .organization_registry import get_registry
+from .ranking import Leaderboard
+from .recurrence import extend_all
+from .terms import clear_current_term, current_term, default_term, resolve_term, term_start
 
-# Create your tests here.
+
+def onetap_checkin(email, name, event_name='Club Night', date='2025-10-17T12:00:00Z', a_number=''):
+    return {
+        'event': 'participant.checkin',
+        'data': {
+            'participant': {'checkInDate': date},
+            'profile': {'name': name, 'email': email, 'customFields': {'A-Number': a_number}},
+            'list': {'name': event_name, 'date': date},
+        },
+    }
+
+
+class PointsLedgerTests(TestCase):
+    """Attendance points are materialized per student, organization and term."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        cls.admin = admin
+        cls.club = Organization.objects.create(name='SAS')
+        cls.students = [User.objects.create_user(f'a0000000{i}', email=f'a0000000{i}@usu.edu').student_profile for i in range(2)]
+        cls.fall, cls.spring = [
+            Event.objects.create(name=name, organization='ASC', event_type='Workshop', location='ASC Space', date=timezone.make_aware(moment))
+            for name, moment in (('Fall', datetime(2025, 9, 15, 12)), ('Spring', datetime(2026, 2, 10, 12)))
+        ]
+        EventOrganization.objects.create(event=cls.fall, organization=cls.club)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def ledger(self):
+        return {
+            (row.student_id, row.organization, row.term_start): row.points
+            for row in PointsLedger.objects.all()
+        }
+
+    def attend(self, pairs):
+        with self.captureOnCommitCallbacks(execute=True):
+            for student, event in pairs:
+                Attendance.objects.create(student=student, event=event)
+
+    def test_attendance_updates_every_organization_row(self):
+        first, second = self.students
+        self.attend([(first, self.fall), (second, self.fall), (first, self.spring)])
+        fall, spring = date(2025, 8, 1), date(2026, 1, 1)
+        self.assertEqual(self.ledger(), {
+            (first.id, '', fall): 1, (first.id, 'ASC', fall): 1, (first.id, 'SAS', fall): 1,
+            (second.id, '', fall): 1, (second.id, 'ASC', fall): 1, (second.id, 'SAS', fall): 1,
+            (first.id, '', spring): 1, (first.id, 'ASC', spring): 1,
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.get(student=second, event=self.fall).delete()
+        self.assertFalse(PointsLedger.objects.filter(student=second).exists())
+
+    def test_editing_the_event_moves_the_points(self):
+        first, _ = self.students
+        self.attend([(first, self.fall)])
+        attendance = Attendance.objects.get(student=first, event=self.fall)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/attendance/{attendance.pk}/', {'event': self.spring.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.ledger(), {(first.id, '', date(2026, 1, 1)): 1, (first.id, 'ASC', date(2026, 1, 1)): 1})
+
+    def test_renaming_an_organization_moves_its_rows(self):
+        first, _ = self.students
+        self.attend([(first, self.fall)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.name = 'SAS Club'
+            self.club.save()
+        self.assertEqual(self.ledger(), {
+            (first.id, '', date(2025, 8, 1)): 1, (first.id, 'ASC', date(2025, 8, 1)): 1, (first.id, 'SAS Club', date(2025, 8, 1)): 1,
+        })
+        rows = self.client.get('/api/students/points/', {'organization': 'SAS Club', 'filter': 'all'}).json()
+        self.assertEqual([(row['student_id'], row['total_points']) for row in rows], [(first.id, 1)])
+
+    def test_rebuild_matches_incremental_rows(self):
+        first, second = self.students
+        self.attend([(first, self.fall), (second, self.fall), (first, self.spring)])
+        incremental = self.ledger()
+        PointsLedger.objects.update(points=99)
+        call_command('rebuild_points_ledger', stdout=io.StringIO())
+        self.assertEqual(self.ledger(), incremental)
+
+    def test_student_points_reads_the_ledger(self):
+        first, second = self.students
+        self.attend([(first, self.fall), (second, self.fall), (first, self.spring)])
+        rows = self.client.get('/api/students/points/', {'filter': 'all'}).json()
+        self.assertEqual([(row['student_id'], row['total_points']) for row in rows[:2]], [(first.id, 2), (second.id, 1)])
+        self.assertEqual({row['total_points'] for row in rows[2:]}, {0})
+        fall = self.client.get('/api/students/points/', {'term': 'fall-2025', 'organization': 'SAS'}).json()
+        self.assertEqual({row['student_id']: row['total_points'] for row in fall}, {first.id: 1, second.id: 1})
+
+
+class AttendanceCounterTests(TestCase):
+    """Attendance counts are buffered per transaction and written on commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('a00000001', email='a00000001@usu.edu').student_profile
+        cls.events = [
+            Event.objects.create(name=f'Workshop {i}', organization='ASC', event_type='Workshop', location='ASC Space',
+                                 date=timezone.make_aware(datetime(2025, 9, 15 + i, 12)))
+            for i in range(3)
+        ]
+
+    def count(self):
+        return Student.objects.values_list('cached_attendance_count', flat=True).get(pk=self.student.pk)
+
+    def test_deltas_are_summed_and_written_on_commit(self):
+        writes = []
+        with self.captureOnCommitCallbacks(execute=True):
+            counters.add(writes.append, {'a': 1, 'b': 0})
+            counters.add(writes.append, {'a': 2, 'b': -1})
+            self.assertEqual(writes, [])
+        self.assertEqual(writes, [{'a': 3, 'b': -1}])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for event in self.events:
+                Attendance.objects.create(student=self.student, event=event)
+            self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(), 3)
+
+    def test_rolled_back_savepoint_is_discarded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(student=self.student, event=self.events[0])
+            try:
+                with transaction.atomic():
+                    Attendance.objects.create(student=self.student, event=self.events[1])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Attendance.objects.create(student=self.student, event=self.events[2])
+        self.assertEqual(self.count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.get(event=self.events[0]).delete()
+        self.assertEqual(self.count(), 1)
+
+    def test_reconcile_repairs_drift(self):
+        Attendance.objects.create(student=self.student, event=self.events[0])
+        Student.objects.filter(pk=self.student.pk).update(cached_attendance_count=7)
+        call_command('reconcile_attendance_counts', stdout=io.StringIO())
+        self.assertEqual(self.count(), 1)
+
+
+class StudentListTests(TestCase):
+    """The students list pages by keyset when asked, or streams the whole list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, first_name in enumerate(('Cy', 'Ann', 'Bo', 'Ann', 'Di')):
+            User.objects.create_user(f'a0000000{i}', email=f'a0000000{i}@usu.edu', first_name=first_name)
+        cls.user = User.objects.create_user('viewer', email='viewer@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+
+    def test_keyset_pages_cover_the_list_once(self):
+        expected = [row['id'] for row in self.client.get('/api/students/').json()]
+        seen, url = [], '/api/students/?page_size=2'
+        while url:
+            with self.assertNumQueries(1):
+                body = self.client.get(url).json()
+            self.assertLessEqual(len(body['results']), 2)
+            seen.extend(row['id'] for row in body['results'])
+            url = body['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.client.get('/api/students/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_stream_returns_the_full_list(self):
+        response = self.client.get('/api/students/', {'stream': '1'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            json.loads(b''.join(response.streaming_content)),
+            self.client.get('/api/students/').json()
+        )
+
+
+class EventClassifierTests(TestCase):
+    """OneTap event names are classified with cached Aho-Corasick automata."""
+
+    def setUp(self):
+        invalidate_classifier()
+
+    def test_longest_match_wins(self):
+        matcher = AhoCorasick({'AIS': 'AIS', 'DAISSA': 'DAISSA', 'SA': 'SA'})
+        self.assertEqual(matcher.best_match('DAISSA Social'), 'DAISSA')
+        self.assertEqual(matcher.best_match('SA and AIS'), 'AIS')
+        self.assertEqual(matcher.best_match('SA then AI'), 'SA')
+        self.assertIsNone(matcher.best_match('Club Night'))
+
+        classifier = EventClassifier({'AIS', 'DAISSA'}, {'Workshop', 'Social'})
+        self.assertEqual(classifier.classify('DAISSA resume WORKSHOP'), ('DAISSA', 'Workshop'))
+        self.assertEqual(classifier.classify('Club Night'), (DEFAULT_ORGANIZATION, DEFAULT_EVENT_TYPE))
+
+    def test_cache_is_invalidated_by_new_names(self):
+        self.assertEqual(get_classifier().classify('SAS Mixer'), (DEFAULT_ORGANIZATION, DEFAULT_EVENT_TYPE))
+        with self.assertNumQueries(0):
+            get_classifier().classify('SAS Mixer')
+
+        Organization.objects.create(name='SAS')
+        Event.objects.create(name='First Mixer', organization='ASC', event_type='Mixer', location='ASC Space',
+                             date=timezone.make_aware(datetime(2025, 9, 15, 12)))
+        self.assertEqual(get_classifier().classify('SAS Mixer'), ('SAS', 'Mixer'))
+
+
+class IndexAdvisorTests(TestCase):
+    """The hot endpoint queries are served from indexes."""
+
+    def test_hot_queries_avoid_full_scans(self):
+        out = io.StringIO()
+        call_command('index_advisor', '--fail-on-scan', stdout=out)
+        self.assertIn('Done: 0 queries with full table scans', out.getvalue())
+
+    def test_plans_are_parsed_for_scans(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite plan format')
+        plan = '\n'.join([
+            '3 0 0 SCAN api_event',
+            '7 0 0 SCAN api_attendance USING INDEX attendance_event_idx',
+            '9 0 0 SEARCH api_student USING INTEGER PRIMARY KEY (rowid=?)',
+            '11 0 0 SCAN CONSTANT ROW',
+        ])
+        self.assertEqual(full_scans(plan), ['api_event'])
+
+
+class EventVisibilityTests(TestCase):
+    """Each event is visible to its primary and secondary organizations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.asc = Organization.objects.create(name='ASC')
+        cls.club = Organization.objects.create(name='SAS')
+        cls.event = Event.objects.create(name='Workshop', organization='ASC', event_type='Workshop', location='ASC Space',
+                                         date=timezone.make_aware(datetime(2025, 9, 15, 12)))
+
+    def visible_to(self):
+        return set(EventVisibility.objects.filter(event=self.event).values_list('organization', flat=True))
+
+    def test_rows_follow_organization_changes(self):
+        self.assertEqual(self.event.primary_organization, self.asc)
+        link = EventOrganization.objects.create(event=self.event, organization=self.club)
+        self.assertEqual(self.visible_to(), {'ASC', 'SAS'})
+
+        self.event.organization = 'SAS'
+        self.event.save()
+        self.assertEqual((self.visible_to(), self.event.primary_organization), ({'SAS'}, self.club))
+        link.delete()
+        self.assertEqual(self.visible_to(), {'SAS'})
+
+        self.club.name = 'SAS Club'
+        self.club.save()
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.primary_organization)
+
+    def test_saves_that_keep_the_organization_skip_the_sync(self):
+        with mock.patch.object(EventVisibility, 'sync_events') as sync_events:
+            self.event.name = 'Resume Workshop'
+            self.event.save()
+        sync_events.assert_not_called()
+        self.assertEqual(self.visible_to(), {'ASC'})
+
+    def test_backfill_rebuilds_rows(self):
+        EventOrganization.objects.create(event=self.event, organization=self.club)
+        EventVisibility.objects.all().delete()
+        Event.objects.update(primary_organization=None)
+        call_command('backfill_event_visibility', stdout=io.StringIO())
+        self.assertEqual(self.visible_to(), {'ASC', 'SAS'})
+        self.assertEqual(Event.objects.get(pk=self.event.pk).primary_organization, self.asc)
+
+
+class StatsCacheTests(TestCase):
+    """Dashboard aggregates are cached per scope until the data behind them changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='SAS')
+        cls.admin, cls.leader = admin, leader
+        cls.student = User.objects.create_user('a00000001', email='a00000001@usu.edu').student_profile
+        cls.past, cls.current = [
+            Event.objects.create(name=name, organization='SAS', event_type='Workshop', location='ASC Space', date=moment)
+            for name, moment in (('Past', timezone.make_aware(datetime(2025, 9, 15, 12))), ('Current', timezone.now()))
+        ]
+
+    def setUp(self):
+        stats_cache.get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def get(self, path, user=None):
+        if user is not None:
+            self.client.force_authenticate(User.objects.get(pk=user.pk))
+        response = self.client.get(path)
+        return response['X-Cache'], response.json()
+
+    def attend(self, event):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(student=self.student, event=event)
+
+    def test_hits_until_attendance_changes(self):
+        path = '/api/students/participating/?filter=all'
+        self.assertEqual(self.get(path), ('MISS', {'count': 0}))
+        self.assertEqual(self.get(path), ('HIT', {'count': 0}))
+        self.attend(self.current)
+        self.assertEqual(self.get(path), ('MISS', {'count': 1}))
+
+        attendance = Attendance.objects.get(student=self.student)
+        self.assertEqual(self.get(path), ('HIT', {'count': 1}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/attendance/{attendance.pk}/', {'event': self.past.pk}, format='json')
+        self.assertEqual(self.get(path)[0], 'MISS')
+
+    def test_query_values_are_hashed_into_the_key(self):
+        path = '/api/students/points/?organization=SAS%20Club&filter=all'
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            self.assertEqual(self.get(path)[0], 'MISS')
+            self.assertEqual(self.get(path)[0], 'HIT')
+
+    def test_scopes_are_cached_separately(self):
+        self.attend(self.current)
+        self.assertEqual(self.get('/api/students/total/'), ('MISS', {'count': 3}))
+        self.assertEqual(self.get('/api/students/total/', self.leader), ('MISS', {'count': 1}))
+        self.assertEqual(self.get('/api/students/total/', self.admin), ('HIT', {'count': 3}))
+
+    def test_ended_terms_are_archived(self):
+        path = '/api/students/participating/?term=fall-2025'
+        self.assertEqual(self.get(path), ('MISS', {'count': 0}))
+        self.attend(self.current)
+        self.assertEqual(self.get(path), ('HIT', {'count': 0}))
+        self.attend(self.past)
+        self.assertEqual(self.get(path), ('MISS', {'count': 1}))
+
+        call_command('dashboard_cache', '--clear', stdout=io.StringIO())
+        self.assertEqual(self.get(path)[0], 'MISS')
+
+
+class AttendanceRollupTests(TestCase):
+    """The attendance overview is grouped from daily rollup rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='SAS')
+        cls.admin, cls.leader = admin, leader
+        cls.students = [User.objects.create_user(f'a0000000{i}', email=f'a0000000{i}@usu.edu').student_profile for i in range(3)]
+        date = timezone.make_aware(datetime(2025, 9, 15, 12))
+        cls.workshop, cls.social = [
+            Event.objects.create(name=name, organization='SAS', event_type=name, location='ASC Space', date=date)
+            for name in ('Workshop', 'Social')
+        ]
+        EventOrganization.objects.create(event=cls.workshop, organization=Organization.objects.create(name='ASC'))
+
+    def setUp(self):
+        stats_cache.get_cache().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            for student, event, checked_in_at in (
+                (self.students[0], self.workshop, datetime(2025, 9, 15, 12)),
+                (self.students[1], self.workshop, datetime(2025, 9, 22, 12)),
+                (self.students[2], self.social, datetime(2025, 10, 2, 12)),
+            ):
+                with mock.patch('django.utils.timezone.now', return_value=timezone.make_aware(checked_in_at)):
+                    Attendance.objects.create(student=student, event=event)
+
+    def overview(self, **params):
+        response = self.client.get('/api/attendance/overview/', params)
+        return [(row['date'][:10], row['event_type'], row['attendance_counts']) for row in response.json()]
+
+    def rollup(self):
+        return {
+            (row.day, row.event_type, row.organization): row.count
+            for row in AttendanceRollup.objects.all()
+        }
+
+    def test_overview_groups_daily_rows(self):
+        self.assertEqual(self.overview(), [('2025-09-01', 'Workshop', 2), ('2025-10-01', 'Social', 1)])
+        self.assertEqual(self.overview(granularity='week', end='2025-09-30'), [('2025-09-15', 'Workshop', 1), ('2025-09-22', 'Workshop', 1)])
+        self.assertEqual(self.overview(granularity='day', start='2025-10-01'), [('2025-10-02', 'Social', 1)])
+        self.assertEqual(self.client.get('/api/attendance/overview/', {'granularity': 'year'}).status_code, 400)
+
+        # A co-hosted event counts once for each organization that can see it
+        self.client.force_authenticate(User.objects.get(pk=self.leader.pk))
+        self.assertEqual(self.overview(), [('2025-09-01', 'Workshop', 2), ('2025-10-01', 'Social', 1)])
+
+    def test_event_changes_move_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.social.event_type = 'Mixer'
+            self.social.save()
+        self.assertEqual(self.overview(start='2025-10-01'), [('2025-10-01', 'Mixer', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.get(student=self.students[0]).delete()
+        self.assertEqual(self.overview(end='2025-09-30'), [('2025-09-01', 'Workshop', 1)])
+
+    def test_event_save_reads_the_stored_event_once(self):
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.social.event_type = 'Mixer'
+            self.social.save()
+        stored = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'FROM "api_event" WHERE "api_event"."id" = ' in query['sql']]
+        self.assertEqual(len(stored), 1, stored)
+        self.assertEqual(self.overview(start='2025-10-01'), [('2025-10-01', 'Mixer', 1)])
+
+    def test_editing_the_event_moves_counts(self):
+        attendance = Attendance.objects.get(student=self.students[2])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/attendance/{attendance.pk}/', {'event': self.workshop.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.overview(), [('2025-09-01', 'Workshop', 2), ('2025-10-01', 'Workshop', 1)])
+        self.assertFalse(AttendanceRollup.objects.filter(event_type='Social', count__gt=0).exists())
+
+    def test_renaming_an_organization_moves_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            club = Organization.objects.get(name='ASC')
+            club.name = 'ASC Club'
+            club.save()
+        self.assertEqual(
+            {key: count for key, count in self.rollup().items() if key[2] not in ('', 'SAS')},
+            {(date(2025, 9, 15), 'Workshop', 'ASC Club'): 1, (date(2025, 9, 22), 'Workshop', 'ASC Club'): 1}
+        )
+
+    def test_rebuild_matches_incremental_rows(self):
+        incremental = self.rollup()
+        self.assertEqual(incremental[(date(2025, 9, 15), 'Workshop', 'ASC')], 1)
+        AttendanceRollup.objects.update(count=99)
+        call_command('rebuild_attendance_rollup', stdout=io.StringIO())
+        self.assertEqual(self.rollup(), incremental)
+
+
+class TermTests(TestCase):
+    """Stats windows come from Semester boundaries, or the Aug 1 / Jan 1 terms."""
+
+    def setUp(self):
+        clear_current_term()
+        # Semesters created here are rolled back; don't leave their term cached
+        self.addCleanup(clear_current_term)
+        stats_cache.get_cache().clear()
+
+    def test_resolve_term(self):
+        self.assertEqual(term_start(date(2025, 7, 31)), date(2025, 1, 1))
+        self.assertEqual(term_start(timezone.make_aware(datetime(2025, 8, 1))), date(2025, 8, 1))
+
+        fall = resolve_term('fall-2025')
+        self.assertEqual((fall.label, fall.ledger_term_start), ('Fall 2025', date(2025, 8, 1)))
+        self.assertEqual(fall.end, timezone.make_aware(datetime(2026, 1, 1)))
+        self.assertEqual(resolve_term('SPRING 2026').ledger_term_start, date(2026, 1, 1))
+
+        summer = Semester.objects.create(season='SUMMER', year=2026)
+        self.assertEqual(resolve_term(str(summer.id)).label, 'Summer 2026')
+        self.assertIsNone(resolve_term('summer_2026').ledger_term_start)
+        for value in ('winter-2025', 'fall', str(summer.id + 1)):
+            with self.assertRaises(ValueError):
+                resolve_term(value)
+
+    def test_current_term_is_cached_until_semesters_change(self):
+        now = timezone.now()
+        self.assertEqual(current_term(), default_term(now))
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_term('current'), default_term(now))
+
+        Semester.objects.create(season='FALL', year=now.year, start_date=now - timedelta(days=1), end_date=now + timedelta(days=1))
+        self.assertEqual(current_term().end, now + timedelta(days=1))
+        self.assertIsNone(current_term().ledger_term_start)
+
+    def test_custom_boundaries_count_attendance(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('viewer', email='viewer@example.com'))
+        student = User.objects.create_user('a00000001', email='a00000001@usu.edu').student_profile
+        for day in (2, 20):
+            event = Event.objects.create(name=f'Workshop {day}', organization='ASC', event_type='Workshop', location='ASC Space',
+                                         date=timezone.make_aware(datetime(2025, 9, day, 12)))
+            with self.captureOnCommitCallbacks(execute=True):
+                Attendance.objects.create(student=student, event=event)
+        semester = Semester.objects.create(season='FALL', year=2025, start_date=timezone.make_aware(datetime(2025, 9, 10)))
+
+        for term, count in ((semester.id, 1), ('spring-2025', 0)):
+            response = client.get('/api/students/participating/', {'term': term})
+            self.assertEqual(response.json(), {'count': count})
+        self.assertEqual(client.get('/api/students/participating/', {'term': 'someday'}).status_code, 400)
+
+
+class LeaderboardTests(TestCase):
+    """Leaderboard ranks, percentiles and windows are computed server-side."""
+
+    def board(self):
+        return Leaderboard([(student_id, points, {}) for student_id, points in ((1, 5), (2, 3), (3, 3), (4, 1))])
+
+    def test_dense_ranks_and_ties(self):
+        entries = self.board().entries()
+        self.assertEqual([(row['rank'], row['position'], row['ties']) for row in entries], [(1, 1, 1), (2, 2, 2), (2, 2, 2), (3, 4, 1)])
+        self.assertEqual([row['percentile'] for row in entries], [87.5, 50.0, 50.0, 12.5])
+
+    def test_windows(self):
+        board = self.board()
+        self.assertEqual([row['student_id'] for row in board.top(2)], [1, 2, 3])
+        self.assertEqual(board.top(0), [])
+        self.assertEqual([row['student_id'] for row in board.around(3, 1)], [2, 3, 4])
+        self.assertIsNone(board.around(99, 1))
+
+    def test_student_points_windows(self):
+        stats_cache.get_cache().clear()
+        admin = User.objects.create_user('admin', email='admin@usu.edu')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        student = admin.student_profile
+        body = client.get('/api/students/points/', {'filter': 'all', 'around': student.id, 'radius': 0}).json()
+        self.assertEqual((body['count'], [row['student_id'] for row in body['results']]), (1, [student.id]))
+        self.assertEqual(client.get('/api/students/points/', {'filter': 'all', 'around': student.id + 1}).status_code, 404)
+        self.assertEqual(client.get('/api/students/points/', {'top': 'ten'}).status_code, 400)
+
+
+class CsvImportTests(TestCase):
+    """Import commands write chunk by chunk, each chunk in its own transaction."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = f'{directory}/import.csv'
+
+    def write_csv(self, header, rows):
+        with open(self.path, 'w') as file:
+            file.write('\n'.join([header] + rows) + '\n')
+
+    def test_import_students(self):
+        self.write_csv('first_name,last_name,email', [
+            'Ann,Lee,ann@usu.edu', 'Bo,,bo@usu.edu', ',Nobody,none@usu.edu', 'Ann,Again,ann@usu.edu', 'Cy,Day,',
+        ])
+        call_command('import_students', self.path, '--chunk-size', '2', '--dry-run', stdout=io.StringIO())
+        self.assertFalse(Student.objects.exists())
+
+        out = io.StringIO()
+        call_command('import_students', self.path, '--chunk-size', '2', stdout=out)
+        self.assertIn('Successfully imported: 3 students', out.getvalue())
+        students = {student.email: student for student in Student.objects.select_related('user')}
+        self.assertEqual(set(students), {'ann@usu.edu', 'bo@usu.edu', 'cy6@placeholder.com'})
+        self.assertEqual(students['bo@usu.edu'].last_name, '[Unknown]')
+        self.assertFalse(students['ann@usu.edu'].user.is_active)
+        self.assertEqual([row.id for row in StudentSearchGram.search('ann')], [students['ann@usu.edu'].id])
+
+    def test_failed_chunk_resumes_from_checkpoint(self):
+        students = [User.objects.create_user(f'a0000000{i}', email=f'a0000000{i}@usu.edu').student_profile for i in range(3)]
+        event = Event.objects.create(name='Workshop', organization='ASC', event_type='Workshop', location='ASC Space',
+                                     date=timezone.make_aware(datetime(2025, 9, 15, 12)))
+        self.write_csv('student_id,event_id,checked_in_at', [
+            f'{student.id},{event.id},2025-09-15 12:0{i}:00' for i, student in enumerate(students)
+        ] + [f'{students[0].id},{event.id},', f'{students[0].id},999,'])
+
+        calls = []
+
+        def fail_second_chunk(entries):
+            calls.append(entries)
+            if len(calls) == 2:
+                raise RuntimeError('disk full')
+            return create_attendance(entries)
+
+        with mock.patch('api.management.commands.import_attendance.create_attendance', side_effect=fail_second_chunk):
+            with self.assertRaisesMessage(CommandError, 'Rows 4-5 failed and were rolled back: disk full'):
+                call_command('import_attendance', self.path, '--chunk-size', '2', stdout=io.StringIO())
+        self.assertEqual(Attendance.objects.count(), 2)
+        with open(f'{self.path}.checkpoint') as file:
+            self.assertEqual(file.read(), '4')
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_attendance', self.path, '--chunk-size', '2', '--resume', stdout=out)
+        self.assertIn('(starting at row 4)', out.getvalue())
+        self.assertIn('Skipped (duplicates): 1 records', out.getvalue())
+        self.assertIn('Errors: 1 records', out.getvalue())
+        self.assertEqual(
+            Attendance.objects.get(student=students[2]).checked_in_at,
+            timezone.make_aware(datetime(2025, 9, 15, 12, 2))
+        )
+        self.assertEqual(Student.objects.get(pk=students[2].pk).cached_attendance_count, 1)
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+
+class OneTapBatchTests(TestCase):
+    """A JSON array posted to the webhook is resolved and written together."""
+
+    def setUp(self):
+        student_index.clear()
+        self.client = APIClient()
+
+    def post(self, payload):
+        return self.client.post('/api/webhook/onetap-handler/', payload, format='json')
+
+    def test_batch_creates_students_events_and_attendance(self):
+        payload = [
+            onetap_checkin('sam@usu.edu', 'Sam Student', a_number='A00000001'),
+            onetap_checkin('kim@usu.edu', 'Kim Student'),
+            onetap_checkin('sam@usu.edu', 'Sam Student', a_number='A00000001'),
+            {'event': 'participant.checkout'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            body = self.post(payload).json()
+        self.assertEqual((body['processed'], body['failed']), (4, 1))
+        self.assertEqual([result['success'] for result in body['results']], [True, True, True, False])
+        self.assertEqual(body['results'][0]['data']['attendance'], body['results'][2]['data']['attendance'])
+        self.assertEqual((Student.objects.count(), Event.objects.count(), Attendance.objects.count()), (2, 1, 2))
+        self.assertEqual(Student.objects.get(email='sam@usu.edu').cached_attendance_count, 1)
+
+        # Resending the batch finds everything it created
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(payload[:3])
+        self.assertEqual((Student.objects.count(), Event.objects.count(), Attendance.objects.count()), (2, 1, 2))
+
+    def test_attendance_inserted_by_concurrent_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post([onetap_checkin('sam@usu.edu', 'Sam Student'), onetap_checkin('kim@usu.edu', 'Kim Student', event_name='Game Night')])
+        sam = Student.objects.get(email='sam@usu.edu')
+        event = Event.objects.get(name='Game Night')
+        bulk_create = Attendance.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Another request checks Sam in (and counts it) after the batch read attendance
+            Attendance.objects.create(student=sam, event=event)
+            return bulk_create(objs, **kwargs)
+
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch.object(Attendance.objects, 'bulk_create', side_effect=racing_bulk_create):
+            body = self.post([onetap_checkin('sam@usu.edu', 'Sam Student', event_name='Game Night')]).json()
+        self.assertTrue(body['results'][0]['success'])
+        self.assertEqual(Student.objects.get(pk=sam.pk).cached_attendance_count, 2)
+
+    def test_username_taken_by_concurrent_request(self):
+        def hashes(passwords, **kwargs):
+            # Another request creates a user with the same handle after the batch picked it
+            User.objects.create_user('sam', email='sam@example.org')
+            return password_hashes(passwords, **kwargs)
+
+        with mock.patch('api.onetap_webhook_handler.password_hashes', side_effect=hashes):
+            body = self.post([onetap_checkin('sam@example.com', 'Sam Student')]).json()
+        self.assertTrue(body['results'][0]['success'])
+        student = Student.objects.select_related('user').get(email='sam@example.com')
+        self.assertEqual((student.user.email, student.user.username), ('sam@example.com', 'sam_1'))
+        self.assertEqual(User.objects.get(username='sam').student_profile.email, 'sam@example.org')
+
+    def test_event_date_offset_crossing_midnight(self):
+        # 20:00 in Denver is the next day in the server's time zone
+        checkin = onetap_checkin('sam@usu.edu', 'Sam Student', date='2025-10-17T20:00:00-06:00')
+        for _ in range(2):
+            body = self.post([checkin]).json()
+            self.assertTrue(body['results'][0]['success'], body['results'][0])
+        self.assertEqual(Event.objects.count(), 1)
+        # The single-check-in path matches the same event
+        self.assertEqual(self.post(checkin).status_code, 201)
+        self.assertEqual(Event.objects.count(), 1)
+
+
+class CheckinQueueTests(TestCase):
+    """Queued check-ins are claimed once, retried with backoff and dead-lettered."""
+
+    def setUp(self):
+        student_index.clear()
+
+    def drain(self, *args):
+        call_command('process_checkin_queue', '--once', *args, stdout=io.StringIO())
+
+    def test_claims_are_exclusive_until_they_time_out(self):
+        CheckinQueueItem.enqueue([onetap_checkin(f'{name}@usu.edu', name) for name in ('ann', 'bob', 'cy')])
+        self.assertEqual(len(CheckinQueueItem.claim(2)), 2)
+        self.assertEqual(len(CheckinQueueItem.claim(10)), 1)
+        self.assertEqual(CheckinQueueItem.claim(10), [])
+        # A worker that stopped mid-batch leaves its items to be reclaimed
+        CheckinQueueItem.objects.update(claimed_at=timezone.now() - timedelta(seconds=600))
+        self.assertEqual(len(CheckinQueueItem.claim(10, visibility_timeout=300)), 3)
+
+    def test_failures_back_off_then_dead_letter(self):
+        item = CheckinQueueItem.enqueue([{'event': 'participant.checkout'}])[0]
+        item.mark_failed('boom', max_attempts=2)
+        self.assertEqual((item.status, item.attempts), (CheckinQueueItem.STATUS_PENDING, 1))
+        self.assertGreater(item.available_at, timezone.now() + timedelta(seconds=4))
+        self.assertEqual(CheckinQueueItem.claim(10), [])
+        item.mark_failed('boom', max_attempts=2)
+        self.assertEqual((item.status, item.last_error), (CheckinQueueItem.STATUS_DEAD, 'boom'))
+
+    def test_worker_retries_only_failed_items(self):
+        valid, invalid = CheckinQueueItem.enqueue([onetap_checkin('ann@usu.edu', 'Ann Lee'), {'event': 'participant.checkout'}])
+        with mock.patch('api.management.commands.process_checkin_queue.process_onetap_checkin') as process_one:
+            self.drain()
+        # Only the invalid item went to the single-item path, which rejects it before processing
+        process_one.assert_not_called()
+        valid.refresh_from_db()
+        invalid.refresh_from_db()
+        self.assertEqual((valid.status, invalid.status, invalid.attempts), (CheckinQueueItem.STATUS_DONE, CheckinQueueItem.STATUS_PENDING, 1))
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_single_item_retry_is_atomic(self):
+        item = CheckinQueueItem.enqueue([onetap_checkin('ann@usu.edu', 'Ann Lee')])[0]
+        failed = [{'index': 0, 'success': False, 'error': 'batch failed'}]
+        with mock.patch('api.management.commands.process_checkin_queue.process_onetap_checkin_batch', return_value=failed), \
+                mock.patch('api.onetap_webhook_handler.create_attendance_record', side_effect=RuntimeError('boom')):
+            self.drain()
+        item.refresh_from_db()
+        self.assertEqual((item.status, item.last_error), (CheckinQueueItem.STATUS_PENDING, 'boom'))
+        # The student and event written before the failure were rolled back
+        self.assertEqual((Student.objects.count(), Event.objects.count()), (0, 0))
+
+
+class StudentIdentityCacheTests(TestCase):
+    """Cached identity keys keep the email, A-number, name matching order."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.john = User.objects.create_user('john1', email='john1@usu.edu', first_name='John', last_name='Smith').student_profile
+        cls.jon = User.objects.create_user('jon2', email='jon2@usu.edu', first_name='Jon', last_name='Smith').student_profile
+
+    def setUp(self):
+        student_index.clear()
+        self.client = APIClient()
+
+    def checked_in(self, student):
+        return list(Attendance.objects.filter(student=student).values_list('event__name', flat=True))
+
+    def test_repeat_checkin_costs_one_student_query(self):
+        create_or_find_student('John', 'Smith', 'john1@usu.edu', '', '')
+        with self.assertNumQueries(1):
+            self.assertEqual(create_or_find_student('John', 'Smith', 'john1@usu.edu', '', ''), self.john)
+
+    def test_cached_name_does_not_beat_email(self):
+        # Caches the name "John Smith" for John
+        self.assertEqual(create_or_find_student('John', 'Smith', 'js@example.com', '', ''), self.john)
+        self.assertEqual(create_or_find_student('John', 'Smith', 'jon2@usu.edu', '', ''), self.jon)
+
+        self.client.post('/api/webhook/onetap-handler/', [onetap_checkin('jon2@usu.edu', 'John Smith', 'Batch')], format='json')
+        self.client.post('/api/webhook/onetap-handler/', onetap_checkin('jon2@usu.edu', 'John Smith', 'Single'), format='json')
+        self.assertEqual((self.checked_in(self.john), self.checked_in(self.jon)), ([], ['Batch', 'Single']))
+
+    def test_index_is_bounded(self):
+        index = StudentIdentityIndex(maxsize=1)
+        index.set(email_key(self.john.email), self.john)
+        index.set(email_key(self.jon.email), self.jon)
+        self.assertEqual((index.stats()['size'], index._student_by_user), (1, {self.jon.user_id: self.jon.id}))
+        # Saving a user drops the keys of their student
+        index.discard(user_id=self.jon.user_id)
+        self.assertEqual((index.stats()['size'], index._student_by_user, index._user_by_student), (0, {}, {}))
+
+    def test_stale_entries_are_rechecked(self):
+        create_or_find_student('John', 'Smith', 'john1@usu.edu', '', '')
+        # Another worker renames John's email; this worker's entry no longer matches
+        Student.objects.filter(pk=self.john.pk).update(email='john.smith@usu.edu')
+        self.assertIsNone(cached_student(email_key('john1@usu.edu')))
+        self.assertIsNone(student_index.get(email_key('john1@usu.edu')))
+
+
+class PasswordHashTests(TestCase):
+    """Only the default password shares a hash; the hashing pool is reused."""
+
+    def test_only_default_password_is_shared(self):
+        hashes = password_hashes(['secret', 'secret', DEFAULT_PASSWORD, DEFAULT_PASSWORD, None], share=True, workers=1)
+        self.assertNotEqual(hashes[0], hashes[1])
+        self.assertEqual(hashes[2], hashes[3])
+        self.assertTrue(all(check_password(password, hashed) for password, hashed in zip(['secret', 'secret', DEFAULT_PASSWORD], hashes)))
+        self.assertFalse(is_password_usable(hashes[4]))
+
+        unshared = password_hashes([DEFAULT_PASSWORD] * 2, share=False, workers=1)
+        self.assertNotEqual(unshared[0], unshared[1])
+
+    def test_pool_is_reused_across_batches(self):
+        first = password_hashes(['secret'] * POOL_THRESHOLD, workers=2)
+        pool = credentials._pool
+        second = password_hashes(['secret'] * POOL_THRESHOLD, workers=2)
+        self.assertIs(credentials._pool, pool)
+        self.assertEqual(len(set(first + second)), 2 * POOL_THRESHOLD)
+        self.assertTrue(check_password('secret', second[-1]))
+
+
+class StudentSearchTests(TestCase):
+    """Trigram search, with substring fallbacks for short queries and common grams."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for username, first_name, last_name in (
+            ('a00000001', 'José', 'Salah'),
+            ('a00000002', 'Jo', 'Smith'),
+            ('a00000003', 'Joseph', 'Smithson'),
+            ('a00000004', 'Kim', 'Blacksmith'),
+        ):
+            User.objects.create_user(username, email=f'{username}@usu.edu', first_name=first_name, last_name=last_name)
+
+    def setUp(self):
+        invalidate_common_grams()
+        self.addCleanup(invalidate_common_grams)
+
+    def names(self, query):
+        return [student.last_name for student in StudentSearchGram.search(query)]
+
+    def test_ranks_exact_prefix_and_substring_matches(self):
+        self.assertEqual(self.names('smith'), ['Smith', 'Smithson', 'Blacksmith'])
+        self.assertEqual(self.names('jose'), ['Salah', 'Smithson'])
+        self.assertEqual(self.names('jo smith'), ['Smith', 'Smithson'])
+
+    def test_short_queries_match_substrings(self):
+        self.assertEqual(self.names('al'), ['Salah'])
+        self.assertEqual(self.names('mi'), ['Blacksmith', 'Smith', 'Smithson'])
+
+    def test_common_grams_fall_back_to_the_database(self):
+        with mock.patch('api.models.student_search.COMMON_GRAM_MIN', 1):
+            self.assertEqual(StudentSearchGram.selective_grams({'usu', 'lah'}), {'lah'})
+            self.assertEqual(len(StudentSearchGram.search('usu.edu')), 4)
+            self.assertEqual(self.names('salah@usu'), [])
+            self.assertEqual(self.names('a00000001@usu'), ['Salah'])
+
+    def test_search_reads_cached_common_grams(self):
+        self.names('smith')
+        # One query for the candidates with their users and admin profiles
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names('smith'), ['Smith', 'Smithson', 'Blacksmith'])
+
+
+class AttendanceListQueryTests(TestCase):
+    """The attendance list costs a fixed number of queries however many rows it returns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        cls.admin = admin
+        cls.events = [
+            Event.objects.create(
+                name=f'Event {i}', organization='ASC', event_type='Workshop', location='ASC Space',
+                date=timezone.make_aware(datetime(2025, 9, 1 + i, 12))
+            )
+            for i in range(2)
+        ]
+        for i in range(10):
+            user = User.objects.create_user(f'a0000000{i}', email=f'a0000000{i}@usu.edu', first_name=f'S{i}', last_name='Student')
+            for event in cls.events:
+                Attendance.objects.create(student=user.student_profile, event=event)
+
+    def setUp(self):
+        self.client = APIClient()
+        # A fresh instance, as authentication would load, without the cached admin profile
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def test_full_list_does_not_query_per_row(self):
+        # Admin profile lookup + the attendance query with students, users and events joined
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/attendance/')
+        self.assertEqual(len(response.json()), 20)
+        self.assertEqual(response.json()[0]['student']['user']['username'][:2], 'a0')
+
+    def test_compact_filtered_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/attendance/', {
+                'compact': '1', 'event': self.events[0].id, 'page_size': 4
+            })
+        body = response.json()
+        self.assertEqual(len(body['results']), 4)
+        self.assertEqual(
+            set(body['results'][0]),
+            {'id', 'student', 'student_first_name', 'student_last_name', 'a_number', 'event', 'event_name', 'checked_in_at'}
+        )
+        self.assertTrue(all(row['event'] == self.events[0].id for row in body['results']))
+
+        seen = [row['id'] for row in body['results']]
+        while body['next']:
+            body = self.client.get(body['next']).json()
+            seen += [row['id'] for row in body['results']]
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get('/api/attendance/', {'student': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/attendance/', {'start': '2025-13-01'}).status_code, 400)
+
+
+class EventListQueryTests(TestCase):
+    """Secondary organizations are prefetched instead of queried per event."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        cls.admin = admin
+        partner = Organization.objects.create(name='SAS')
+        now = timezone.now()
+        for i in range(6):
+            event = Event.objects.create(
+                name=f'Event {i}', organization='ASC', event_type='Workshop' if i % 2 else 'Social',
+                description='Long description', location='ASC Space', date=now + timezone.timedelta(days=i - 3)
+            )
+            EventOrganization.objects.create(event=event, organization=partner)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def test_list_prefetches_secondary_organizations(self):
+        # Admin profile + events + prefetched event organizations with their organizations
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/events/')
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(response.json()[0]['event_organizations'][0]['organization_name'], 'SAS')
+
+    def test_upcoming_pages_are_compact_and_filtered(self):
+        response = self.client.get('/api/events/upcoming/', {'compact': '1', 'page_size': 1})
+        body = response.json()
+        self.assertNotIn('description', body['results'][0])
+        dates = [row['date'] for row in body['results']]
+        while body['next']:
+            body = self.client.get(body['next']).json()
+            dates += [row['date'] for row in body['results']]
+        self.assertEqual(len(dates), 2)
+        self.assertEqual(dates, sorted(dates))
+
+        response = self.client.get('/api/events/', {'event_type': 'Social'})
+        self.assertEqual({row['event_type'] for row in response.json()}, {'Social'})
+        self.assertEqual(self.client.get('/api/events/', {'end': 'soon'}).status_code, 400)
+
+
+class EventOrganizationWriteTests(TestCase):
+    """Secondary organizations are resolved and written in bulk, with their side effects."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='ASC')
+        cls.admin = admin
+        cls.organizations = [Organization.objects.create(name=f'Club {i}') for i in range(6)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+        get_registry()
+
+    def create_event(self, organizations):
+        return self.client.post('/api/events/', {
+            'name': 'Co-hosted', 'organization': 'ASC', 'event_type': 'Workshop', 'location': 'ASC Space',
+            'date': '2025-09-15T12:00:00Z', 'organizations': [org.id for org in organizations]
+        }, format='json')
+
+    def test_create_cost_does_not_grow_with_co_hosts(self):
+        # Warm the per-request admin profile and current term lookups
+        self.create_event([])
+        with CaptureQueriesContext(connection) as one:
+            response = self.create_event(self.organizations[:1])
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(connection) as many:
+            response = self.create_event(self.organizations[1:])
+        self.assertEqual(len(one), len(many))
+        self.assertEqual(
+            sorted(row['organization_name'] for row in response.json()['event_organizations']),
+            [org.name for org in self.organizations[1:]]
+        )
+        self.assertEqual(
+            set(EventVisibility.objects.filter(event_id=response.json()['id']).values_list('organization', flat=True)),
+            {'ASC'} | {org.name for org in self.organizations[1:]}
+        )
+
+    def test_invalid_organizations_are_rejected(self):
+        self.assertEqual(self.client.post('/api/events/', {
+            'name': 'Bad', 'organization': 'Nobody', 'event_type': 'Workshop', 'location': 'ASC Space',
+            'date': '2025-09-15T12:00:00Z'
+        }, format='json').status_code, 400)
+        self.assertEqual(self.create_event([Organization(id=9999)]).status_code, 400)
+
+    def test_update_moves_secondary_points(self):
+        event = Event.objects.create(
+            name='Workshop', organization='ASC', event_type='Workshop', location='ASC Space',
+            date=timezone.make_aware(datetime(2025, 9, 15, 12))
+        )
+        student = User.objects.create_user('a00000001', email='a00000001@usu.edu').student_profile
+        Attendance.objects.create(student=student, event=event)
+        club = self.organizations[0]
+
+        def club_points():
+            return PointsLedger.objects.filter(student=student, organization=club.name).values_list('points', flat=True).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/events/{event.id}/', {'organizations': [club.id]}, format='json')
+        self.assertEqual(club_points(), 1)
+        self.assertTrue(EventVisibility.objects.filter(event=event, organization=club.name).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/events/{event.id}/', {'organizations': []}, format='json')
+        self.assertFalse(club_points())
+        self.assertFalse(EventVisibility.objects.filter(event=event, organization=club.name).exists())
+
+
+class RecurringEventTests(TestCase):
+    """Recurring instances are computed with rrule and written in bulk."""
+
+    @classmethod
+    def setUpTestData(cls):
+        admin = User.objects.create_user('admin', email='admin@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=admin, first_name='Ada', last_name='Admin', role='Super Admin')
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='ASC')
+        cls.admin = admin
+        cls.club = Organization.objects.create(name='SAS')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.get(pk=self.admin.pk))
+
+    def create_series(self, recurrence_type, date, end=None):
+        response = self.client.post('/api/events/', {
+            'name': 'Series', 'organization': 'ASC', 'event_type': 'Workshop', 'location': 'ASC Space',
+            'date': date, 'is_recurring': True, 'recurrence_type': recurrence_type, 'recurrence_end_date': end,
+            'organizations': [self.club.id]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Event.objects.get(pk=response.json()['id'])
+
+    def test_daily_series_is_bulk_created_with_co_hosts(self):
+        with CaptureQueriesContext(connection) as queries:
+            parent = self.create_series('daily', '2025-09-01T18:00:00Z')
+        self.assertLess(len(queries), 60)
+        self.assertEqual(parent.recurring_instances.count(), 365)
+        self.assertEqual(EventOrganization.objects.filter(event__parent_event=parent, organization=self.club).count(), 365)
+        self.assertEqual(EventVisibility.objects.filter(event__parent_event=parent, organization='SAS').count(), 365)
+
+    def test_monthly_series_clamps_to_month_end(self):
+        parent = self.create_series('monthly', '2025-01-31T18:00:00Z', '2025-05-31T18:00:00Z')
+        self.assertEqual(
+            [event.date.date().isoformat() for event in parent.recurring_instances.order_by('date')],
+            ['2025-02-28', '2025-03-31', '2025-04-30', '2025-05-31']
+        )
+
+    @override_settings(RECURRING_EVENTS_WINDOW_DAYS=14)
+    def test_rolling_window(self):
+        start = timezone.now() + timezone.timedelta(days=1)
+        parent = self.create_series('weekly', start.isoformat())
+        self.assertEqual(parent.recurring_instances.count(), 1)
+        self.assertEqual(extend_all(timezone.now() + timezone.timedelta(days=30)), 3)
+        self.assertEqual(extend_all(timezone.now() + timezone.timedelta(days=30)), 0)
+
+
+class UserIdentityTests(TestCase):
+    """/user/me/ is answered from the identity cache or the token's claims."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('a00000001', email='a00000001@usu.edu', password='changeme!', first_name='Sam')
+        cls.group = Group.objects.create(name='Student')
+        cls.event = Event.objects.create(
+            name='Workshop', organization='ASC', event_type='Workshop', location='ASC Space',
+            date=timezone.make_aware(datetime(2025, 9, 15, 12))
+        )
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        response = self.client.post('/api/token/', {'username': 'a00000001', 'password': 'changeme!'})
+        self.assertEqual(response.json()['student_profile']['total_points'], 0)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}')
+
+    def test_cached_identity(self):
+        # Authentication loads the user; the rest is cached
+        with self.assertNumQueries(1):
+            body = self.client.get('/api/user/me/').json()
+        self.assertEqual((body['username'], body['first_name'], body['is_admin']), ('a00000001', 'Sam', False))
+
+        # Another worker, without the cache: a per-process cache cannot vouch for the claims
+        caches['default'].clear()
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get('/api/user/me/').json(), body)
+
+    def test_claims_need_a_shared_cache(self):
+        body = self.client.get('/api/user/me/').json()
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}):
+            # The user + the points; the claims cover everything else
+            with self.assertNumQueries(2):
+                self.assertEqual(self.client.get('/api/user/me/').json(), body)
+
+    def test_inactive_user_is_rejected(self):
+        self.client.get('/api/user/me/')
+        # Deactivated in another worker: this worker's cached identity is not enough
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_changes_invalidate(self):
+        self.client.get('/api/user/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(student=self.user.student_profile, event=self.event)
+        self.assertEqual(self.client.get('/api/user/me/').json()['student_profile']['total_points'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.group)
+            AdminUser.objects.create(user=self.user, first_name='Sam', last_name='Admin', role='ASC')
+        # The token's claims predate the change, so the identity is read again
+        body = self.client.get('/api/user/me/').json()
+        self.assertEqual((body['groups'], body['admin_profile']['role'], body['is_admin']), (['Student'], 'ASC', True))
+
+
+class AdminScopeTests(TestCase):
+    """Club admins are scoped by one filter backend, optionally from their token."""
+
+    @classmethod
+    def setUpTestData(cls):
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='SAS')
+        partner = Organization.objects.create(name='SAS')
+        student = User.objects.create_user('a00000001', email='a00000001@usu.edu').student_profile
+        date = timezone.make_aware(datetime(2025, 9, 15, 12))
+        hosted, cohosted, other = [
+            Event.objects.create(name=name, organization=organization, event_type='Workshop', location='ASC Space', date=date)
+            for name, organization in (('Hosted', 'SAS'), ('Co-hosted', 'ASC'), ('Other', 'ASC'))
+        ]
+        EventOrganization.objects.create(event=cohosted, organization=partner)
+        for event in (hosted, cohosted, other):
+            Attendance.objects.create(student=student, event=event)
+        cls.visible = {hosted.id, cohosted.id}
+        cls.other = other
+
+    def setUp(self):
+        caches['default'].clear()
+        self.client = APIClient()
+        access = self.client.post('/api/token/', {'username': 'leader', 'password': 'changeme!'}).json()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_viewsets_are_scoped(self):
+        self.assertEqual({row['id'] for row in self.client.get('/api/events/').json()}, self.visible)
+        self.assertEqual({row['id'] for row in self.client.get('/api/events/upcoming/').json()}, set())
+        self.assertEqual({row['event'] for row in self.client.get('/api/attendance/').json()}, self.visible)
+        self.assertEqual(self.client.get(f'/api/events/{self.other.id}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/students/total/').json(), {'count': 1})
+
+    @override_settings(ADMIN_SCOPE_FROM_TOKEN=True)
+    def test_scope_from_token_skips_profile_query(self):
+        # The user + events + prefetched event organizations
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/events/')
+        self.assertEqual({row['id'] for row in response.json()}, self.visible)
+
+
+class AsyncViewTests(TestCase):
+    """The ASGI-mode views return what their sync counterparts do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        leader = User.objects.create_user('leader', email='leader@usu.edu', password='changeme!')
+        AdminUser.objects.create(user=leader, first_name='Lee', last_name='Leader', role='SAS')
+        students = [User.objects.create_user(f'a0000000{n}', email=f'a0000000{n}@usu.edu').student_profile for n in range(3)]
+        date = timezone.make_aware(datetime(2025, 9, 15, 12))
+        hosted, other = [
+            Event.objects.create(name=name, organization=organization, event_type='Workshop', location='ASC Space', date=date)
+            for name, organization in (('Hosted', 'SAS'), ('Other', 'ASC'))
+        ]
+        Attendance.objects.create(student=students[0], event=hosted)
+        Attendance.objects.create(student=students[1], event=other)
+        cls.token = str(RefreshToken.for_user(leader).access_token)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    async def test_matches_sync_views(self):
+        factory = AsyncRequestFactory()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        for view, path in (
+            (async_views.total_students, '/api/students/total/'),
+            (async_views.participating_students, '/api/students/participating/?organization=SAS'),
+            (async_views.attendance_overview, '/api/attendance/overview/?granularity=month'),
+            (async_views.attendance_overview, '/api/attendance/overview/?granularity=hour'),
+        ):
+            expected = await sync_to_async(client.get)(path)
+            await sync_to_async(stats_cache.get_cache().clear)()
+            for cached in ('MISS', 'HIT'):
+                response = await view(factory.get(path, headers={'Authorization': f'Bearer {self.token}'}))
+                self.assertEqual((response.status_code, json.loads(response.content)), (expected.status_code, expected.json()))
+                if response.status_code == 200:
+                    self.assertEqual(response['X-Cache'], cached)
+
+    async def test_requires_authentication_and_method(self):
+        factory = AsyncRequestFactory()
+        self.assertEqual((await async_views.total_students(factory.get('/api/students/total/'))).status_code, 401)
+        self.assertEqual((await async_views.total_students(factory.post('/api/students/total/'))).status_code, 405)
+        self.assertEqual((await async_views.onetap_webhook_handler(factory.get('/api/webhook/onetap-handler/'))).status_code, 405)
+        self.assertTrue(async_views.onetap_webhook_handler.csrf_exempt)
+
+
+class ConnectionStatsTests(TestCase):
+    """Connects through an instrumented backend and requests are counted per worker."""
+
+    def test_counts_connects_and_requests(self):
+        before = connection_stats()
+        wrapper_class = type('DatabaseWrapper', (InstrumentedConnection, sqlite_base.DatabaseWrapper), {})
+        wrapper = wrapper_class({**connection.settings_dict, 'NAME': ':memory:'}, alias='instrumented')
+        wrapper.ensure_connection()
+        wrapper.close()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('ops', is_staff=True))
+        body = client.get('/api/webhook/onetap-handler/status/').json()
+
+        after = connection_stats()
+        self.assertEqual((after['opened'] - before['opened'], after['requests'] - before['requests']), (1, 1))
+        self.assertGreaterEqual(after['max_wait_ms'], 0)
+        self.assertEqual(body['database']['opened'], after['opened'])
+
+    def test_worker_internals_are_staff_only(self):
+        body = self.client.get('/api/webhook/onetap-handler/status/').json()
+        self.assertEqual(body['status'], 'healthy')
+        self.assertFalse({'database', 'identity_cache'} & set(body))
+
+    async def test_async_status_hides_worker_internals_from_anonymous_callers(self):
+        staff = await sync_to_async(User.objects.create_user)('ops', is_staff=True)
+        factory = AsyncRequestFactory()
+        for headers, shown in (({}, False), ({'Authorization': 'Bearer nonsense'}, False),
+                               ({'Authorization': f'Bearer {RefreshToken.for_user(staff).access_token}'}, True)):
+            request = factory.get('/api/webhook/onetap-handler/status/', headers=headers)
+            body = json.loads((await async_views.onetap_webhook_status(request)).content)
+            self.assertEqual('database' in body and 'identity_cache' in body, shown)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -24,6 +25,8 @@ from .views import (
 )
 from .debug_webhook_views import debug_webhook, debug_webhook_status
 from .onetap_webhook_handler import onetap_webhook_handler, onetap_webhook_status
+# ASGI mode routes the webhook and dashboard counts to their async views
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'students', StudentViewSet)
@@ -36,10 +39,10 @@ router.register(r'teaching-assistants', TeachingAssistantViewSet)
 
 urlpatterns = [
     # Custom endpoints must come before router to avoid conflicts
-    path('students/total/', total_students, name='total-students'),
-    path('students/participating/', participating_students, name='participating-students'),
+    path('students/total/', async_views.total_students if settings.ASGI_MODE else total_students, name='total-students'),
+    path('students/participating/', async_views.participating_students if settings.ASGI_MODE else participating_students, name='participating-students'),
     path('students/points/', student_points, name='student-points'),
-    path('attendance/overview/', attendance_overview, name='attendance-overview'),
+    path('attendance/overview/', async_views.attendance_overview if settings.ASGI_MODE else attendance_overview, name='attendance-overview'),
     path('user/me/', get_user_details, name='user-details'),
     path('user/change-password/', change_password, name='change-password'),
     path('admin-users/', list_admin_users, name='list-admin-users'),
@@ -56,6 +59,6 @@ urlpatterns = [
     path('webhook/debug/status/', debug_webhook_status, name='debug-webhook-status'),
     
     # OneTap webhook handler (for actual OneTap integration)
-    path('webhook/onetap-handler/', onetap_webhook_handler, name='onetap-webhook-handler'),
-    path('webhook/onetap-handler/status/', onetap_webhook_status, name='onetap-webhook-handler-status'),
+    path('webhook/onetap-handler/', async_views.onetap_webhook_handler if settings.ASGI_MODE else onetap_webhook_handler, name='onetap-webhook-handler'),
+    path('webhook/onetap-handler/status/', async_views.onetap_webhook_status if settings.ASGI_MODE else onetap_webhook_status, name='onetap-webhook-handler-status'),
 ]
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+The identity payload behind `/api/user/me/` and the login response.
+
+`load_identity` reads a user with their student and admin profiles in one
+query and their groups in a second. The payload is split in two cache
+entries in the default cache: the stable part (names, groups, profile ids
+and admin role) per user id, and the student's points per student id, so a
+check-in only drops the points. Entries are dropped on commit when the user,
+their groups or profiles change, and expire after USER_IDENTITY_CACHE_TIMEOUT
+seconds so changes seen by other workers are picked up (with the default
+local-memory cache each worker has its own copy).
+
+The stable part is also embedded in the JWT (the `identity` claim) when a
+user logs in. When the default cache is shared by all workers (not the
+per-process local-memory or dummy cache), a cache miss trusts the claim if
+the token was issued after the user's last recorded change, and only reads
+the points. With a per-process cache the change marker would only exist in
+the worker that saw the change, so claims are ignored.
+"""
+import functools
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .models import AdminUser, Student
+from .models.attendance import attendance_changed
+
+IDENTITY_CLAIM = 'identity'
+
+
+def get_cache():
+    return caches['default']
+
+def _timeout():
+    return getattr(settings, 'USER_IDENTITY_CACHE_TIMEOUT', 300)
+
+def identity_key(user_id):
+    return f'identity:{user_id}'
+
+def points_key(student_id):
+    return f'identity:points:{student_id}'
+
+def changed_key(user_id):
+    return f'identity:changed:{user_id}'
+
+
+def load_identity(user_id):
+    """Read ``user_id``'s stable identity and points. Returns (identity, points), or (None, None) for no active user."""
+    user = User.objects.select_related('student_profile', 'adminuser').filter(id=user_id, is_active=True).first()
+    if user is None:
+        return None, None
+    student = getattr(user, 'student_profile', None)
+    admin_profile = getattr(user, 'adminuser', None)
+    identity = {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'groups': list(user.groups.values_list('name', flat=True)),
+        'is_superuser': user.is_superuser,
+        'student_id': student.id if student else None,
+        'admin_profile': {
+            'id': admin_profile.id,
+            'role': admin_profile.role,
+            'first_name': admin_profile.first_name,
+            'last_name': admin_profile.last_name
+        } if admin_profile else None,
+        'is_admin': admin_profile is not None
+    }
+    cache = get_cache()
+    cache.set(identity_key(user_id), identity, _timeout())
+    if student:
+        cache.set(points_key(student.id), student.total_points, _timeout())
+    return identity, student.total_points if student else None
+
+
+def claims_are_trusted():
+    """Whether change markers reach every worker, which trusting token claims relies on."""
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+def _claims_are_current(token, user_id):
+    if not claims_are_trusted():
+        return None
+    claims = token.get(IDENTITY_CLAIM) if token is not None else None
+    if not claims or claims.get('id') != user_id:
+        return None
+    changed_at = get_cache().get(changed_key(user_id))
+    if changed_at is not None and token.get('iat', 0) <= changed_at:
+        return None
+    return claims
+
+def _points(student_id):
+    if student_id is None:
+        return None
+    cache = get_cache()
+    points = cache.get(points_key(student_id))
+    if points is None:
+        points = Student.objects.filter(id=student_id).values_list('cached_attendance_count', flat=True).first()
+        cache.set(points_key(student_id), points, _timeout())
+    return points
+
+
+def current_identity(user_id, token=None):
+    """``user_id``'s stable identity from the cache or a current claim in ``token``, without queries; None if neither has it."""
+    identity = get_cache().get(identity_key(user_id))
+    if identity is None:
+        identity = _claims_are_current(token, user_id)
+        if identity is not None:
+            get_cache().set(identity_key(user_id), identity, _timeout())
+    return identity
+
+
+def identity_payload(user_id, token=None):
+    """
+    The `/user/me/` payload for ``user_id``, or None if there is no such
+    active user. Costs no queries when cached, one (the points) when
+    ``token`` carries a current identity claim that can be trusted, and two
+    otherwise. Callers check that the user is active.
+    """
+    identity = current_identity(user_id, token)
+    if identity is None:
+        identity, points = load_identity(user_id)
+        if identity is None:
+            return None
+    else:
+        points = _points(identity['student_id'])
+    student_id = identity['student_id']
+    return {
+        **identity,
+        'student_profile': {
+            'id': student_id,
+            'total_points': points
+        } if student_id else None,
+    }
+
+
+def _forget(user_ids):
+    cache = get_cache()
+    now = time.time()
+    cache.delete_many([identity_key(user_id) for user_id in user_ids])
+    # Claims in tokens issued before now are stale; refresh tokens copy them into new access tokens
+    cache.set_many(
+        {changed_key(user_id): now for user_id in user_ids},
+        jwt_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+    )
+
+def invalidate_identity(user_ids):
+    """Drop the cached identity of ``user_ids`` when the current transaction commits."""
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(functools.partial(_forget, user_ids))
+
+def _forget_points(student_ids):
+    get_cache().delete_many([points_key(student_id) for student_id in student_ids])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login
+    if not created and not (update_fields and set(update_fields) <= {'last_login'}):
+        invalidate_identity([instance.id])
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=AdminUser)
+@receiver(post_delete, sender=AdminUser)
+def profile_changed(sender, instance, **kwargs):
+    invalidate_identity([instance.id if sender is User else instance.user_id])
+    if sender is Student:
+        transaction.on_commit(functools.partial(_forget_points, [instance.id]))
+
+@receiver(m2m_changed, sender=User.groups.through)
+def groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_identity([instance.id])
+    elif action in ('post_add', 'post_remove'):
+        # From the group side, pk_set holds the users
+        invalidate_identity(pk_set)
+    elif action == 'pre_clear':
+        invalidate_identity(instance.user_set.values_list('id', flat=True))
+
+@receiver(attendance_changed)
+def points_changed(sender, pairs, **kwargs):
+    # Counters are written on commit; drop the points after them
+    transaction.on_commit(functools.partial(_forget_points, {student_id for student_id, _ in pairs}))
@@ -3,12 +3,15 @@ from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
-from .models import Student, Event, Attendance, Semester, Professor, Class, TeachingAssistant
+from .models import Student, Event, EventOrganization, Attendance, Semester, Professor, Class, TeachingAssistant, PointsLedger, AttendanceRollup, StudentSearchGram
 from .serializers import (
     StudentSerializer, 
     EventSerializer, 
+    EventListSerializer,
     AttendanceSerializer,
+    AttendanceCompactSerializer,
     SemesterSerializer, 
     ProfessorSerializer, 
     ClassSerializer, 
@@ -22,65 +25,123 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 import re
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.db.models import Count, Sum
-from django.db import models
-from django.db.models import Q
-from datetime import datetime
+from django.db.models import Count, Prefetch, Sum
+from django.db.models.functions import Coalesce
+from django.db import models, transaction
+from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 import calendar
+from .terms import academic_year_start, as_datetime, resolve_term
+from .pagination import KeysetPagination, is_streaming_requested, streaming_list_response
+from .stats_cache import cached_stats
+from .ranking import Leaderboard
+from .recurrence import materialize
+from .user_identity import IDENTITY_CLAIM, identity_payload, load_identity
+from .scoping import AdminScopeFilter, get_scope, visible_events_filter
+
+class StudentPagination(KeysetPagination):
+    ordering = ('first_name', 'last_name', 'id')
+
 
 class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.all().order_by('first_name', 'last_name')
+    queryset = Student.objects.select_related('user').order_by('first_name', 'last_name', 'id')
     serializer_class = StudentSerializer
+    pagination_class = StudentPagination
 
     def list(self, request):
-        queryset = self.get_queryset()
+        """
+        List students. Pass `page_size` and/or `cursor` for keyset pages, or
+        `stream=1` to stream the full list as a JSON array.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if is_streaming_requested(request):
+            return streaming_list_response(queryset, self.get_serializer())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = self.get_serializer(queryset, many=True)
         print(f"Students API - Returning {len(serializer.data)} records")
         return Response(serializer.data)
 
+class EventPagination(KeysetPagination):
+    ordering = ('-date', '-id')
+
+
+class UpcomingEventPagination(KeysetPagination):
+    ordering = ('date', 'id')
+
+
+def is_compact_requested(request):
+    return request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
+
 class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    pagination_class = EventPagination
+    # Club admins only see events their organization hosts or co-hosts
+    filter_backends = [AdminScopeFilter]
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'upcoming', 'past') and is_compact_requested(self.request):
+            return EventListSerializer
+        return EventSerializer
 
     def get_queryset(self):
-        """Filter events by organization based on admin role"""
-        from .models import EventOrganization, Organization
-        
-        queryset = Event.objects.all()
+        """
+        Filter events by the optional `event_type`, `start` and `end`
+        (YYYY-MM-DD, inclusive) query parameters. The admin scope is applied
+        by AdminScopeFilter.
+        """
+        queryset = Event.objects.prefetch_related(
+            Prefetch('event_organizations', queryset=EventOrganization.objects.select_related('organization'))
+        )
         
-        # Check if user is authenticated and is admin, then filter by organization
-        # Super Admin, DAISSA, and Faculty can see all events
-        if self.request.user and self.request.user.is_authenticated:
-            admin_profile = getattr(self.request.user, 'adminuser', None)
-            if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-                # Include events where organization is primary OR where organization is secondary
-                # For primary: organization is a CharField, so match by name
-                # For secondary: event_organizations__organization is a ForeignKey, so match by name through the relationship
-                queryset = queryset.filter(
-                    Q(organization=admin_profile.role) |
-                    Q(event_organizations__organization__name=admin_profile.role)
-                ).distinct()
+        params = self.request.query_params
+        if params.get('event_type'):
+            queryset = queryset.filter(event_type=params['event_type'])
+        try:
+            if params.get('start'):
+                queryset = queryset.filter(date__gte=as_datetime(date.fromisoformat(params['start'])))
+            if params.get('end'):
+                end = date.fromisoformat(params['end']) + timedelta(days=1)
+                queryset = queryset.filter(date__lt=as_datetime(end))
+        except ValueError:
+            raise ValidationError({'error': 'start and end must be dates in YYYY-MM-DD format'})
         
         return queryset
 
+    def _list_response(self, queryset, paginator):
+        """Keyset pages when `page_size`/`cursor` are passed, otherwise the full list."""
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def list(self, request):
+        """List events, newest first when paginated. Pass `compact=1` to omit descriptions."""
+        return self._list_response(self.filter_queryset(self.get_queryset()), self.paginator)
+
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
-        upcoming_events = self.get_queryset().filter(date__gt=timezone.now()).order_by('date')
-        serializer = self.get_serializer(upcoming_events, many=True)
-        return Response(serializer.data)
+        upcoming_events = self.filter_queryset(self.get_queryset()).filter(date__gt=timezone.now()).order_by('date', 'id')
+        return self._list_response(upcoming_events, UpcomingEventPagination())
 
     @action(detail=False, methods=['get'])
     def past(self, request):
-        past_events = self.get_queryset().filter(date__lte=timezone.now()).order_by('-date')
-        serializer = self.get_serializer(past_events, many=True)
-        return Response(serializer.data)
+        past_events = self.filter_queryset(self.get_queryset()).filter(date__lte=timezone.now()).order_by('-date', '-id')
+        return self._list_response(past_events, EventPagination())
 
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def types(self, request):
         """Get unique event types from filtered events"""
         # Get queryset, handling unauthenticated users
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
         unique_types = queryset.values_list('event_type', flat=True).distinct().order_by('event_type')
         return Response(list(unique_types))
 
@@ -98,7 +159,7 @@ class EventViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def functions(self, request):
         """Get unique functions from filtered events"""
-        unique_functions = self.get_queryset().values_list('function', flat=True).distinct().order_by('function')
+        unique_functions = self.filter_queryset(self.get_queryset()).values_list('function', flat=True).distinct().order_by('function')
         return Response(list(unique_functions))
 
     @action(detail=False, methods=['get'])
@@ -116,10 +177,10 @@ class EventViewSet(viewsets.ModelViewSet):
                 return Response({'error': 'Event type is required'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if event type already exists for this organization
-            admin_profile = getattr(request.user, 'adminuser', None)
-            if admin_profile and admin_profile.role != 'Super Admin':
+            scope = get_scope(request)
+            if scope.is_admin and scope.role != 'Super Admin':
                 existing = Event.objects.filter(
-                    organization=admin_profile.role,
+                    organization=scope.role,
                     event_type=event_type
                 ).exists()
             else:
@@ -136,100 +197,94 @@ class EventViewSet(viewsets.ModelViewSet):
         """Override create to handle recurring events and organization validation"""
         try:
             # Check if user is a club leader and restrict organization to their role
-            admin_profile = getattr(request.user, 'adminuser', None)
-            if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
+            club = get_scope(request).organization
+            if club:
                 # Club leaders can only create events for their own organization
                 organization = request.data.get('organization')
-                if organization and organization != admin_profile.role:
+                if organization and organization != club:
                     return Response(
-                        {'error': f'You can only create events for your own organization ({admin_profile.role})'},
+                        {'error': f'You can only create events for your own organization ({club})'},
                         status=status.HTTP_403_FORBIDDEN
                     )
                 # Auto-set organization to their role if not provided
                 if not organization:
-                    request.data['organization'] = admin_profile.role
+                    request.data['organization'] = club
             
             # Create the main event
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
-            event = serializer.save()
-            
-            # If this is a recurring event, create recurring instances
-            if event.is_recurring and event.recurrence_type != 'none':
-                self._create_recurring_instances(event)
+            with transaction.atomic():
+                event = serializer.save()
+                
+                # If this is a recurring event, create recurring instances
+                materialize(event)
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    def _create_recurring_instances(self, parent_event):
-        """Create recurring instances of an event"""
-        from datetime import timedelta
-        import calendar
-        
-        current_date = parent_event.date
-        end_date = parent_event.recurrence_end_date or (current_date + timedelta(days=365))  # Default to 1 year
-        
-        while current_date <= end_date:
-            # Calculate next occurrence based on recurrence type
-            if parent_event.recurrence_type == 'daily':
-                current_date += timedelta(days=1)
-            elif parent_event.recurrence_type == 'weekly':
-                current_date += timedelta(weeks=1)
-            elif parent_event.recurrence_type == 'biweekly':
-                current_date += timedelta(weeks=2)
-            elif parent_event.recurrence_type == 'monthly':
-                # Add one month
-                if current_date.month == 12:
-                    current_date = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    try:
-                        current_date = current_date.replace(month=current_date.month + 1)
-                    except ValueError:
-                        # Handle cases where the day doesn't exist in the next month
-                        current_date = current_date.replace(month=current_date.month + 1, day=1)
-                        current_date = current_date.replace(day=min(parent_event.date.day, calendar.monthrange(current_date.year, current_date.month)[1]))
-            else:
-                break
-            
-            if current_date <= end_date:
-                # Create recurring instance
-                Event.objects.create(
-                    name=parent_event.name,
-                    organization=parent_event.organization,
-                    event_type=parent_event.event_type,
-                    description=parent_event.description,
-                    date=current_date,
-                    location=parent_event.location,
-                    is_recurring=False,  # Instances are not recurring themselves
-                    recurrence_type='none',
-                    parent_event=parent_event
-                )
+class AttendancePagination(KeysetPagination):
+    ordering = ('-checked_in_at', '-id')
+
 
 class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.select_related('student', 'event').all()
+    queryset = Attendance.objects.select_related('student__user', 'event').all()
     serializer_class = AttendanceSerializer
+    pagination_class = AttendancePagination
+    # Club admins only see attendance at events their organization hosts or co-hosts
+    filter_backends = [AdminScopeFilter]
+    scope_field = 'event_id'
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.request.query_params.get('compact', '').lower() in ('1', 'true', 'yes'):
+            return AttendanceCompactSerializer
+        return AttendanceSerializer
 
     def get_queryset(self):
-        """Filter attendance by organization based on admin role"""
-        from .models import EventOrganization, Organization
-        
-        queryset = Attendance.objects.select_related('student', 'event').all()
+        """
+        Filter attendance by the optional `event`, `student`, `start` and `end`
+        (YYYY-MM-DD, inclusive, on check-in time) query parameters. The admin
+        scope is applied by AdminScopeFilter.
+        """
+        queryset = Attendance.objects.select_related('student__user', 'event').all()
         
-        # Check if user is admin and filter by organization
-        # Super Admin, DAISSA, and Faculty can see all events
-        admin_profile = getattr(self.request.user, 'adminuser', None)
-        if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-            # Include attendances for events where organization is primary OR secondary
-            # For primary: event__organization is a CharField, so match by name
-            # For secondary: event__event_organizations__organization is a ForeignKey, so match by name through the relationship
-            queryset = queryset.filter(
-                Q(event__organization=admin_profile.role) |
-                Q(event__event_organizations__organization__name=admin_profile.role)
-            ).distinct()
+        params = self.request.query_params
+        try:
+            if params.get('event'):
+                queryset = queryset.filter(event_id=int(params['event']))
+            if params.get('student'):
+                queryset = queryset.filter(student_id=int(params['student']))
+        except ValueError:
+            raise ValidationError({'error': 'event and student must be integer ids'})
+        try:
+            if params.get('start'):
+                queryset = queryset.filter(checked_in_at__gte=as_datetime(date.fromisoformat(params['start'])))
+            if params.get('end'):
+                end = date.fromisoformat(params['end']) + timedelta(days=1)
+                queryset = queryset.filter(checked_in_at__lt=as_datetime(end))
+        except ValueError:
+            raise ValidationError({'error': 'start and end must be dates in YYYY-MM-DD format'})
         
         return queryset
 
+    def list(self, request):
+        """
+        List attendance. Pass `compact=1` for flat rows, `page_size` and/or
+        `cursor` for keyset pages (newest check-ins first), or `stream=1` to
+        stream the full list as a JSON array.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if is_streaming_requested(request):
+            return streaming_list_response(queryset, self.get_serializer())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         try:
             student_id = request.data.get('student')
@@ -369,31 +424,13 @@ def register_student(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_details(request):
-    user = request.user
-    student = user.student_profile if hasattr(user, 'student_profile') else None
-    admin_profile = user.adminuser if hasattr(user, 'adminuser') else None
-    
-    return Response({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'first_name': user.first_name,
-        'last_name': user.last_name,
-        'groups': list(user.groups.values_list('name', flat=True)),
-        'is_superuser': user.is_superuser,
-        'student_id': student.id if student else None,
-        'student_profile': {
-            'id': student.id,
-            'total_points': student.total_points
-        } if student else None,
-        'admin_profile': {
-            'id': admin_profile.id,
-            'role': admin_profile.role,
-            'first_name': admin_profile.first_name,
-            'last_name': admin_profile.last_name
-        } if admin_profile else None,
-        'is_admin': admin_profile is not None
-    })
+    # Called on every page load: authentication loads the (active) user, and the
+    # rest of the payload comes from the identity cache or, with a shared cache,
+    # the token's claims (see api/user_identity.py)
+    payload = identity_payload(request.user.id, request.auth) if request.user.is_active else None
+    if payload is None:
+        return Response({'error': 'User not found'}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response(payload)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -443,34 +480,25 @@ def change_password(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Stable identity, so /user/me/ can answer from the token
+        identity, _ = load_identity(user.id)
+        token[IDENTITY_CLAIM] = identity
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         
         # Add custom claims
-        data['username'] = self.user.username
-        data['email'] = self.user.email
-        data['first_name'] = self.user.first_name
-        data['last_name'] = self.user.last_name
-        data['groups'] = list(self.user.groups.values_list('name', flat=True))
-        data['is_superuser'] = self.user.is_superuser
-        
-        if hasattr(self.user, 'student_profile'):
-            data['student_id'] = self.user.student_profile.id
-            data['student_profile'] = {
-                'id': self.user.student_profile.id,
-                'total_points': self.user.student_profile.total_points
-            }
-        
-        if hasattr(self.user, 'adminuser'):
-            data['admin_profile'] = {
-                'id': self.user.adminuser.id,
-                'role': self.user.adminuser.role,
-                'first_name': self.user.adminuser.first_name,
-                'last_name': self.user.adminuser.last_name
-            }
-            data['is_admin'] = True
-        else:
-            data['is_admin'] = False
+        payload = identity_payload(self.user.id)
+        del payload['id']
+        if payload['student_id'] is None:
+            del payload['student_id'], payload['student_profile']
+        if payload['admin_profile'] is None:
+            del payload['admin_profile']
+        data.update(payload)
         
         return data
 
@@ -478,247 +506,163 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def total_students(request):
-    # Check if user is admin and filter by organization
+def total_students_query(request):
+    """
+    Students to count for total_students. With ?term=, limited admins count
+    students who attended their organization's events during the term;
+    everyone else counts students registered before the term ended. Raises
+    ValueError for an unknown term.
+    """
+    term = resolve_term(request.GET['term']) if request.GET.get('term') else None
+
     # Super Admin, DAISSA, and Faculty can see all students
-    admin_profile = getattr(request.user, 'adminuser', None)
-    if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
+    scope = get_scope(request)
+    if scope.organization:
         # Filter students who attended events from this admin's organization (primary or secondary)
-        from .models import EventOrganization
-        count = Student.objects.filter(
-            Q(attendances__event__organization=admin_profile.role) |
-            Q(attendances__event__event_organizations__organization__name=admin_profile.role)
-        ).distinct().count()
-    else:
-        # Super Admin, DAISSA, Faculty, or non-admin sees all students
-        count = Student.objects.count()
-    return Response({'count': count})
+        if term and term.ledger_term_start:
+            return PointsLedger.objects.filter(
+                organization=scope.organization, term_start=term.ledger_term_start
+            )
+        attendances = scope.filter(Attendance.objects.all(), 'event_id')
+        if term:
+            attendances = attendances.filter(event__date__gte=term.start, event__date__lt=term.end)
+        return Student.objects.filter(id__in=attendances.values('student_id'))
+    # Super Admin, DAISSA, Faculty, or non-admin sees all students
+    students = Student.objects.all()
+    if term:
+        students = students.filter(created_at__lt=term.end)
+    return students
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def participating_students(request):
+@cached_stats('total_students')
+def total_students(request):
+    """Number of students (see total_students_query)."""
+    try:
+        students = total_students_query(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'count': students.count()})
+
+def participating_students_query(request):
+    """
+    Students to count for participating_students: those who attended an
+    event in the window, filter=semester (the current term, the default),
+    year or all, or a specific ?term=. Raises ValueError for an unknown term.
+    """
     filter_type = request.GET.get('filter', 'semester')
+    term = resolve_term(request.GET.get('term')) if request.GET.get('term') or filter_type == 'semester' else None
     
-    # Check if user is admin and filter by organization
-    admin_profile = getattr(request.user, 'adminuser', None)
-    
-    # Base query
-    query = Student.objects
+    # Super Admin, DAISSA, and Faculty can see all students; ledger rows for
+    # a club include events where it is primary OR secondary
+    organization = get_scope(request).organization or PointsLedger.ALL_ORGANIZATIONS
     
-    # Apply organization filter if admin
-    # Super Admin, DAISSA, and Faculty can see all students
-    if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-        from .models import EventOrganization
-        # Include students who attended events where organization is primary OR secondary
-        query = query.filter(
-            Q(attendances__event__organization=admin_profile.role) |
-            Q(attendances__event__event_organizations__organization__name=admin_profile.role)
-        )
-    
-    # Get current date
-    now = timezone.now()
-    
-    if filter_type == 'semester':
-        # Filter by current semester date range
-        current_month = now.month
-        current_year = now.year
-        
-        if current_month >= 8:  # Fall semester (Aug-Dec)
-            semester_start = timezone.make_aware(datetime(current_year, 8, 1))
-            semester_end = timezone.make_aware(datetime(current_year + 1, 1, 1))
-        else:  # Spring semester (Jan-July)
-            semester_start = timezone.make_aware(datetime(current_year, 1, 1))
-            semester_end = timezone.make_aware(datetime(current_year, 8, 1))
-        
-        count = query.filter(
-            attendances__event__date__gte=semester_start,
-            attendances__event__date__lt=semester_end
-        ).distinct().count()
-    
-    elif filter_type == 'year':
-        year = now.year if now.month >= 8 else now.year - 1
-        academic_year_start = timezone.make_aware(
-            datetime(year, 8, 1)
-        )
-        count = query.filter(
-            attendances__event__date__gte=academic_year_start
-        ).distinct().count()
-    
-    else:  # 'all'
-        count = query.filter(attendances__isnull=False).distinct().count()
-    
-    return Response({'count': count})
+    # The points ledger has one row per student, organization and term, so
+    # counting students is an indexed count instead of a join over Attendance
+    ledger = PointsLedger.objects.filter(organization=organization)
+    if term is not None:
+        if term.ledger_term_start:
+            return ledger.filter(term_start=term.ledger_term_start)
+        # A semester with custom boundaries: count from attendance
+        attendances = Attendance.objects.filter(event__date__gte=term.start, event__date__lt=term.end)
+        if organization:
+            attendances = attendances.filter(visible_events_filter(organization, 'event_id'))
+        return Student.objects.filter(id__in=attendances.values('student_id'))
+    if filter_type == 'year':
+        return ledger.filter(
+            term_start__gte=academic_year_start(timezone.now())
+        ).values('student_id').distinct()
+    # 'all'
+    return ledger.values('student_id').distinct()
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_stats('participating_students')
+def participating_students(request):
+    """Number of students who attended an event in the window (see participating_students_query)."""
+    try:
+        students = participating_students_query(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'count': students.count()})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_stats('student_points')
 def student_points(request):
     filter_type = request.GET.get('filter', 'semester')
     organization_filter = request.GET.get('organization', None)
     
-    # Check if user is admin and filter by organization
-    admin_profile = getattr(request.user, 'adminuser', None)
+    # Super Admin, DAISSA, and Faculty can see all students, and can filter by organization
+    # Other admins are filtered to their own organization (primary or secondary)
+    scope = get_scope(request)
+    organization = None
+    if scope.has_full_access:
+        organization = organization_filter or None
+    elif scope.is_admin:
+        organization = scope.organization
     
-    # Base query
-    students = Student.objects.all()
+    # Points come from the materialized ledger (see api.models.points_ledger), which
+    # already counts each attendance under its primary and secondary organizations
+    ledger = PointsLedger.objects.filter(
+        organization=organization or PointsLedger.ALL_ORGANIZATIONS
+    )
     
-    # Apply organization filter
-    # Super Admin, DAISSA, and Faculty can see all students, and can filter by organization
-    from .models import EventOrganization
-    if admin_profile:
-        if admin_profile.role in ['Super Admin', 'DAISSA', 'Faculty']:
-            # Users who can see all data can filter by organization parameter
-            if organization_filter:
-                # Include events where organization is primary OR secondary
-                students = students.filter(
-                    Q(attendances__event__organization=organization_filter) |
-                    Q(attendances__event__event_organizations__organization__name=organization_filter)
-                ).distinct()
-        else:
-            # Other admins are filtered to their own organization (primary or secondary)
-            students = students.filter(
-                Q(attendances__event__organization=admin_profile.role) |
-                Q(attendances__event__event_organizations__organization__name=admin_profile.role)
-            ).distinct()
+    students = Student.objects.all()
+    if organization:
+        # Only students who have attended an event of this organization
+        students = students.filter(id__in=ledger.values('student_id'))
     
     # Get current date
     now = timezone.now()
     
-    if filter_type == 'semester':
-        # Filter by current semester date range
-        current_month = now.month
-        current_year = now.year
-        
-        if current_month >= 8:  # Fall semester (Aug-Dec)
-            semester_start = timezone.make_aware(datetime(current_year, 8, 1))
-            semester_end = timezone.make_aware(datetime(current_year + 1, 1, 1))
-        else:  # Spring semester (Jan-July)
-            semester_start = timezone.make_aware(datetime(current_year, 1, 1))
-            semester_end = timezone.make_aware(datetime(current_year, 8, 1))
-        
-        # For organization filtering, we need to check both primary and secondary organizations
-        if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-            # Filter by organization (primary or secondary) AND date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=admin_profile.role) |
-                        Q(attendances__event__event_organizations__organization__name=admin_profile.role),
-                        attendances__event__date__gte=semester_start,
-                        attendances__event__date__lt=semester_end
-                    )
-                )
-            )
-        elif admin_profile and admin_profile.role in ['Super Admin', 'DAISSA', 'Faculty'] and organization_filter:
-            # Filter by organization parameter (primary or secondary) AND date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=organization_filter) |
-                        Q(attendances__event__event_organizations__organization__name=organization_filter),
-                        attendances__event__date__gte=semester_start,
-                        attendances__event__date__lt=semester_end
-                    )
-                )
-            )
-        else:
-            # No organization filter, just date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        attendances__event__date__gte=semester_start,
-                        attendances__event__date__lt=semester_end
-                    )
-                )
-            )
-    
-    elif filter_type == 'year':
-        # Calculate academic year start (August 1st of current or previous year)
-        year = now.year if now.month >= 8 else now.year - 1
-        academic_year_start = timezone.make_aware(
-            datetime(year, 8, 1)
-        )
-        
-        # For organization filtering, we need to check both primary and secondary organizations
-        if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-            # Filter by organization (primary or secondary) AND date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=admin_profile.role) |
-                        Q(attendances__event__event_organizations__organization__name=admin_profile.role),
-                        attendances__event__date__gte=academic_year_start
-                    )
-                )
-            )
-        elif admin_profile and admin_profile.role in ['Super Admin', 'DAISSA', 'Faculty'] and organization_filter:
-            # Filter by organization parameter (primary or secondary) AND date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=organization_filter) |
-                        Q(attendances__event__event_organizations__organization__name=organization_filter),
-                        attendances__event__date__gte=academic_year_start
-                    )
-                )
-            )
-        else:
-            # No organization filter, just date range
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(attendances__event__date__gte=academic_year_start)
-                )
-            )
+    term = None
+    if request.GET.get('term') or filter_type == 'semester':
+        try:
+            term = resolve_term(request.GET.get('term'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    else:  # 'all'
-        # For organization filtering, we need to check both primary and secondary organizations
-        if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-            # Filter by organization (primary or secondary)
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=admin_profile.role) |
-                        Q(attendances__event__event_organizations__organization__name=admin_profile.role)
-                    )
-                )
-            )
-        elif admin_profile and admin_profile.role in ['Super Admin', 'DAISSA', 'Faculty'] and organization_filter:
-            # Filter by organization parameter (primary or secondary)
-            students = students.annotate(
-                filtered_points=Count(
-                    'attendances',
-                    filter=models.Q(
-                        Q(attendances__event__organization=organization_filter) |
-                        Q(attendances__event__event_organizations__organization__name=organization_filter)
-                    )
-                )
-            )
-        else:
-            # No organization filter
-            students = students.annotate(
-                filtered_points=Count('attendances')
-            )
-
-    # Order by points (handling NULL values)
-    students = students.order_by(models.F('filtered_points').desc(nulls_last=True))
+    if term is not None and not term.ledger_term_start:
+        # A semester with custom boundaries: count attendance directly
+        attendances = Attendance.objects.filter(event__date__gte=term.start, event__date__lt=term.end)
+        if organization:
+            attendances = attendances.filter(visible_events_filter(organization, 'event_id'))
+        points = attendances.filter(student=models.OuterRef('pk')).values('student').annotate(
+            total=Count('id')
+        ).values('total')
+    else:
+        if term is not None:
+            ledger = ledger.filter(term_start=term.ledger_term_start)
+        elif filter_type == 'year':
+            ledger = ledger.filter(term_start__gte=academic_year_start(now))
+        points = ledger.filter(student=models.OuterRef('pk')).values('student').annotate(
+            total=Sum('points')
+        ).values('total')
+    students = students.annotate(
+        filtered_points=Coalesce(models.Subquery(points), 0)
+    )
+    board = Leaderboard.from_queryset(students, 'filtered_points', fields=('first_name', 'last_name', 'email'))
     
-    data = [{
-        'student_id': student.id,
-        'first_name': student.first_name,
-        'last_name': student.last_name,
-        'email': student.email,
-        'total_points': student.filtered_points or 0
-    } for student in students]
+    # ?top=N and ?around=<student_id>[&radius=R] return a window of the leaderboard
+    try:
+        top = int(request.GET['top']) if request.GET.get('top') else None
+        around = int(request.GET['around']) if request.GET.get('around') else None
+        radius = int(request.GET.get('radius', 5))
+    except ValueError:
+        return Response(
+            {'error': 'top, around and radius must be integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if around is not None:
+        results = board.around(around, max(0, radius))
+        if results is None:
+            return Response({'error': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'count': board.count, 'results': results})
+    if top is not None:
+        return Response({'count': board.count, 'results': board.top(top)})
     
-    return Response(data)
+    return Response(board.entries())
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -936,27 +880,14 @@ def search_students(request):
     if not query or len(query) < 2:
         return Response([])
     
-    # Search by name, email, or username (which contains A-number)
-    students = Student.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(user__username__icontains=query) |
-        Q(username__icontains=query)
-    ).select_related('user')[:20]  # Limit to 20 results
+    # Search by name, email, or username (which contains A-number) through the trigram index;
+    # users and admin profiles are joined in the same query
+    students = StudentSearchGram.search(query, limit=20)  # Limit to 20 results
     
     students_data = []
     for student in students:
-        # Check if user has an admin profile
         # Django's OneToOneField raises RelatedObjectDoesNotExist when the related object doesn't exist
-        try:
-            admin_user = student.user.adminuser
-            is_admin = True
-            admin_role = admin_user.role
-        except Exception:
-            # Catch any exception (RelatedObjectDoesNotExist or AttributeError)
-            is_admin = False
-            admin_role = None
+        admin_user = getattr(student.user, 'adminuser', None)
         
         students_data.append({
             'id': student.id,
@@ -965,8 +896,8 @@ def search_students(request):
             'email': student.email,
             'a_number': student.user.username if student.user.username else '',
             'username': student.user.username,
-            'is_admin': is_admin,
-            'admin_role': admin_role
+            'is_admin': admin_user is not None,
+            'admin_role': admin_user.role if admin_user else None
         })
     
     return Response(students_data)
@@ -1076,38 +1007,58 @@ def manage_organization(request, organization_id):
         organization.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+def attendance_overview_query(request):
+    """
+    Rollup rows for attendance_overview: attendance counts per period and
+    event type. Optional query params: granularity (month, week or day;
+    default month), start/end dates (YYYY-MM-DD, inclusive) and term
+    (defaults start/end). Raises ValueError for invalid parameters.
+    """
+    granularity = request.GET.get('granularity', 'month')
+    if granularity not in ('month', 'week', 'day'):
+        raise ValueError('granularity must be month, week or day')
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        raise ValueError('start and end must be dates in YYYY-MM-DD format')
+    if request.GET.get('term'):
+        term = resolve_term(request.GET['term'])
+        start = start or timezone.localtime(term.start).date()
+        end = end or timezone.localtime(term.end).date() - timedelta(days=1)
+
+    # Super Admin, DAISSA, and Faculty can see all events; rows for a club
+    # count events where it is the primary OR a secondary organization
+    organization = get_scope(request).organization or AttendanceRollup.ALL_ORGANIZATIONS
+
+    rollup = AttendanceRollup.objects.filter(organization=organization)
+    if start:
+        rollup = rollup.filter(day__gte=start)
+    if end:
+        rollup = rollup.filter(day__lte=end)
+    return rollup.annotate(
+        period=models.functions.Trunc('day', granularity, output_field=models.DateField())
+    ).values('period', 'event_type').annotate(
+        count=Sum('count')
+    ).order_by('period', 'event_type')
+
+def overview_entry(entry):
+    """An attendance_overview row as the frontend expects it."""
+    return {
+        'date': as_datetime(entry['period']),
+        'event_type': entry['event_type'],
+        'attendance_counts': entry['count']
+    }
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_stats('attendance_overview')
 def attendance_overview(request):
-    # Check if user is admin and filter by organization
-    # Super Admin, DAISSA, and Faculty can see all events
-    admin_profile = getattr(request.user, 'adminuser', None)
-    
-    # Base query
-    attendance_query = Attendance.objects.all()
-    
-    # Apply organization filter if admin
-    if admin_profile and admin_profile.role not in ['Super Admin', 'DAISSA', 'Faculty']:
-        from .models import EventOrganization
-        # Include attendances for events where organization is primary OR secondary
-        attendance_query = attendance_query.filter(
-            Q(event__organization=admin_profile.role) |
-            Q(event__event_organizations__organization__name=admin_profile.role)
-        ).distinct()
-    
-    attendance_data = attendance_query.annotate(
-        date=models.functions.TruncMonth('checked_in_at')
-    ).values('date', 'event__event_type').annotate(
-        count=Count('id')
-    ).order_by('date')
+    """Attendance counts per period and event type, read from the daily rollup (see attendance_overview_query)."""
+    try:
+        attendance_data = attendance_overview_query(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     # Transform data for frontend
-    transformed_data = []
-    for entry in attendance_data:
-        transformed_data.append({
-            'date': entry['date'],
-            'event_type': entry['event__event_type'],
-            'attendance_counts': entry['count']
-        })
-
-    return Response(transformed_data)
\ No newline at end of file
+    return Response([overview_entry(entry) for entry in attendance_data])
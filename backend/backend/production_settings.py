@@ -1,4 +1,6 @@
 import os
+import django
+from django.core.exceptions import ImproperlyConfigured
 from .settings import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -6,17 +8,45 @@ DEBUG = False
 
 ALLOWED_HOSTS = ['your-ec2-public-ip', 'your-domain.com']
 
-# Database
+# Database. The api.backends.postgresql engine is Django's with connect counts
+# and wait times (api/database.py). Sync workers keep their connection for
+# DB_CONN_MAX_AGE seconds and check it before reuse. Django advises against
+# persistent connections under ASGI, so with ASGI_MODE they are closed after
+# every request unless DB_CONN_MAX_AGE is set. DB_POOL_MAX_SIZE uses psycopg's
+# pool instead (needs Django 5.1+ and psycopg 3); set DB_PGBOUNCER when
+# connecting through a transaction-pooling PgBouncer
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '0' if ASGI_MODE else '600'))
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '0'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.backends.postgresql',
         'NAME': 'hustle_db',
         'USER': 'hustle_user',
         'PASSWORD': 'your_secure_password',
         'HOST': 'localhost',
         'PORT': '5432',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
+if DB_POOL_MAX_SIZE:
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_POOL_MAX_SIZE needs Django 5.1 or later and psycopg 3')
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+    }
+    # Django refuses persistent connections together with a pool
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+if DB_PGBOUNCER:
+    # Server-side cursors do not survive transaction pooling
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
@@ -152,4 +152,86 @@ SIMPLE_JWT = {
 }
 
 # Webhook Security
-WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET', 'your-webhook-secret-key-change-this-in-production')
\ No newline at end of file
+WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET', 'your-webhook-secret-key-change-this-in-production')
+
+# OneTap check-in queue: when enabled, the webhook stores check-ins and returns 202,
+# and `python manage.py process_checkin_queue` writes them to the database
+ONETAP_QUEUE_ENABLED = os.environ.get('ONETAP_QUEUE_ENABLED', 'False') == 'True'
+
+# Per-worker LRU used by the OneTap webhook to resolve repeat check-ins to students
+STUDENT_IDENTITY_CACHE_SIZE = int(os.environ.get('STUDENT_IDENTITY_CACHE_SIZE', '2048'))
+STUDENT_IDENTITY_CACHE_TTL = int(os.environ.get('STUDENT_IDENTITY_CACHE_TTL', '300'))
+
+# Seconds before the OneTap event-name classifier is rebuilt to pick up other workers' changes
+EVENT_CLASSIFIER_TTL = int(os.environ.get('EVENT_CLASSIFIER_TTL', '300'))
+
+# Seconds before the cached club roles and organization ids used to validate events are reloaded
+ORGANIZATION_REGISTRY_TTL = int(os.environ.get('ORGANIZATION_REGISTRY_TTL', '300'))
+
+# Seconds each worker caches the trigrams too common to narrow a student search
+STUDENT_SEARCH_COMMON_GRAMS_TTL = int(os.environ.get('STUDENT_SEARCH_COMMON_GRAMS_TTL', '300'))
+
+# Days ahead to create recurring event instances (api/recurrence.py). 0 creates
+# whole series up front; otherwise run `python manage.py materialize_recurring_events` daily
+RECURRING_EVENTS_WINDOW_DAYS = int(os.environ.get('RECURRING_EVENTS_WINDOW_DAYS', '0'))
+
+# Seconds the /user/me/ identity payload is cached per user in the default cache
+USER_IDENTITY_CACHE_TIMEOUT = int(os.environ.get('USER_IDENTITY_CACHE_TIMEOUT', '300'))
+
+# Take the caller's admin role from the cached identity or the token's identity
+# claim instead of querying AdminUser (api/scoping.py). Role changes reach other
+# workers only as their caches expire unless the default cache is shared
+ADMIN_SCOPE_FROM_TOKEN = os.environ.get('ADMIN_SCOPE_FROM_TOKEN', 'False') == 'True'
+
+# Serve under ASGI (uvicorn workers on backend.asgi:application, see gunicorn_config.py)
+# and route the OneTap webhook and dashboard counts to their async views
+ASGI_MODE = os.environ.get('ASGI_MODE', 'False') == 'True'
+
+# Dashboard aggregate cache (api/stats_cache.py). STATS_CACHE_BACKEND is 'locmem'
+# (per worker, the default), 'file' or 'db' (shared by all workers; run
+# `python manage.py createcachetable` once for 'db')
+STATS_CACHE_BACKEND = os.environ.get('STATS_CACHE_BACKEND', 'locmem')
+STATS_CACHE_TIMEOUT = int(os.environ.get('STATS_CACHE_TIMEOUT', '300'))
+STATS_CACHE_ALIAS = 'stats'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'stats': {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'stats',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+        'file': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('STATS_CACHE_LOCATION', '/var/tmp/hustle_stats_cache'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+        'db': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'stats_cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }[STATS_CACHE_BACKEND],
+}
+
+# Seconds each worker caches the resolved current academic term
+CURRENT_TERM_CACHE_TTL = int(os.environ.get('CURRENT_TERM_CACHE_TTL', '300'))
+
+# Bulk password hashing (api/credentials.py). Accounts given the same default
+# password share one precomputed hash unless SHARE_DEFAULT_PASSWORD_HASH is False;
+# PASSWORD_HASH_WORKERS defaults to one process per core
+SHARE_DEFAULT_PASSWORD_HASH = os.environ.get('SHARE_DEFAULT_PASSWORD_HASH', 'True') == 'True'
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '0')) or None
+
+# SQLite tuning (api/database.py): WAL journaling, synchronous=NORMAL, a memory map
+# and a larger page cache on every connection, a longer busy timeout (seconds) and
+# webhook writes that take turns on a lock file. Compare with `benchmark_sqlite_checkins`
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'False') == 'True'
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20'))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KIB = int(os.environ.get('SQLITE_CACHE_SIZE_KIB', '65536'))
+if SQLITE_TUNING:
+    DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = SQLITE_BUSY_TIMEOUT
@@ -1,7 +1,10 @@
 # Gunicorn configuration file
+import os
+
 bind = "127.0.0.1:8000"
 workers = 3
-worker_class = "sync"
+# ASGI_MODE=True runs uvicorn workers; start with backend.asgi:application instead of backend.wsgi:application
+worker_class = "uvicorn.workers.UvicornWorker" if os.environ.get('ASGI_MODE', 'False') == 'True' else "sync"
 worker_connections = 1000
 timeout = 30
 keepalive = 2